@@ -0,0 +1,427 @@
+"""Clasificación ABC y punto de reorden sugerido a partir del historial de ventas.
+
+El ``stock_minimo`` de cada producto se carga a mano en el formulario y
+suele no tener relación con la venta real. Este módulo lo calcula:
+
+- Demanda diaria media y su desviación por producto, contando los días sin
+  venta como demanda 0, sobre los últimos ``dias`` días.
+- Clase ABC por participación en los ingresos: A hasta el 80 % acumulado,
+  B hasta el 95 %, C el resto (y los productos sin ventas).
+- Nivel de servicio por clase (``NIVEL_SERVICIO``). El stock de seguridad es
+  z·σ·√L para un tiempo de entrega de L días.
+- Punto de reorden = demanda·L + stock de seguridad (el ``stock_minimo``
+  sugerido). Cantidad a pedir = lo que falta para cubrir L + R días (R =
+  revisión) más el stock de seguridad, descontando el stock actual.
+
+Las ventas se leen como en los reportes (``Reporte._BASE``): los días
+cerrados desde ``resumen_ventas_diario`` y solo hoy y los días pendientes
+desde ``detalle_ventas``. Llegan por tandas de un cursor con nombre y se
+acumulan en arreglos de NumPy; todo el cálculo son operaciones sobre
+arreglos (``bincount``, ``unique``, ``argsort``), sin bucles por fila.
+
+El cálculo corre en un proceso aparte (pool de procesos ``spawn``, como el
+de bcrypt) con su propia conexión: no ocupa el GIL del worker. La API lo
+lanza y responde 202 hasta que el resultado está listo; el resultado queda
+``ANALITICA_TTL`` segundos por combinación de parámetros.
+
+Los resultados viven en la tabla ``analitica_reposicion`` (migración 0010),
+no en memoria: con varios workers de gunicorn, solo el que reclama la fila
+lanza el cálculo, y la consulta y ``aplicar`` funcionan desde cualquiera.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.config import Config
+
+CLASES = ("A", "B", "C")
+CORTES_ABC = (0.80, 0.95)  # participación acumulada en los ingresos
+NIVEL_SERVICIO = {"A": 0.98, "B": 0.95, "C": 0.90}
+TAM_TANDA = 50_000
+MAX_DIAS = 730
+
+Parametros = Tuple[int, int, int]  # (dias, entrega, revision)
+
+
+def parametros(dias: Optional[int] = None, entrega: Optional[int] = None,
+               revision: Optional[int] = None) -> Parametros:
+    """Valida los parámetros del cálculo. Lanza ValueError si no son válidos."""
+    dias = Config.ANALITICA_DIAS if dias is None else int(dias)
+    entrega = Config.ANALITICA_DIAS_ENTREGA if entrega is None else int(entrega)
+    revision = Config.ANALITICA_DIAS_REVISION if revision is None else int(revision)
+    if not 7 <= dias <= MAX_DIAS:
+        raise ValueError(f"dias debe estar entre 7 y {MAX_DIAS}")
+    if not 1 <= entrega <= 180 or not 1 <= revision <= 180:
+        raise ValueError("entrega y revision deben estar entre 1 y 180 días")
+    return dias, entrega, revision
+
+
+# ---------------------------
+# Cálculo (corre en el proceso del pool)
+# ---------------------------
+def _leer_ventas(cur, desde: date, hasta: date):
+    """Ventas por (producto, día) como arreglos: id_producto, día (0..), unidades, ingresos."""
+    import numpy as np
+    from backend.modelos.reporte_modelo import Reporte
+
+    cur.execute(
+        Reporte._BASE["ventas"]
+        + " SELECT b.id_producto, b.fecha - %(desde)s, b.unidades::float8, b.ingresos::float8 FROM base b",
+        {"desde": desde, "hasta": hasta},
+    )
+    columnas: List[List[Any]] = [[], [], [], []]
+    while True:
+        tanda = cur.fetchmany(TAM_TANDA)
+        if not tanda:
+            break
+        for destino, valores, tipo in zip(columnas, zip(*tanda), (np.int64, np.int64, np.float64, np.float64)):
+            destino.append(np.array(valores, dtype=tipo))
+    return [
+        np.concatenate(partes) if partes else np.empty(0, dtype=tipo)
+        for partes, tipo in zip(columnas, (np.int64, np.int64, np.float64, np.float64))
+    ]
+
+
+def analizar(
+    ids: Sequence[int], stock: Sequence[float], venta_producto: Sequence[int], venta_dia: Sequence[int],
+    unidades: Sequence[float], ingresos: Sequence[float], dias: int, entrega: int, revision: int,
+) -> Dict[str, Any]:
+    """
+    Núcleo del cálculo, solo con arreglos (sin base de datos).
+
+    Args:
+        ids, stock: Productos (ordenados por id) y su stock actual.
+        venta_producto, venta_dia, unidades, ingresos: Una entrada por venta
+            o por resumen diario; día = días desde el inicio del período.
+
+    Returns:
+        dict de arreglos alineados con ``ids``: demanda, desviacion, ingresos,
+        clase, punto_reorden, cantidad.
+    """
+    import numpy as np
+
+    ids = np.asarray(ids, dtype=np.int64)
+    stock = np.asarray(stock, dtype=np.float64)
+    venta_producto = np.asarray(venta_producto, dtype=np.int64)
+    venta_dia = np.asarray(venta_dia, dtype=np.int64)
+    unidades = np.asarray(unidades, dtype=np.float64)
+    ingresos_venta = np.asarray(ingresos, dtype=np.float64)
+    n = len(ids)
+
+    # Ventas de productos que ya no existen (o de días fuera del período) no cuentan
+    if n:
+        posicion = np.minimum(np.searchsorted(ids, venta_producto), n - 1)
+        validas = (ids[posicion] == venta_producto) & (venta_dia >= 0) & (venta_dia < dias)
+    else:
+        posicion, validas = venta_producto, np.zeros(len(venta_producto), dtype=bool)
+    posicion, venta_dia = posicion[validas], venta_dia[validas]
+    unidades, ingresos_venta = unidades[validas], ingresos_venta[validas]
+
+    # Demanda por (producto, día): varias filas del mismo día (p. ej. por método de pago) se suman
+    clave = posicion * dias + venta_dia
+    claves, inversa = np.unique(clave, return_inverse=True)
+    diaria = np.bincount(inversa, weights=unidades, minlength=len(claves))
+    producto_clave = claves // dias
+
+    total = np.bincount(producto_clave, weights=diaria, minlength=n)
+    cuadrados = np.bincount(producto_clave, weights=diaria * diaria, minlength=n)
+    demanda = total / dias
+    desviacion = np.sqrt(np.maximum(cuadrados / dias - demanda * demanda, 0.0))
+    ingresos_producto = np.bincount(posicion, weights=ingresos_venta, minlength=n)
+
+    # ABC: participación acumulada *antes* de cada producto, así el más vendido siempre es A
+    orden = np.argsort(-ingresos_producto, kind="stable")
+    total_ingresos = ingresos_producto.sum()
+    previo = np.empty(n)
+    previo[orden] = (np.cumsum(ingresos_producto[orden]) - ingresos_producto[orden]) / (total_ingresos or 1.0)
+    clase = np.searchsorted(np.asarray(CORTES_ABC), previo, side="right")
+    clase[ingresos_producto <= 0] = len(CLASES) - 1
+
+    z = np.array([NormalDist().inv_cdf(NIVEL_SERVICIO[c]) for c in CLASES])[clase]
+    seguridad = z * desviacion * np.sqrt(entrega)
+    punto_reorden = np.ceil(demanda * entrega + seguridad)
+    objetivo = demanda * (entrega + revision) + z * desviacion * np.sqrt(entrega + revision)
+    cantidad = np.maximum(np.ceil(objetivo - stock), 0.0)
+    cantidad[stock > punto_reorden] = 0.0  # todavía no hay que pedir
+
+    return {
+        "demanda": demanda,
+        "desviacion": desviacion,
+        "ingresos": ingresos_producto,
+        "clase": clase,
+        "punto_reorden": punto_reorden.astype(np.int64),
+        "cantidad": cantidad.astype(np.int64),
+    }
+
+
+def _conectar():
+    """Conexión propia del proceso de analítica (no comparte el pool del worker)."""
+    import psycopg2
+
+    return psycopg2.connect(
+        host=Config.PG_HOST, port=Config.PG_PORT, dbname=Config.PG_DB,
+        user=Config.PG_USER, password=Config.PG_PASS,
+        client_encoding="UTF8", connect_timeout=10, application_name="mi-app-analitica",
+    )
+
+
+def calcular(dias: int, entrega: int, revision: int) -> Dict[str, Any]:
+    """Lee productos y ventas y arma la respuesta de la API (se ejecuta en el pool)."""
+    import numpy as np
+    import psycopg2
+
+    inicio = time.perf_counter()
+    hasta = date.today()
+    desde = hasta - timedelta(days=dias - 1)
+    conn = _conectar()
+    try:
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT p.id_producto, p.codigo, p.nombre, p.stock_minimo, COALESCE(s.cantidad, 0)::float8
+                FROM producto p
+                LEFT JOIN stock_actual s ON s.id_producto = p.id_producto
+                ORDER BY p.id_producto
+            """)
+            productos = cur.fetchall()
+        with conn.cursor(name="analitica_ventas") as cur:
+            cur.itersize = TAM_TANDA
+            venta_producto, venta_dia, unidades, ingresos = _leer_ventas(cur, desde, hasta)
+        conn.rollback()
+    finally:
+        conn.close()
+
+    ids, codigos, nombres, minimos, stock = zip(*productos) if productos else ((), (), (), (), ())
+    r = analizar(ids, stock, venta_producto, venta_dia, unidades, ingresos, dias, entrega, revision)
+    media = np.where(r["demanda"] > 0, r["demanda"], 1.0)
+    variacion = np.where(r["demanda"] > 0, r["desviacion"] / media, 0.0)
+
+    columnas = {
+        "demanda_diaria": np.round(r["demanda"], 3).tolist(),
+        "desviacion": np.round(r["desviacion"], 3).tolist(),
+        "variacion": np.round(variacion, 3).tolist(),
+        "ingresos": np.round(r["ingresos"], 2).tolist(),
+        "punto_reorden": r["punto_reorden"].tolist(),
+        "cantidad_sugerida": r["cantidad"].tolist(),
+    }
+    clases = [CLASES[c] for c in r["clase"].tolist()]
+    lista = [
+        {
+            "id_producto": ids[i],
+            "codigo": codigos[i],
+            "nombre": nombres[i],
+            "clase": clases[i],
+            "stock": int(stock[i]),
+            "stock_minimo": minimos[i],
+            **{nombre: valores[i] for nombre, valores in columnas.items()},
+        }
+        for i in range(len(ids))
+    ]
+    lista.sort(key=lambda p: (p["clase"], -p["ingresos"], p["id_producto"]))
+    return {
+        "generado_en": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"dias": dias, "entrega": entrega, "revision": revision,
+                       "desde": desde.isoformat(), "hasta": hasta.isoformat()},
+        "filas_leidas": int(len(venta_producto)),
+        "duracion_ms": round((time.perf_counter() - inicio) * 1000, 1),
+        "resumen": {c: clases.count(c) for c in CLASES},
+        "productos": lista,
+    }
+
+
+def calcular_y_guardar(dias: int, entrega: int, revision: int, iniciado_en: datetime) -> None:
+    """
+    Calcula y guarda el resultado (o el error) en ``analitica_reposicion``.
+
+    Se ejecuta en el pool: el JSON de miles de productos se arma fuera del
+    worker web. Solo escribe si la fila sigue reclamada por este cálculo
+    (``iniciado_en``).
+    """
+    from backend.db import a_json
+
+    try:
+        datos, error = a_json(calcular(dias, entrega, revision)), None
+    except Exception as e:
+        print("Error en el cálculo de reposición:", e)
+        datos, error = None, str(e) or e.__class__.__name__
+    conn = _conectar()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(_SQL_GUARDAR, _valores_guardar((dias, entrega, revision), iniciado_en, datos, error))
+    finally:
+        conn.close()
+
+
+# Cierra la reclamación con el resultado o el error, si sigue siendo la nuestra
+_SQL_GUARDAR = """
+    UPDATE analitica_reposicion
+    SET estado = %s, resultado = %s, error = %s, generado_en = now()
+    WHERE (dias, entrega, revision) = (%s, %s, %s)
+      AND estado = 'calculando' AND iniciado_en = %s
+"""
+
+
+def _valores_guardar(params: Parametros, iniciado_en: datetime, datos: Optional[str],
+                     error: Optional[str]) -> Tuple[Any, ...]:
+    return ("error" if error is not None else "listo", datos, error, *params, iniciado_en)
+
+
+# ---------------------------
+# Pool de procesos y resultados (en el worker web)
+# ---------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    """Crea el pool en este proceso (y tras un fork); llamar con ``_lock`` tomado."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def _terminar(params: Parametros, iniciado_en: datetime, futuro: Future) -> None:
+    """Si el proceso de cálculo murió sin guardar nada, deja el error en la tabla."""
+    global _pool
+    error = futuro.exception()
+    if error is None:
+        return
+    print("Error en el cálculo de reposición:", error)
+    if isinstance(error, BrokenProcessPool):
+        # El proceso murió (p. ej. sin memoria): el próximo cálculo crea otro pool
+        with _lock:
+            _pool = None
+    from backend.db import DB
+
+    try:
+        DB.execute(_SQL_GUARDAR, _valores_guardar(params, iniciado_en, None, str(error) or error.__class__.__name__))
+    except Exception as e:
+        print("Error guardando el fallo del cálculo de reposición:", e)
+
+
+_SQL_ESTADO = """
+    SELECT estado, error, resultado::text,
+           generado_en > now() - make_interval(secs => %(ttl)s)
+    FROM analitica_reposicion
+    WHERE (dias, entrega, revision) = (%(dias)s, %(entrega)s, %(revision)s)
+"""
+
+# Reclama la fila salvo que haya un resultado vigente o un cálculo en curso
+# que no haya superado ANALITICA_TIMEOUT; solo un worker la obtiene
+_SQL_RECLAMAR = """
+    INSERT INTO analitica_reposicion AS a (dias, entrega, revision, estado, iniciado_en)
+    VALUES (%(dias)s, %(entrega)s, %(revision)s, 'calculando', now())
+    ON CONFLICT (dias, entrega, revision) DO UPDATE
+        SET estado = 'calculando', iniciado_en = now(), generado_en = NULL, resultado = NULL, error = NULL
+        WHERE NOT (a.estado = 'listo' AND a.generado_en > now() - make_interval(secs => %(ttl)s))
+          AND NOT (a.estado = 'calculando' AND a.iniciado_en > now() - make_interval(secs => %(timeout)s))
+    RETURNING iniciado_en
+"""
+
+
+def solicitar(params: Parametros) -> Tuple[str, Optional[Any]]:
+    """
+    Resultado vigente para ``params``; si no hay, lanza el cálculo.
+
+    Returns:
+        tuple: ("listo", JSON del resultado como texto), ("calculando", None)
+               o ("error", {"mensaje"}) (el error se informa una vez; la
+               siguiente llamada reintenta).
+    """
+    from backend.db import DB
+
+    claves = {"dias": params[0], "entrega": params[1], "revision": params[2],
+              "ttl": Config.ANALITICA_TTL, "timeout": Config.ANALITICA_TIMEOUT}
+    fila = DB.fetch_one(_SQL_ESTADO, claves)
+    if fila is not None:
+        estado, error, resultado, vigente = fila
+        if estado == "listo" and vigente:
+            return "listo", resultado
+        if estado == "error":
+            # Solo una petición se lleva el error; la fila queda libre para reintentar
+            borrada = DB.execute_returning(
+                "DELETE FROM analitica_reposicion WHERE (dias, entrega, revision) = (%s, %s, %s) "
+                "AND estado = 'error' RETURNING error",
+                params,
+            )
+            if borrada is not None:
+                return "error", {"mensaje": borrada[0]}
+
+    reclamada = DB.execute_returning(_SQL_RECLAMAR, claves)
+    if reclamada is not None:
+        iniciado_en = reclamada[0]
+        with _lock:
+            futuro = _obtener_pool().submit(calcular_y_guardar, *params, iniciado_en)
+        futuro.add_done_callback(lambda f, p=params, i=iniciado_en: _terminar(p, i, f))
+    return "calculando", None
+
+
+def aplicar(params: Parametros, clases: Sequence[str] = CLASES, ids: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Copia el punto de reorden sugerido a ``producto.stock_minimo`` con un
+    solo UPDATE, para las clases (y opcionalmente los ids) indicadas.
+
+    Lanza LookupError si no hay un cálculo vigente para ``params``.
+
+    Returns:
+        list: id_producto modificados.
+    """
+    from backend.db import DB
+
+    invalidas = set(clases) - set(CLASES)
+    if invalidas:
+        raise ValueError("Clases inválidas: " + ", ".join(sorted(invalidas)))
+    filtro = [int(i) for i in ids] if ids is not None else None
+
+    with DB.connection() as (_, cur):
+        cur.execute(
+            """
+            SELECT 1 FROM analitica_reposicion
+            WHERE (dias, entrega, revision) = (%s, %s, %s) AND estado = 'listo'
+              AND generado_en > now() - make_interval(secs => %s)
+            FOR SHARE
+            """,
+            (*params, Config.ANALITICA_TTL),
+        )
+        if cur.fetchone() is None:
+            raise LookupError("No hay un cálculo vigente con esos parámetros; consulte primero la sugerencia")
+        cur.execute(
+            """
+            UPDATE producto p SET stock_minimo = v.valor
+            FROM (
+                SELECT (e->>'id_producto')::integer AS id_producto, (e->>'punto_reorden')::integer AS valor
+                FROM analitica_reposicion a, json_array_elements(a.resultado->'productos') e
+                WHERE (a.dias, a.entrega, a.revision) = (%s, %s, %s)
+                  AND e->>'clase' = ANY(%s)
+            ) v
+            WHERE p.id_producto = v.id_producto
+              AND (%s::integer[] IS NULL OR p.id_producto = ANY(%s::integer[]))
+              AND p.stock_minimo IS DISTINCT FROM v.valor
+            RETURNING p.id_producto
+            """,
+            (*params, list(clases), filtro, filtro),
+        )
+        modificados = sorted(f[0] for f in cur.fetchall())
+        if modificados:
+            # El stock_minimo de los resultados guardados ya no es el actual
+            cur.execute("DELETE FROM analitica_reposicion WHERE estado <> 'calculando'")
+    return modificados
+
+
+def cerrar_pool() -> None:
+    """Detiene el proceso de cálculo (al apagar el worker)."""
+    global _pool
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,23 +1,57 @@
 """Punto de entrada principal de la aplicación Flask."""
 
 from flask import Flask
-from flask import Flask, render_template
+from flask import Flask, render_template, request
 from backend.controladores.auth_controlador import auth_bp
 from backend.controladores.prod_controlador import prod_bp
 from backend.controladores.cate_controlador import cate_bp
 from backend.controladores.prov_controlador import prov_bp
+from backend.controladores.venta_controlador import venta_bp
+from backend.controladores.compra_controlador import compra_bp
+from backend.controladores.inventario_controlador import inventario_bp
+from backend.controladores.salud_controlador import salud_bp
+from backend.controladores.cambios_controlador import cambios_bp
+from backend.controladores.reporte_controlador import reporte_bp
+from backend.controladores.dashboard_controlador import dashboard_bp
+from backend.controladores.analitica_controlador import analitica_bp
 from backend.config import Config
 from backend.db import DB
+from backend.comandos import registrar_comandos
+from backend import arranque, compresion, migraciones, metricas, replicas
+from backend.utils.respuestas import ProveedorJSON
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 
 
-def crear_app():
-    """Crea e inicializa la aplicación Flask."""
+def crear_app(iniciar_db=True):
+    """Crea e inicializa la aplicación Flask.
+
+    Con ``iniciar_db=False`` (entrada WSGI de producción, ver backend/wsgi.py)
+    no queda ninguna conexión abierta: cada worker crea su pool tras el fork
+    con ``arranque.iniciar_worker``.
+    """
     app = Flask(__name__, template_folder="../templates", static_folder="../static")
     app.config.from_object(Config)
+    app.json = ProveedorJSON(app)
+    if Config.PROXY_SALTOS > 0:
+        # request.remote_addr pasa a ser la IP del cliente (límite de login por IP)
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.PROXY_SALTOS, x_proto=Config.PROXY_SALTOS)
     print("¿Existe index.html?", os.path.exists("templates/auth/index.html"))
-    DB.init_app(Config)
-    print("✅ Conexión a la base de datos inicializada correctamente")
+    if Config.MIGRAR_AL_INICIAR:
+        if iniciar_db:
+            DB.init_app(Config)
+            migraciones.aplicar()
+        else:
+            # Conexión temporal en el proceso maestro, cerrada antes del fork
+            DB.init_app(Config, minconn=0, maxconn=1)
+            try:
+                migraciones.aplicar()
+            finally:
+                DB.cerrar()
+    registrar_comandos(app)
+    metricas.init_app(app)
+    compresion.init_app(app)
+    replicas.init_app(app)
 
     #Ismael
     app.register_blueprint(auth_bp)
@@ -25,10 +59,31 @@ def crear_app():
     app.register_blueprint(prod_bp)
     app.register_blueprint(cate_bp)
     app.register_blueprint(prov_bp)
+    app.register_blueprint(venta_bp)
+    app.register_blueprint(compra_bp)
+    app.register_blueprint(inventario_bp)
+    app.register_blueprint(salud_bp)
+    app.register_blueprint(cambios_bp)
+    app.register_blueprint(reporte_bp)
+    app.register_blueprint(dashboard_bp)
+    app.register_blueprint(analitica_bp)
     
     @app.route("/")
     def index():
         return render_template("auth/index.html")
+
+    arranque.registrar_app(app)
+    if iniciar_db:
+        arranque.iniciar_worker(app)
+        print("✅ Conexión a la base de datos inicializada correctamente")
+    else:
+        @app.before_request
+        def _iniciar_si_falta():
+            # Respaldo para servidores sin hook post-fork: el worker se inicia con su primera petición
+            if request.blueprint == "salud":
+                return
+            if DB.get_pool() is None and not arranque.estado.drenando:
+                arranque.iniciar_worker(app)
     return app
 
 
@@ -0,0 +1,165 @@
+"""Arranque y apagado de cada proceso (worker) de la aplicación.
+
+Con un servidor que hace fork de sus workers (gunicorn con ``preload_app``)
+las conexiones abiertas antes del fork quedarían compartidas entre
+procesos. Por eso en producción ``crear_app(iniciar_db=False)`` no abre el
+pool, y cada worker llama a ``iniciar_worker`` después del fork:
+
+1. Crea su propio pool (que abre ``PG_POOL_MIN`` conexiones).
+2. Calienta: valida cada conexión, llena la caché de referencia recorriendo
+   las rutas de ``RUTAS_CALENTAMIENTO``, carga el índice de códigos de
+   barras y arranca el pool de bcrypt.
+3. Arranca el oyente de cambios (``backend.notificaciones``) y el
+   planificador de tareas (``backend.planificador``).
+4. Solo entonces ``/readyz`` responde 200.
+
+``detener_worker`` deja de aceptar tráfico (``/readyz`` pasa a 503),
+detiene el oyente de cambios y el planificador, espera a que se devuelvan
+las conexiones prestadas y cierra el pool.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from flask import Flask
+from backend.config import Config
+from backend.db import DB
+
+# Rutas de solo lectura que se piden una vez al arrancar para llenar cachés
+RUTAS_CALENTAMIENTO = (
+    "/categorias",
+    "/proveedores",
+    "/list-proveedores",
+    "/productos_filtro?limite=50",
+)
+
+
+class Estado:
+    """Estado del worker consultado por ``/readyz``."""
+
+    def __init__(self) -> None:
+        self.listo = False
+        self.drenando = False
+        self.iniciado_en: Optional[float] = None
+        self.calentamiento_seg: Optional[float] = None
+        self.errores: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+
+estado = Estado()
+_app: Optional[Flask] = None
+
+
+def registrar_app(app: Flask) -> None:
+    """Guarda la app para poder calentarla desde los hooks del servidor."""
+    global _app
+    _app = app
+
+
+def calentar(app: Flask) -> None:
+    """Abre y valida las conexiones mínimas y llena las cachés de referencia."""
+    from backend import seguridad
+    from backend.indice_codigos import indice_codigos
+    from backend.modelos.usuario_modelo import Usuario
+
+    pool = DB.get_pool()
+    prestadas = [pool.getconn() for _ in range(pool.minconn)]
+    try:
+        for conn in prestadas:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+    finally:
+        for conn in prestadas:
+            pool.putconn(conn)
+
+    Usuario.listar_roles()
+    indice_codigos.cargar()
+    cliente = app.test_client()
+    for ruta in RUTAS_CALENTAMIENTO:
+        respuesta = cliente.get(ruta)
+        if respuesta.status_code >= 400:
+            estado.errores[ruta] = f"HTTP {respuesta.status_code}"
+
+    # Levanta los procesos de bcrypt para que el primer login no pague el arranque
+    seguridad.hash_ficticio()
+
+
+def iniciar_worker(app: Optional[Flask] = None) -> None:
+    """Crea el pool de este proceso y lo calienta (idempotente)."""
+    app = app or _app
+    with estado.lock:
+        if estado.listo:
+            return
+        inicio = time.monotonic()
+        DB.init_app(Config)
+        estado.iniciado_en = time.time()
+        estado.drenando = False
+        estado.errores.clear()
+        if app is not None:
+            calentar(app)
+        if Config.NOTIFICACIONES:
+            from backend.notificaciones import oyente
+            oyente.iniciar()
+        if Config.PLANIFICADOR:
+            from backend.planificador import planificador
+            planificador.iniciar()
+        estado.calentamiento_seg = round(time.monotonic() - inicio, 3)
+        estado.listo = True
+        print(f"✅ Worker listo en {estado.calentamiento_seg} s")
+
+
+def iniciar_flujo() -> None:
+    """
+    Arranque del proceso que solo sirve ``/api/cambios`` (gunicorn_sse_conf.py).
+
+    Crea el pool y el oyente de cambios; no calienta cachés ni arranca el
+    planificador ni bcrypt, que son de los workers de la aplicación.
+    """
+    from backend.notificaciones import oyente
+
+    with estado.lock:
+        if estado.listo:
+            return
+        DB.init_app(Config)
+        estado.iniciado_en = time.time()
+        estado.drenando = False
+        oyente.iniciar()
+        estado.listo = True
+
+
+def detener_worker(timeout: float = None) -> bool:
+    """Marca el worker como no listo, drena el pool y detiene el pool de bcrypt."""
+    from backend import analitica, dashboard, seguridad
+    from backend.notificaciones import oyente
+    from backend.planificador import planificador
+
+    with estado.lock:
+        estado.listo = False
+        estado.drenando = True
+    oyente.detener()
+    planificador.detener()
+    limpio = DB.cerrar(Config.APAGADO_TIMEOUT if timeout is None else timeout)
+    seguridad.cerrar_pool()
+    dashboard.cerrar_hilos()
+    analitica.cerrar_pool()
+    if not limpio:
+        print("⚠️ Quedaron conexiones prestadas al cerrar el pool")
+    return limpio
+
+
+def resumen() -> Dict[str, Any]:
+    """Datos para ``/readyz``."""
+    from backend.planificador import planificador
+
+    return {
+        "listo": estado.listo,
+        "drenando": estado.drenando,
+        "calentamiento_seg": estado.calentamiento_seg,
+        "errores": dict(estado.errores),
+        "pool": DB.estadisticas_pool(),
+        "preparadas": DB.estadisticas_preparadas(),
+        "replicas": DB.estadisticas_replicas(),
+        "planificador": planificador.resumen(),
+    }
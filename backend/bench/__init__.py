@@ -0,0 +1 @@
+"""Scripts de medición de rendimiento (no se cargan con la aplicación)."""
@@ -0,0 +1,221 @@
+"""Generación de datos sintéticos BDTJM y carga con COPY.
+
+Los datos son deterministas para una misma ``semilla`` y ``Escala``, de
+modo que dos corridas del benchmark (por ejemplo en commits distintos)
+miden exactamente el mismo contenido.
+
+Cada tabla se genera como un flujo de líneas CSV que ``copy_expert`` lee
+a medida que las necesita; el detalle de ventas y compras se escribe en un
+archivo temporal mientras se genera su encabezado (para que el total del
+encabezado coincida con sus líneas) y se copia después.
+"""
+
+import csv
+import io
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+from backend.db import DB
+
+CATEGORIAS = (
+    "Abarrotes", "Bebidas", "Lácteos", "Limpieza", "Higiene", "Panadería", "Carnes",
+    "Frutas", "Verduras", "Congelados", "Snacks", "Mascotas", "Farmacia", "Papelería",
+    "Ferretería", "Bebés", "Cereales", "Enlatados", "Condimentos", "Licores",
+)
+_PALABRAS = (
+    "arroz", "frijol", "aceite", "azúcar", "sal", "café", "leche", "queso", "jabón",
+    "cloro", "pasta", "galleta", "jugo", "agua", "soda", "harina", "atún", "sardina",
+    "pan", "crema", "yogur", "cereal", "salsa", "chile", "maíz", "avena", "miel",
+)
+_PRESENTACIONES = ("250g", "500g", "1kg", "2kg", "355ml", "600ml", "1L", "2L", "x6", "x12")
+METODOS_PAGO = ("efectivo", "tarjeta", "transferencia")
+
+
+@dataclass
+class Escala:
+    """Volumen de datos a generar. ``Escala.de_factor(1)`` ≈ 2 millones de filas de detalle."""
+
+    categorias: int = len(CATEGORIAS)
+    proveedores: int = 500
+    productos: int = 100_000
+    lotes_por_producto: int = 3
+    ventas: int = 500_000
+    lineas_por_venta: int = 3
+    compras: int = 50_000
+    lineas_por_compra: int = 10
+    dias: int = 365
+
+    @classmethod
+    def de_factor(cls, factor: float) -> "Escala":
+        base = cls()
+        return cls(
+            categorias=base.categorias,
+            proveedores=max(1, int(base.proveedores * factor)),
+            productos=max(10, int(base.productos * factor)),
+            ventas=max(1, int(base.ventas * factor)),
+            compras=max(1, int(base.compras * factor)),
+        )
+
+
+class _LectorLineas:
+    """Adapta un generador de líneas de texto a la interfaz ``read()`` que usa COPY."""
+
+    def __init__(self, lineas: Iterator[str]) -> None:
+        self._lineas = lineas
+        self._resto = b""
+
+    def read(self, tam: int = -1) -> bytes:
+        partes = [self._resto]
+        largo = len(self._resto)
+        for linea in self._lineas:
+            dato = linea.encode("utf-8")
+            partes.append(dato)
+            largo += len(dato)
+            if 0 <= tam <= largo:
+                break
+        datos = b"".join(partes)
+        if tam < 0:
+            self._resto = b""
+            return datos
+        self._resto = datos[tam:]
+        return datos[:tam]
+
+
+def _csv(*valores) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(valores)
+    return buffer.getvalue()
+
+
+class Generador:
+    """Genera y carga un conjunto de datos completo en la base de ``DB``."""
+
+    def __init__(self, escala: Escala, semilla: int = 42, hoy: date = None) -> None:
+        self.escala = escala
+        self.rng = random.Random(semilla)
+        self.hoy = hoy or date.today()
+        self.precios: List[float] = []  # precio_venta por id_producto - 1
+        self.filas: Dict[str, int] = {}
+
+    # ---------------------------
+    # Generadores por tabla
+    # ---------------------------
+    def _categorias(self) -> Iterator[str]:
+        for i in range(self.escala.categorias):
+            nombre = CATEGORIAS[i] if i < len(CATEGORIAS) else f"Categoría {i + 1}"
+            yield _csv(i + 1, nombre)
+
+    def _proveedores(self) -> Iterator[str]:
+        for i in range(1, self.escala.proveedores + 1):
+            yield _csv(i, f"Proveedor {i:05d}", f"2{self.rng.randrange(10**7):07d}",
+                       f"ventas{i}@proveedor.test", f"Colonia {self.rng.choice(_PALABRAS).title()} #{i}")
+
+    def _productos(self) -> Iterator[str]:
+        e = self.escala
+        for i in range(1, e.productos + 1):
+            nombre = f"{self.rng.choice(_PALABRAS).title()} {self.rng.choice(_PALABRAS)} {self.rng.choice(_PRESENTACIONES)}"
+            compra = round(self.rng.uniform(0.25, 80), 2)
+            venta = round(compra * self.rng.uniform(1.1, 1.6), 2)
+            self.precios.append(venta)
+            yield _csv(
+                i, f"75{i:011d}", f"{nombre} {i}"[:50], f"Producto sintético {i}",
+                self.rng.randrange(1, e.categorias + 1), self.rng.randrange(1, e.proveedores + 1),
+                compra, venta, self.rng.randrange(0, 50),
+            )
+
+    def _lotes(self) -> Iterator[str]:
+        id_lote = 0
+        for id_producto in range(1, self.escala.productos + 1):
+            for _ in range(self.rng.randrange(1, 2 * self.escala.lotes_por_producto)):
+                id_lote += 1
+                vence = self.hoy + timedelta(days=self.rng.randrange(-30, 540))
+                yield _csv(id_lote, id_producto, vence.isoformat(), self.rng.randrange(0, 200))
+
+    def _ventas(self, detalle) -> Iterator[str]:
+        e = self.escala
+        id_detalle = 0
+        for id_venta in range(1, e.ventas + 1):
+            fecha = self.hoy - timedelta(days=self.rng.randrange(e.dias))
+            total = 0.0
+            for _ in range(self.rng.randrange(1, 2 * e.lineas_por_venta)):
+                id_detalle += 1
+                id_producto = self.rng.randrange(1, e.productos + 1)
+                cantidad = self.rng.randrange(1, 6)
+                precio = self.precios[id_producto - 1]
+                total += cantidad * precio
+                detalle.write(_csv(id_detalle, id_venta, id_producto, cantidad, precio))
+            yield _csv(id_venta, fecha.isoformat(), 1, round(total, 2), self.rng.choice(METODOS_PAGO))
+
+    def _compras(self, detalle) -> Iterator[str]:
+        e = self.escala
+        id_detalle = 0
+        for id_compra in range(1, e.compras + 1):
+            fecha = self.hoy - timedelta(days=self.rng.randrange(e.dias))
+            total = 0.0
+            for _ in range(self.rng.randrange(1, 2 * e.lineas_por_compra)):
+                id_detalle += 1
+                id_producto = self.rng.randrange(1, e.productos + 1)
+                cantidad = self.rng.randrange(6, 120)
+                precio = round(self.precios[id_producto - 1] / 1.3, 2)
+                total += cantidad * precio
+                detalle.write(_csv(id_detalle, id_compra, id_producto, cantidad, precio))
+            estado = self.rng.choices(("recibido", "pendiente", "cancelado"), (90, 8, 2))[0]
+            yield _csv(id_compra, self.rng.randrange(1, e.proveedores + 1), fecha.isoformat(), estado, round(total, 2))
+
+    # ---------------------------
+    # Carga
+    # ---------------------------
+    def _copiar(self, cur, tabla: str, columnas: str, fuente) -> None:
+        inicio = time.perf_counter()
+        cur.copy_expert(f"COPY {tabla} ({columnas}) FROM STDIN WITH (FORMAT csv)", fuente)
+        self.filas[tabla] = cur.rowcount
+        print(f"  {tabla}: {cur.rowcount} filas en {time.perf_counter() - inicio:.1f} s")
+
+    def _copiar_con_detalle(self, cur, tabla: str, columnas: str, generar, tabla_det: str, columnas_det: str):
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as detalle:
+            self._copiar(cur, tabla, columnas, _LectorLineas(generar(detalle)))
+            detalle.seek(0)
+            self._copiar(cur, tabla_det, columnas_det, detalle)
+
+    def cargar(self, hash_usuario: str) -> Dict[str, int]:
+        """Carga todas las tablas (en orden de llaves foráneas) y ajusta las secuencias.
+
+        Args:
+            hash_usuario (str): Hash bcrypt de la contraseña del usuario 'bench'.
+
+        Returns:
+            dict: Filas cargadas por tabla.
+        """
+        with DB.connection() as (_, cur):
+            cur.execute("INSERT INTO rol (id_rol, nom_rol) VALUES (1, 'Administrador'), (2, 'Cajero')")
+            cur.execute(
+                "INSERT INTO usuarios (id_usuario, nom_usuario, contrasena, id_rol) VALUES (1, 'bench', %s, 1)",
+                (hash_usuario,),
+            )
+            self._copiar(cur, "categoria_producto", "id_categoria, nombre", _LectorLineas(self._categorias()))
+            self._copiar(cur, "proveedores", "id_proveedor, nombre, telefono, email, direccion",
+                         _LectorLineas(self._proveedores()))
+            self._copiar(cur, "producto", "id_producto, codigo, nombre, descripcion, id_categoria, "
+                         "id_proveedor, precio_compra, precio_venta, stock_minimo", _LectorLineas(self._productos()))
+            self._copiar(cur, "lotes", "id_lote, id_producto, fecha_vencimiento, cantidad",
+                         _LectorLineas(self._lotes()))
+            self._copiar_con_detalle(cur, "ventas", "id_venta, fecha, id_usuario, total, metodo_pago", self._ventas,
+                                     "detalle_ventas", "id_detalle, id_venta, id_producto, cantidad, precio_unitario")
+            self._copiar_con_detalle(cur, "compras", "id_compra, id_proveedor, fecha, estado, total", self._compras,
+                                     "detalle_compras", "id_detalle, id_compra, id_producto, cantidad, precio_unitario")
+
+            # Las filas llevan id explícito: las secuencias deben continuar después del máximo
+            for tabla, columna in (("rol", "id_rol"), ("usuarios", "id_usuario"),
+                                   ("categoria_producto", "id_categoria"), ("proveedores", "id_proveedor"),
+                                   ("producto", "id_producto"), ("lotes", "id_lote"), ("ventas", "id_venta"),
+                                   ("detalle_ventas", "id_detalle"), ("compras", "id_compra"),
+                                   ("detalle_compras", "id_detalle")):
+                cur.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{tabla}', '{columna}'), "
+                    f"COALESCE((SELECT MAX({columna}) FROM {tabla}), 1))"
+                )
+        return self.filas
@@ -0,0 +1,80 @@
+-- Esquema base BDTJM para la base de pruebas del benchmark.
+-- Reproduce las tablas y restricciones del respaldo DB/BDTJM.sql (más
+-- producto.id_proveedor, que usa la aplicación); los índices y tablas
+-- adicionales los agregan después las migraciones de backend/migraciones.
+
+CREATE TABLE rol (
+    id_rol  serial PRIMARY KEY,
+    nom_rol varchar(100)
+);
+
+CREATE TABLE usuarios (
+    id_usuario  serial PRIMARY KEY,
+    nom_usuario varchar(100) NOT NULL UNIQUE,
+    contrasena  varchar(100) NOT NULL,
+    id_rol      integer NOT NULL CONSTRAINT fk_usuario_rol REFERENCES rol(id_rol)
+);
+
+CREATE TABLE categoria_producto (
+    id_categoria serial PRIMARY KEY,
+    nombre       varchar(100) NOT NULL
+);
+
+CREATE TABLE proveedores (
+    id_proveedor serial PRIMARY KEY,
+    nombre       varchar(100) NOT NULL,
+    telefono     varchar(20),
+    email        varchar(100),
+    direccion    text
+);
+
+CREATE TABLE producto (
+    id_producto   serial PRIMARY KEY,
+    codigo        varchar(50) NOT NULL UNIQUE,
+    nombre        varchar(50) NOT NULL,
+    descripcion   text,
+    id_categoria  integer NOT NULL CONSTRAINT fk_producto_categoria REFERENCES categoria_producto(id_categoria),
+    id_proveedor  integer REFERENCES proveedores(id_proveedor),
+    precio_compra numeric(10,2) NOT NULL,
+    precio_venta  numeric(10,2) NOT NULL,
+    stock_minimo  integer DEFAULT 0
+);
+
+CREATE TABLE lotes (
+    id_lote           serial PRIMARY KEY,
+    id_producto       integer NOT NULL CONSTRAINT fk_lote_producto REFERENCES producto(id_producto),
+    fecha_vencimiento date NOT NULL,
+    cantidad          integer NOT NULL
+);
+
+CREATE TABLE compras (
+    id_compra    serial PRIMARY KEY,
+    id_proveedor integer NOT NULL CONSTRAINT fk_compra_proveedor REFERENCES proveedores(id_proveedor),
+    fecha        date NOT NULL,
+    estado       varchar(20) CHECK (estado IN ('pendiente', 'recibido', 'cancelado')),
+    total        numeric(10,2) NOT NULL
+);
+
+CREATE TABLE detalle_compras (
+    id_detalle      serial PRIMARY KEY,
+    id_compra       integer NOT NULL CONSTRAINT fk_detalle_compra REFERENCES compras(id_compra),
+    id_producto     integer NOT NULL CONSTRAINT fk_detalle_producto REFERENCES producto(id_producto),
+    cantidad        numeric(10,2) NOT NULL,
+    precio_unitario numeric(10,2) NOT NULL
+);
+
+CREATE TABLE ventas (
+    id_venta    serial PRIMARY KEY,
+    fecha       date NOT NULL,
+    id_usuario  integer NOT NULL CONSTRAINT fk_venta_usuario REFERENCES usuarios(id_usuario),
+    total       numeric(10,2) NOT NULL,
+    metodo_pago varchar(20) CHECK (metodo_pago IN ('efectivo', 'tarjeta', 'transferencia'))
+);
+
+CREATE TABLE detalle_ventas (
+    id_detalle      serial PRIMARY KEY,
+    id_venta        integer NOT NULL CONSTRAINT fk_detalle_venta REFERENCES ventas(id_venta),
+    id_producto     integer NOT NULL CONSTRAINT fk_detalle_producto_venta REFERENCES producto(id_producto),
+    cantidad        numeric(10,2) NOT NULL,
+    precio_unitario numeric(10,2) NOT NULL
+);
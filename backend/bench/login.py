@@ -0,0 +1,103 @@
+"""Benchmark del login: latencia p50/p99 con clientes concurrentes.
+
+Lanza ``--clientes`` hilos que hacen POST /auth/login contra un servidor en
+marcha y reporta latencias y códigos de estado. Sirve para comparar la
+verificación bcrypt en el hilo de la petición frente al pool de procesos.
+
+Para que el limitador de intentos no corte la prueba, arrancar el
+servidor con LOGIN_MAX_IP y LOGIN_MAX_USUARIO altos.
+
+Uso:
+    python -m backend.bench.login --url http://127.0.0.1:5000/auth/login \\
+        --usuario admin --contrasena secreto --clientes 16 --peticiones 200
+"""
+
+import argparse
+import json
+import math
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from typing import Dict, List
+
+
+class _SinRedireccion(urllib.request.HTTPRedirectHandler):
+    """El login exitoso redirige al menú; se mide solo el POST."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (valores ya ordenados)."""
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[indice]
+
+
+def ejecutar(url: str, usuario: str, contrasena: str, clientes: int, peticiones: int) -> Dict:
+    """Hace ``peticiones`` POST repartidas entre ``clientes`` hilos."""
+    cuerpo = urllib.parse.urlencode({"usuario": usuario, "contrasena": contrasena}).encode()
+    abridor = urllib.request.build_opener(_SinRedireccion)
+    latencias: List[float] = []
+    estados: Counter = Counter()
+    lock = threading.Lock()
+    restantes = iter(range(peticiones))
+
+    def cliente():
+        while True:
+            with lock:
+                if next(restantes, None) is None:
+                    return
+            inicio = time.perf_counter()
+            try:
+                with abridor.open(url, data=cuerpo, timeout=30) as r:
+                    estado = r.status
+            except urllib.error.HTTPError as e:
+                estado = e.code
+            except (urllib.error.URLError, OSError):
+                estado = "error"
+            duracion = time.perf_counter() - inicio
+            with lock:
+                latencias.append(duracion)
+                estados[str(estado)] += 1
+
+    hilos = [threading.Thread(target=cliente) for _ in range(clientes)]
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "clientes": clientes,
+        "segundos": round(total, 3),
+        "por_segundo": round(len(latencias) / total, 2) if total else 0.0,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 1),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 1),
+        "media_ms": round(statistics.fmean(latencias) * 1000, 1) if latencias else 0.0,
+        "estados": dict(estados),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000/auth/login")
+    parser.add_argument("--usuario", required=True)
+    parser.add_argument("--contrasena", required=True)
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--peticiones", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(ejecutar(args.url, args.usuario, args.contrasena, args.clientes, args.peticiones), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Suite de benchmark reproducible sobre una base PostgreSQL desechable.
+
+1. Crea una base temporal (``bench_<fecha>``) con las credenciales de Config.
+2. Crea el esquema base (``esquema.sql``) y carga datos sintéticos con COPY.
+3. Aplica las migraciones (índices, resumen de stock), consolida los
+   resúmenes diarios de reportes y ANALYZE.
+4. Ejecuta escenarios contra los blueprints reales con el test client de Flask.
+5. Escribe un reporte JSON (peticiones/s, p50/p95/p99) comparable entre commits.
+   Con ``--planes`` incluye además ``verificar-planes`` sobre las consultas
+   registradas y las que corrieron los escenarios.
+6. Elimina la base, salvo con ``--conservar``.
+
+Uso:
+    python -m backend.bench.suite --escala 0.1 --salida bench.json
+    python -m backend.bench.suite --base bench_existente --sin-carga   # reutiliza datos
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+import psycopg2
+
+from backend.config import Config
+from backend.db import DB
+from backend.bench.datos import Escala, Generador
+from backend.bench.login import percentil
+
+CONTRASENA_BENCH = "bench-123"
+ESQUEMA = os.path.join(os.path.dirname(__file__), "esquema.sql")
+
+
+# ---------------------------
+# Base de datos desechable
+# ---------------------------
+def _admin():
+    conn = psycopg2.connect(host=Config.PG_HOST, port=Config.PG_PORT, dbname="postgres",
+                            user=Config.PG_USER, password=Config.PG_PASS)
+    conn.autocommit = True
+    return conn
+
+
+def crear_base(nombre: str) -> None:
+    conn = _admin()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'CREATE DATABASE "{nombre}" ENCODING \'UTF8\' TEMPLATE template0')
+    finally:
+        conn.close()
+
+
+def eliminar_base(nombre: str) -> None:
+    conn = _admin()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'DROP DATABASE IF EXISTS "{nombre}" WITH (FORCE)')
+    finally:
+        conn.close()
+
+
+def preparar(escala: Escala, semilla: int) -> Dict:
+    """Crea el esquema, carga los datos y aplica migraciones en la base actual de ``DB``."""
+    from backend import migraciones, seguridad
+    from backend.modelos.reporte_modelo import Reporte
+
+    inicio = time.perf_counter()
+    with DB.connection() as (_, cur), open(ESQUEMA, encoding="utf-8") as f:
+        cur.execute(f.read())
+    print("Cargando datos sintéticos...")
+    filas = Generador(escala, semilla).cargar(seguridad.hashear_contrasena(CONTRASENA_BENCH))
+    migraciones.aplicar()
+    Reporte.consolidar()
+
+    conn = DB.obtener_conexion()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("VACUUM ANALYZE")
+    finally:
+        conn.autocommit = False
+        DB.liberar_conexion(conn)
+    return {"filas": filas, "carga_seg": round(time.perf_counter() - inicio, 1)}
+
+
+# ---------------------------
+# Escenarios
+# ---------------------------
+class Escenarios:
+    """Cada método ``e_<nombre>`` hace una petición y devuelve el código HTTP."""
+
+    def __init__(self, app, semilla: int) -> None:
+        self.app = app
+        self.semilla = semilla
+        self.max_categoria = DB.fetch_one("SELECT MAX(id_categoria) FROM categoria_producto")[0]
+        self.meses = [
+            (int(m[:4]), int(m[5:]))
+            for (m,) in DB.fetch_all("SELECT DISTINCT to_char(fecha, 'YYYY-MM') FROM compras")
+        ] or [(date.today().year, date.today().month)]
+
+    def cliente(self):
+        """Cliente con sesión iniciada como el usuario 'bench'."""
+        cliente = self.app.test_client()
+        with cliente.session_transaction() as sesion:
+            sesion["usuario_id"] = 1
+            sesion["usuario_nombre"] = "bench"
+            sesion["usuario_rol"] = "Administrador"
+        return cliente
+
+    def e_productos_pagina(self, c, rng) -> int:
+        r = c.get("/productos_filtro", query_string={"limite": 50, "categoria": rng.randrange(1, self.max_categoria + 1)})
+        siguiente = r.get_json().get("siguiente") if r.status_code == 200 else None
+        if siguiente:
+            r = c.get("/productos_filtro", query_string={"limite": 50, "cursor": siguiente})
+        return r.status_code
+
+    def e_productos_busqueda(self, c, rng) -> int:
+        q = rng.choice(("arroz", "leche", "jab", "café 1kg", "salsa", "75000000"))
+        return c.get("/productos_filtro", query_string={"limite": 50, "q": q}).status_code
+
+    def e_categorias_crud(self, c, rng) -> int:
+        nombre = f"Bench {threading.get_ident()} {rng.random():.12f}"
+        r = c.post("/agregar_categoria", json={"nombre": nombre})
+        if r.status_code != 200:
+            return r.status_code
+        categorias = c.get("/categorias").get_json()
+        id_cat = next(x["id"] for x in categorias if x["nombre"] == nombre)
+        r = c.put(f"/editar_categoria/{id_cat}", json={"nombre": nombre + " (ed)"})
+        if r.status_code != 200:
+            return r.status_code
+        return c.delete(f"/eliminar_categoria/{id_cat}").status_code
+
+    def e_login(self, c, rng) -> int:
+        r = self.app.test_client().post("/auth/login", data={"usuario": "bench", "contrasena": CONTRASENA_BENCH})
+        return r.status_code
+
+    def e_compras_listado(self, c, rng) -> int:
+        anio, mes = rng.choice(self.meses)
+        r = c.get("/api/compras", query_string={"limite": 100, "desde": f"{anio}-{mes:02d}-01"})
+        return r.status_code
+
+    def e_reportes(self, c, rng) -> int:
+        anio, mes = rng.choice(self.meses)
+        tipo, agrupar = rng.choice((("ventas", "dia"), ("ventas", "categoria"), ("ventas", "metodo_pago"),
+                                    ("compras", "mes"), ("compras", "proveedor")))
+        r = c.get(f"/api/reportes/{tipo}", query_string={
+            "agrupar": agrupar, "desde": f"{anio}-{mes:02d}-01", "hasta": f"{anio}-{mes:02d}-28"})
+        return r.status_code
+
+    def e_inventario(self, c, rng) -> int:
+        return c.get("/api/inventario", query_string={"limite": 100}).status_code
+
+    @classmethod
+    def nombres(cls) -> List[str]:
+        return [n[2:] for n in dir(cls) if n.startswith("e_")]
+
+    def ejecutar(self, nombre: str, peticiones: int, hilos: int) -> Dict:
+        """Corre ``peticiones`` iteraciones del escenario repartidas en ``hilos``."""
+        funcion: Callable = getattr(self, "e_" + nombre)
+        latencias: List[float] = []
+        errores = 0
+        lock = threading.Lock()
+        restantes = iter(range(peticiones))
+
+        def trabajador(indice: int):
+            nonlocal errores
+            c = self.cliente()
+            rng = random.Random(f"{self.semilla}-{nombre}-{indice}")
+            while True:
+                with lock:
+                    if next(restantes, None) is None:
+                        return
+                inicio = time.perf_counter()
+                try:
+                    ok = funcion(c, rng) < 400
+                except Exception as e:  # el reporte cuenta el error y sigue
+                    print(f"  {nombre}: {e!r}")
+                    ok = False
+                duracion = time.perf_counter() - inicio
+                with lock:
+                    latencias.append(duracion)
+                    errores += not ok
+
+        # Una pasada de calentamiento (cachés, planes) que no se mide
+        funcion(self.cliente(), random.Random(0))
+        inicio = time.perf_counter()
+        grupo = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+        for h in grupo:
+            h.start()
+        for h in grupo:
+            h.join()
+        total = time.perf_counter() - inicio
+
+        latencias.sort()
+        return {
+            "peticiones": len(latencias),
+            "errores": errores,
+            "hilos": hilos,
+            "por_segundo": round(len(latencias) / total, 2) if total else 0.0,
+            "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+            "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+            "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+        }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark reproducible de la aplicación BDTJM")
+    parser.add_argument("--escala", type=float, default=1.0, help="1.0 ≈ 100k productos y 2M filas de detalle")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--peticiones", type=int, default=500, help="por escenario")
+    parser.add_argument("--hilos", type=int, default=1)
+    parser.add_argument("--escenarios", default=",".join(Escenarios.nombres()))
+    parser.add_argument("--base", help="nombre de la base desechable (por defecto bench_<fecha>)")
+    parser.add_argument("--sin-carga", action="store_true", help="usar una base ya cargada (no se elimina)")
+    parser.add_argument("--conservar", action="store_true", help="no eliminar la base al terminar")
+    parser.add_argument("--salida", help="archivo JSON del reporte (por defecto, salida estándar)")
+    parser.add_argument("--planes", type=int, metavar="UMBRAL",
+                        help="al terminar, buscar Seq Scan en tablas de más de UMBRAL filas (ver verificar-planes)")
+    args = parser.parse_args()
+
+    nombre = args.base or datetime.now().strftime("bench_%Y%m%d_%H%M%S")
+    if not args.sin_carga:
+        crear_base(nombre)
+    Config.PG_DB = nombre
+
+    reporte: Dict = {
+        "commit": _commit(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "base": nombre,
+        "escala": args.escala,
+        "semilla": args.semilla,
+    }
+    try:
+        from backend import seguridad
+        from backend.app import crear_app
+
+        # El limitador de intentos cortaría el escenario de login
+        seguridad.limitador_ip.maximo = seguridad.limitador_usuario.maximo = 10**9
+        # Las tareas en segundo plano (vencer lotes, consolidar) cambiarían los datos a mitad de la medición
+        Config.PLANIFICADOR = False
+        DB.init_app(Config, maxconn=max(Config.PG_POOL_MAX, args.hilos + 2))
+        if not args.sin_carga:
+            reporte.update(preparar(Escala.de_factor(args.escala), args.semilla))
+        app = crear_app()
+        escenarios = Escenarios(app, args.semilla)
+        reporte["escenarios"] = {}
+        for escenario in args.escenarios.split(","):
+            print(f"Escenario {escenario}...")
+            reporte["escenarios"][escenario] = escenarios.ejecutar(escenario, args.peticiones, args.hilos)
+        reporte["pool"] = DB.estadisticas_pool()
+        if args.planes is not None:
+            from backend.migraciones import planes
+
+            reporte["planes"] = [p for p in planes.verificar(args.planes) if not p["ok"]]
+    finally:
+        pool = DB.get_pool()
+        if pool is not None:
+            pool.closeall()
+        if not (args.conservar or args.sin_carga):
+            eliminar_base(nombre)
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False, default=str)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+        print(f"Reporte escrito en {args.salida}")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Caché en memoria (por proceso) para tablas de referencia pequeñas.
+
+Categorías, proveedores y roles cambian poco y se leen en cada carga de
+pantalla. ``cache_referencia`` los guarda con un tiempo de vida (TTL) y un
+máximo de entradas; los manejadores que los modifican llaman a
+``invalidar`` con el prefijo correspondiente.
+
+Cada proceso tiene su propia caché: con varios workers, el TTL acota
+cuánto puede tardar un worker en ver un cambio hecho en otro.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+from backend.config import Config
+
+
+class Entrada(NamedTuple):
+    """Valor cacheado junto con su instante de carga."""
+    valor: Any
+    cargado_en: float      # time.monotonic(), para el TTL
+    modificado: float      # time.time(), para la cabecera Last-Modified
+
+
+class CacheTTL:
+    """Caché LRU con tiempo de vida, segura entre hilos, de lectura a través (read-through)."""
+
+    def __init__(self, ttl: float, max_entradas: int) -> None:
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[Hashable, Entrada]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Se incrementa en cada invalidación; una carga que empezó antes de
+        # una invalidación no guarda su resultado (podría estar desactualizado).
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable, cargar: Callable[[], Any]) -> Entrada:
+        """Devuelve la entrada de ``clave``; si falta o caducó, la carga con ``cargar()``."""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and ahora - entrada.cargado_en < self.ttl:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada
+            self.fallos += 1
+            generacion = self._generacion
+
+        # La carga (consulta a la BD) se hace sin tener el candado
+        entrada = Entrada(cargar(), time.monotonic(), time.time())
+
+        with self._lock:
+            if generacion == self._generacion:
+                self._datos[clave] = entrada
+                self._datos.move_to_end(clave)
+                while len(self._datos) > self.max_entradas:
+                    self._datos.popitem(last=False)
+        return entrada
+
+    def invalidar(self, *prefijos: str) -> None:
+        """Descarta las entradas cuya clave empieza por alguno de los prefijos (todas si no se indican)."""
+        with self._lock:
+            self._generacion += 1
+            if not prefijos:
+                self._datos.clear()
+                return
+            for clave in list(self._datos):
+                if isinstance(clave, str) and clave.startswith(prefijos):
+                    del self._datos[clave]
+
+
+cache_referencia = CacheTTL(ttl=Config.CACHE_REF_TTL, max_entradas=Config.CACHE_REF_MAX)
+
+# Resultados del buscador de productos por texto tecleado: TTL corto, muchas entradas
+cache_busqueda = CacheTTL(ttl=Config.CACHE_BUSQUEDA_TTL, max_entradas=Config.CACHE_BUSQUEDA_MAX)
+
+# Indicadores del menú principal: una sola entrada, igual para todos los usuarios
+cache_dashboard = CacheTTL(ttl=Config.DASHBOARD_TTL, max_entradas=1)
@@ -0,0 +1,86 @@
+"""Comandos de línea de órdenes (flask CLI) de la aplicación.
+
+Ejemplos:
+    flask --app backend.app:crear_app migrar
+    flask --app backend.app:crear_app verificar-planes --umbral 10000
+    flask --app backend.app:crear_app conciliar-inventario --corregir
+    flask --app backend.app:crear_app purgar-bajas --dias 30
+    flask --app backend.app:crear_app consolidar-reportes --rehacer --desde 2024-01-01
+"""
+
+import click
+from flask import Flask
+from backend import migraciones, sincronizacion
+from backend.migraciones import planes
+from backend.modelos.inventario_modelo import Inventario
+from backend.modelos.reporte_modelo import ConsolidacionEnCursoError, Reporte
+
+
+def registrar_comandos(app: Flask) -> None:
+    """Registra los comandos CLI en la aplicación."""
+
+    @app.cli.command("migrar")
+    def migrar():
+        """Aplica las migraciones pendientes del esquema."""
+        hechas = migraciones.aplicar()
+        if not hechas:
+            click.echo("El esquema ya está al día.")
+
+    @app.cli.command("verificar-planes")
+    @click.option("--umbral", default=10000, show_default=True,
+                  help="Filas a partir de las cuales un Seq Scan se considera un fallo.")
+    def verificar_planes(umbral):
+        """Ejecuta EXPLAIN sobre las consultas de la app y falla si hay Seq Scan en tablas grandes."""
+        fallos = 0
+        for item in planes.verificar(umbral):
+            if item["ok"]:
+                click.echo(f"OK     {item['consulta']}")
+            elif "error" in item:
+                fallos += 1
+                click.echo(f"ERROR  {item['consulta']}: {item['error']}")
+            else:
+                fallos += 1
+                detalle = ", ".join(f"{t} (~{n} filas)" for t, n in item["seq_scans"])
+                click.echo(f"FALLA  {item['consulta']}: Seq Scan sobre {detalle}")
+        if fallos:
+            raise SystemExit(1)
+
+    @app.cli.command("conciliar-inventario")
+    @click.option("--corregir", is_flag=True, help="Reescribe el resumen con la suma real de los lotes.")
+    def conciliar_inventario(corregir):
+        """Compara el stock (resumen más movimientos pendientes) con la suma de lotes y reporta (o corrige) las diferencias."""
+        diferencias = Inventario.conciliar(corregir=corregir)
+        for d in diferencias:
+            click.echo(f"Producto {d['id_producto']}: resumen={d['resumen']} real={d['real']}")
+        if not diferencias:
+            click.echo("El resumen de inventario coincide con los lotes.")
+        elif corregir:
+            click.echo(f"{len(diferencias)} productos corregidos.")
+        else:
+            raise SystemExit(1)
+
+    @app.cli.command("purgar-bajas")
+    @click.option("--dias", default=sincronizacion.DIAS_BAJAS, show_default=True,
+                  help="Antigüedad mínima de las lápidas a borrar.")
+    def purgar_bajas(dias):
+        """Borra lápidas viejas de la sincronización incremental (los clientes más atrasados descargan todo)."""
+        borradas = sincronizacion.purgar_bajas(dias)
+        click.echo(f"{borradas} lápidas borradas.")
+
+    @app.cli.command("consolidar-reportes")
+    @click.option("--rehacer", is_flag=True, help="Recalcula todos los días con datos del rango, no solo los pendientes.")
+    @click.option("--desde", type=click.DateTime(formats=["%Y-%m-%d"]), help="Con --rehacer: primer día.")
+    @click.option("--hasta", type=click.DateTime(formats=["%Y-%m-%d"]), help="Último día a consolidar (por defecto, ayer).")
+    def consolidar_reportes(rehacer, desde, hasta):
+        """Actualiza los resúmenes diarios de ventas y compras de los días cerrados."""
+        desde = desde.date() if desde else None
+        hasta = hasta.date() if hasta else None
+        if rehacer:
+            Reporte.marcar(desde, hasta)
+        try:
+            hechos = Reporte.consolidar(hasta)
+        except ConsolidacionEnCursoError as e:
+            click.echo(str(e))
+            raise SystemExit(1)
+        for tipo, dias in hechos.items():
+            click.echo(f"{tipo}: {dias} días consolidados.")
@@ -0,0 +1,118 @@
+"""Compresión gzip/brotli de las respuestas.
+
+``init_app`` registra un ``after_request`` que comprime las respuestas de
+texto (JSON, CSV, HTML, texto plano) cuando el cliente lo acepta en
+``Accept-Encoding``. Se prefiere brotli si el paquete ``brotli`` está
+instalado; si no, gzip.
+
+- Respuestas normales: se comprimen enteras si miden al menos
+  ``COMPRESION_MIN`` bytes.
+- Respuestas en streaming (``json_stream``, ``csv_stream``): cada trozo se
+  comprime y se vacía al momento, así el cliente sigue recibiendo datos
+  mientras la consulta avanza.
+- No se tocan los eventos SSE, los archivos (``direct_passthrough``), las
+  respuestas que ya traen ``Content-Encoding`` (``json_cacheable`` guarda en
+  caché sus versiones comprimidas) ni las de HEAD, 204 o 304.
+
+Como el mismo contenido viaja con distintas codificaciones, se agrega
+``Vary: Accept-Encoding`` y el ETag pasa a ser débil.
+"""
+
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+from backend.config import Config
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él se usa solo gzip
+    brotli = None
+
+_TIPOS = {"application/json", "text/csv", "text/html", "text/plain"}
+
+
+def elegir(tam: Optional[int] = None) -> Optional[str]:
+    """
+    Devuelve "br", "gzip" o None según ``Accept-Encoding`` y la configuración.
+
+    Args:
+        tam (int, opcional): Tamaño del cuerpo; None si no se conoce (streaming).
+    """
+    if not Config.COMPRESION or (tam is not None and tam < Config.COMPRESION_MIN):
+        return None
+    aceptadas = request.accept_encodings
+    if brotli is not None and aceptadas.quality("br") > 0:
+        return "br"
+    if aceptadas.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+def comprimir(datos: bytes, codificacion: str) -> bytes:
+    """Comprime ``datos`` de una vez con la codificación dada."""
+    if codificacion == "br":
+        return brotli.compress(datos, quality=Config.COMPRESION_NIVEL)
+    compresor = zlib.compressobj(Config.COMPRESION_NIVEL, zlib.DEFLATED, 31)  # 31: cabecera gzip
+    return compresor.compress(datos) + compresor.flush()
+
+
+def _comprimir_stream(trozos: Iterable, codificacion: str) -> Iterator[bytes]:
+    """Comprime los trozos de una respuesta en streaming, vaciando tras cada uno."""
+    if codificacion == "br":
+        compresor = brotli.Compressor(quality=Config.COMPRESION_NIVEL)
+        procesar = lambda d: compresor.process(d) + compresor.flush()
+        terminar = compresor.finish
+    else:
+        compresor = zlib.compressobj(Config.COMPRESION_NIVEL, zlib.DEFLATED, 31)
+        procesar = lambda d: compresor.compress(d) + compresor.flush(zlib.Z_SYNC_FLUSH)
+        terminar = compresor.flush
+    try:
+        for trozo in trozos:
+            if isinstance(trozo, str):
+                trozo = trozo.encode("utf-8")
+            if trozo:
+                yield procesar(trozo)
+        yield terminar()
+    finally:
+        cerrar = getattr(trozos, "close", None)
+        if cerrar is not None:
+            cerrar()
+
+
+def _comprimir_respuesta(respuesta: Response) -> Response:
+    if (
+        request.method == "HEAD"
+        or respuesta.status_code < 200
+        or respuesta.status_code in (204, 304)
+        or respuesta.direct_passthrough
+        or "Content-Encoding" in respuesta.headers
+        or respuesta.mimetype not in _TIPOS
+    ):
+        return respuesta
+
+    if respuesta.is_streamed:
+        codificacion = elegir()
+        if codificacion is None:
+            return respuesta
+        respuesta.response = _comprimir_stream(respuesta.response, codificacion)
+        respuesta.headers.pop("Content-Length", None)
+    else:
+        datos = respuesta.get_data()
+        codificacion = elegir(len(datos))
+        if codificacion is None:
+            return respuesta
+        respuesta.set_data(comprimir(datos, codificacion))
+
+    respuesta.headers["Content-Encoding"] = codificacion
+    respuesta.vary.add("Accept-Encoding")
+    etag, debil = respuesta.get_etag()
+    if etag and not debil:
+        respuesta.set_etag(etag, weak=True)
+    return respuesta
+
+
+def init_app(app: Flask) -> None:
+    """Registra la compresión de respuestas (si ``Config.COMPRESION`` está activo)."""
+    if Config.COMPRESION:
+        app.after_request(_comprimir_respuesta)
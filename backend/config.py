@@ -22,6 +22,102 @@ class Config:
     PG_USER: str = os.getenv("PG_USER", "postgres")
     PG_PASS: str = os.getenv("PG_PASS", "root")
 
+    # Pool de conexiones
+    PG_POOL_MIN: int = int(os.getenv("PG_POOL_MIN", "1"))
+    PG_POOL_MAX: int = int(os.getenv("PG_POOL_MAX", "10"))
+    PG_POOL_TIMEOUT: float = float(os.getenv("PG_POOL_TIMEOUT", "10"))   # seg. esperando conexión libre
+    PG_POOL_IDLE: float = float(os.getenv("PG_POOL_IDLE", "300"))        # seg. ociosa antes de reciclarla
+    PG_POOL_VALIDAR: float = float(os.getenv("PG_POOL_VALIDAR", "30"))   # seg. ociosa antes de hacer SELECT 1
+    # Consultas con nombre preparadas en cada conexión (ver DB.registrar). Desactivar
+    # detrás de un pgbouncer en modo transacción, que no conserva las sentencias preparadas.
+    PG_PREPARADAS: bool = os.getenv("PG_PREPARADAS", "1") == "1"
+    PG_PREPARADAS_MAX: int = int(os.getenv("PG_PREPARADAS_MAX", "100"))  # por conexión (LRU)
+    # Réplicas de lectura (ver backend/replicas.py): DSNs separados por ";", p. ej.
+    # "host=replica1;host=replica2 port=5433". Lo que no indiquen se toma de la primaria.
+    PG_REPLICAS: str = os.getenv("PG_REPLICAS", "")
+    PG_REPLICA_POOL_MAX: int = int(os.getenv("PG_REPLICA_POOL_MAX", os.getenv("PG_POOL_MAX", "10")))  # por réplica
+    PG_REPLICA_VERIFICAR: float = float(os.getenv("PG_REPLICA_VERIFICAR", "5"))       # seg. entre revisiones de salud
+    PG_REPLICA_RETRASO_MAX: float = float(os.getenv("PG_REPLICA_RETRASO_MAX", "30"))   # seg.; más atrasada no se usa (0 = sin límite)
+    PG_PRIMARIA_TRAS_ESCRIBIR: float = float(os.getenv("PG_PRIMARIA_TRAS_ESCRIBIR", "5"))  # seg. que una sesión lee de la primaria tras escribir
+
+    # Caché de tablas de referencia (categorías, proveedores, roles)
+    CACHE_REF_TTL: float = float(os.getenv("CACHE_REF_TTL", "300"))  # segundos
+    CACHE_REF_MAX: int = int(os.getenv("CACHE_REF_MAX", "64"))       # entradas
+    CACHE_BUSQUEDA_TTL: float = float(os.getenv("CACHE_BUSQUEDA_TTL", "30"))
+    CACHE_BUSQUEDA_MAX: int = int(os.getenv("CACHE_BUSQUEDA_MAX", "2048"))
+
+    # Contraseñas (bcrypt en un pool de procesos) y límite de intentos de login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_WORKERS: int = int(os.getenv("BCRYPT_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    BCRYPT_COLA_MAX: int = int(os.getenv("BCRYPT_COLA_MAX", "32"))     # verificaciones en curso/espera
+    BCRYPT_ESPERA: float = float(os.getenv("BCRYPT_ESPERA", "2"))      # seg. esperando lugar en la cola
+    LOGIN_MAX_IP: int = int(os.getenv("LOGIN_MAX_IP", "30"))
+    LOGIN_VENTANA_IP: float = float(os.getenv("LOGIN_VENTANA_IP", "60"))
+    LOGIN_MAX_USUARIO: int = int(os.getenv("LOGIN_MAX_USUARIO", "5"))
+    LOGIN_VENTANA_USUARIO: float = float(os.getenv("LOGIN_VENTANA_USUARIO", "300"))
+    # Proxies de confianza delante de la app (nginx, balanceador): con N > 0 la
+    # IP del cliente sale de X-Forwarded-For (ProxyFix), si no todos comparten
+    # la IP del proxy en el límite por IP. 0 = la app recibe las conexiones directo
+    PROXY_SALTOS: int = int(os.getenv("PROXY_SALTOS", "0"))
+
+    # Métricas Prometheus en /metrics y log de consultas lentas (0 = sin log)
+    METRICAS: bool = os.getenv("METRICAS", "1") == "1"
+    SQL_LENTA_MS: float = float(os.getenv("SQL_LENTA_MS", "250"))
+
+    # Segundos entre recargas completas del índice de códigos de barras (0 = nunca)
+    INDICE_CODIGOS_REFRESCO: float = float(os.getenv("INDICE_CODIGOS_REFRESCO", "60"))
+
+    # Flujo de cambios en vivo (LISTEN/NOTIFY → Server-Sent Events, ver backend/notificaciones.py)
+    NOTIFICACIONES: bool = os.getenv("NOTIFICACIONES", "1") == "1"
+    # En producción el flujo lo sirve gunicorn_sse_conf.py (gevent), que fija su
+    # propio tope. Servido por un worker gthread, cada cliente ocupa un hilo: el
+    # tope por proceso deja siempre SSE_HILOS_LIBRES hilos para las demás peticiones
+    GUNICORN_THREADS: int = int(os.getenv("GUNICORN_THREADS", "4"))      # hilos por worker (gunicorn_conf.py)
+    SSE_HILOS_LIBRES: int = int(os.getenv("SSE_HILOS_LIBRES", "2"))      # hilos que el flujo nunca ocupa
+    SSE_MAX_CLIENTES: int = min(
+        int(os.getenv("SSE_MAX_CLIENTES", "50")), max(0, GUNICORN_THREADS - SSE_HILOS_LIBRES)
+    )  # por proceso
+    SSE_TAM_COLA: int = int(os.getenv("SSE_TAM_COLA", "100"))            # eventos pendientes por cliente
+    SSE_LATIDO: float = float(os.getenv("SSE_LATIDO", "15"))             # seg. entre comentarios de latido
+    SSE_DURACION_MAX: float = float(os.getenv("SSE_DURACION_MAX", "300"))  # seg. antes de forzar reconexión
+
+    # Dashboard del menú (/api/dashboard): indicadores en paralelo y caché compartida
+    DASHBOARD_TTL: float = float(os.getenv("DASHBOARD_TTL", "15"))            # segundos en caché
+    DASHBOARD_HILOS: int = int(os.getenv("DASHBOARD_HILOS", "5"))             # consultas simultáneas por proceso
+    DASHBOARD_TIMEOUT: float = float(os.getenv("DASHBOARD_TIMEOUT", "5"))     # seg. máximos por armado
+    DASHBOARD_DIAS_VENCIMIENTO: int = int(os.getenv("DASHBOARD_DIAS_VENCIMIENTO", "7"))
+    DASHBOARD_DIAS_TOP: int = int(os.getenv("DASHBOARD_DIAS_TOP", "30"))      # ventana de los más vendidos
+    DASHBOARD_TOP: int = int(os.getenv("DASHBOARD_TOP", "5"))
+
+    # Planificador de tareas en segundo plano (ver backend/planificador.py); corre en un solo worker
+    PLANIFICADOR: bool = os.getenv("PLANIFICADOR", "1") == "1"
+    PLANIFICADOR_VUELTA: float = float(os.getenv("PLANIFICADOR_VUELTA", "30"))        # seg. entre revisiones
+    HORARIO_TIENDA: str = os.getenv("HORARIO_TIENDA", "08-21")                        # horas "desde-hasta" ("" = sin horario)
+    VENCIMIENTO_INTERVALO: float = float(os.getenv("VENCIMIENTO_INTERVALO", "600"))   # seg. entre pasadas
+    VENCIMIENTO_LOTE: int = int(os.getenv("VENCIMIENTO_LOTE", "200"))                 # lotes por transacción
+    VENCIMIENTO_PAUSA: float = float(os.getenv("VENCIMIENTO_PAUSA", "0.5"))           # seg. entre tandas en horario
+    VENCIMIENTO_AVISO_DIAS: int = int(os.getenv("VENCIMIENTO_AVISO_DIAS", "7"))
+    STOCK_CONSOLIDAR_INTERVALO: float = float(os.getenv("STOCK_CONSOLIDAR_INTERVALO", "60"))  # seg. entre pasadas
+    STOCK_CONSOLIDAR_LOTE: int = int(os.getenv("STOCK_CONSOLIDAR_LOTE", "5000"))               # movimientos por transacción
+
+    # Sugerencia de reposición (ABC y punto de reorden, ver backend/analitica.py)
+    ANALITICA_DIAS: int = int(os.getenv("ANALITICA_DIAS", "90"))                    # historial de ventas
+    ANALITICA_DIAS_ENTREGA: int = int(os.getenv("ANALITICA_DIAS_ENTREGA", "7"))     # tiempo de entrega del proveedor
+    ANALITICA_DIAS_REVISION: int = int(os.getenv("ANALITICA_DIAS_REVISION", "7"))   # cada cuánto se hacen pedidos
+    ANALITICA_TTL: float = float(os.getenv("ANALITICA_TTL", "900"))                 # seg. que vale un cálculo
+    ANALITICA_TIMEOUT: float = float(os.getenv("ANALITICA_TIMEOUT", "600"))         # seg. antes de dar por perdido un cálculo
+
+    # Compresión de respuestas (ver backend/compresion.py); brotli si está instalado, si no gzip
+    COMPRESION: bool = os.getenv("COMPRESION", "1") == "1"
+    COMPRESION_MIN: int = int(os.getenv("COMPRESION_MIN", "1024"))      # bytes; menos no vale la pena
+    COMPRESION_NIVEL: int = int(os.getenv("COMPRESION_NIVEL", "5"))     # gzip 1-9 / brotli 0-11
+
+    # Segundos que un worker espera a que se devuelvan las conexiones al apagarse
+    APAGADO_TIMEOUT: float = float(os.getenv("APAGADO_TIMEOUT", "25"))
+
+    # Aplica las migraciones pendientes al crear la app (ver backend/migraciones)
+    MIGRAR_AL_INICIAR: bool = os.getenv("MIGRAR_AL_INICIAR", "0") == "1"
+
     @classmethod
     def dsn(cls) -> str:
         """Devuelve el DSN listo para psycopg2 / pools."""
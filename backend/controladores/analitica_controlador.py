@@ -0,0 +1,64 @@
+"""
+Controlador de analítica de inventario.
+
+- GET /api/analitica/reposicion?dias=&entrega=&revision=: clase ABC, punto de
+  reorden y cantidad sugerida por producto. Mientras el cálculo corre en el
+  proceso de analítica responde 202 (volver a consultar tras Retry-After).
+- POST /api/analitica/reposicion/aplicar: copia el punto de reorden sugerido
+  a stock_minimo: {"dias", "entrega", "revision", "clases": [...], "ids": [...]}.
+"""
+
+from flask import Blueprint, Response, jsonify, request
+from backend import analitica
+from backend.cache import cache_dashboard
+from backend.utils.decoradores import api_login_requerido
+
+analitica_bp = Blueprint("analitica", __name__, url_prefix="/api/analitica")
+
+
+@analitica_bp.route("/reposicion", methods=["GET"])
+@api_login_requerido
+def reposicion():
+    try:
+        params = analitica.parametros(
+            request.args.get("dias", type=int),
+            request.args.get("entrega", type=int),
+            request.args.get("revision", type=int),
+        )
+        estado, datos = analitica.solicitar(params)
+        if estado == "listo":
+            # Ya viene serializado desde analitica_reposicion
+            return Response(datos, mimetype="application/json")
+        if estado == "error":
+            return jsonify({"status": "error", "mensaje": datos["mensaje"]}), 500
+        respuesta = jsonify({"status": "calculando"})
+        respuesta.status_code = 202
+        respuesta.headers["Retry-After"] = "2"
+        return respuesta
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error en sugerencia de reposición:", e)
+        return jsonify({"status": "error"}), 500
+
+
+@analitica_bp.route("/reposicion/aplicar", methods=["POST"])
+@api_login_requerido
+def aplicar_reposicion():
+    try:
+        data = request.get_json(silent=True) or {}
+        params = analitica.parametros(data.get("dias"), data.get("entrega"), data.get("revision"))
+        ids = data.get("ids")
+        if ids is not None and not isinstance(ids, list):
+            raise ValueError("ids debe ser una lista")
+        modificados = analitica.aplicar(params, data.get("clases") or analitica.CLASES, ids)
+        if modificados:
+            cache_dashboard.invalidar()
+        return jsonify({"status": "ok", "actualizados": len(modificados), "ids": modificados})
+    except (ValueError, TypeError) as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except LookupError as le:
+        return jsonify({"status": "error", "mensaje": str(le)}), 409
+    except Exception as e:
+        print("Error aplicando sugerencia de reposición:", e)
+        return jsonify({"status": "error"}), 500
@@ -17,8 +17,8 @@ import re
 import psycopg2
 from flask import session, Blueprint, render_template, request, redirect, url_for, flash, make_response
 from backend.modelos.usuario_modelo import Usuario
+from backend import seguridad
 from backend.utils.decoradores import login_requerido
-from backend.db import DB
 
 
 # Blueprint para las rutas de autenticación
@@ -36,8 +36,30 @@ def login():
         usuario = request.form.get("usuario")
         contrasena = request.form.get("contrasena")
 
-        user = Usuario.autenticar(usuario, contrasena)
+        # Límite de intentos por IP (todas las peticiones) y por usuario (solo fallos).
+        # Detrás de un proxy remote_addr es la IP real solo con PROXY_SALTOS configurado
+        clave_ip = f"ip:{request.remote_addr}"
+        clave_usuario = f"usuario:{(usuario or '').lower()}"
+        for limitador, clave in ((seguridad.limitador_ip, clave_ip),
+                                 (seguridad.limitador_usuario, clave_usuario)):
+            bloqueado, espera = limitador.bloqueado(clave)
+            if bloqueado:
+                flash(f"Demasiados intentos. Intente de nuevo en {int(espera) + 1} segundos.", "warning")
+                response = make_response(render_template("auth/index.html"), 429)
+                response.headers["Retry-After"] = str(int(espera) + 1)
+                return response
+        seguridad.limitador_ip.registrar(clave_ip)
+
+        try:
+            user = Usuario.autenticar(usuario, contrasena)
+        except seguridad.ServicioSaturadoError:
+            flash("El servidor está ocupado, intente de nuevo en unos segundos.", "warning")
+            response = make_response(render_template("auth/index.html"), 503)
+            response.headers["Retry-After"] = "2"
+            return response
+
         if user:
+            seguridad.limitador_usuario.reiniciar(clave_usuario)
             session["usuario_id"] = user.id_usuario
             session["usuario_nombre"] = user.nom_usuario
             session["usuario_rol"] = Usuario.obtener_nombre_rol(user.id_rol)
@@ -45,6 +67,7 @@ def login():
             flash("Inicio de sesión exitoso", "success")
             return redirect(url_for("auth.menu"))
 
+        seguridad.limitador_usuario.registrar(clave_usuario)
         flash("Usuario o contraseña incorrectos", "danger")
     return render_template("auth/index.html")
 
@@ -94,7 +117,7 @@ def registro():
                 flash(str(e), "warning")
 
     usuarios = Usuario.obtener_todos()
-    roles = DB.fetch_all("SELECT id_rol, nom_rol FROM rol ORDER BY id_rol")
+    roles = Usuario.listar_roles()
 
     return render_template("auth/usuarios.html", usuarios=usuarios, roles=roles)
 
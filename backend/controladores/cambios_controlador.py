@@ -0,0 +1,52 @@
+"""
+Controlador del flujo de cambios en vivo.
+
+- GET /api/cambios?tablas=producto,proveedores: Server-Sent Events con los
+  cambios de esas tablas (por defecto, todas). Cada evento ``cambio`` trae
+  {"tabla", "op", "ids", "filas"}; ``recargar`` pide a la página que vuelva
+  a pedir la lista completa (se perdieron avisos).
+- Al reconectar, la versión del último evento (``Last-Event-ID``, o
+  ``?since=`` si la página abre un flujo nuevo) hace que el flujo empiece con
+  los cambios ocurridos desde entonces.
+
+En producción lo sirve un proceso aparte con workers gevent
+(gunicorn_sse_conf.py): un cliente conectado no ocupa un hilo de los
+workers de la aplicación. Servido desde un worker gthread, cada cliente sí
+ocupa un hilo, y el número por proceso queda por debajo de
+``GUNICORN_THREADS`` (``SSE_MAX_CLIENTES``). Sin lugar se responde 503 con
+``Retry-After`` y la página vuelve a intentar más tarde.
+"""
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from backend.config import Config
+from backend.notificaciones import TABLAS, flujo_sse, oyente
+from backend.utils.decoradores import api_login_requerido
+
+cambios_bp = Blueprint("cambios", __name__)
+
+
+@cambios_bp.route("/api/cambios", methods=["GET"])
+@api_login_requerido
+def cambios():
+    if not Config.NOTIFICACIONES:
+        return jsonify({"status": "error", "mensaje": "Flujo de cambios desactivado"}), 404
+    pedidas = [t.strip() for t in request.args.get("tablas", "").split(",") if t.strip()]
+    invalidas = [t for t in pedidas if t not in TABLAS]
+    if invalidas:
+        return jsonify({"status": "error", "mensaje": f"Tablas no válidas: {', '.join(invalidas)}"}), 400
+
+    desde = request.headers.get("Last-Event-ID") or request.args.get("since")
+    if desde is not None and not desde.isdigit():
+        return jsonify({"status": "error", "mensaje": "since debe ser la versión de un evento anterior"}), 400
+
+    try:
+        suscripcion = oyente.suscribir(pedidas or TABLAS)
+    except OverflowError as e:
+        return jsonify({"status": "error", "mensaje": str(e)}), 503, {"Retry-After": "10"}
+
+    respuesta = Response(stream_with_context(flujo_sse(suscripcion, int(desde) if desde is not None else None)), mimetype="text/event-stream")
+    respuesta.headers["Cache-Control"] = "no-cache"
+    respuesta.headers["X-Accel-Buffering"] = "no"  # sin buffer en nginx
+    # Si el cliente se va antes de leer el primer evento el generador no corre su finally
+    respuesta.call_on_close(lambda: oyente.cancelar(suscripcion))
+    return respuesta
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from backend.modelos.cate_modelo import Categoria
+from backend.sincronizacion import leer_since
+from backend.utils.decoradores import lectura_en_replica
+from backend.utils.respuestas import json_cacheable
 
 cate_bp = Blueprint("categoria", __name__)
 
@@ -20,10 +23,15 @@ def agregar_categoria():
         return jsonify({"status": "error", "mensaje": "Error interno del servidor"}), 500
 
 @cate_bp.route("/categorias", methods=["GET"])
+@lectura_en_replica
 def listar_categorias():
     try:
-        categorias = Categoria.listar()
-        return jsonify(categorias)
+        desde = leer_since()
+        if desde is not None:
+            return jsonify(Categoria.cambios_desde(desde))
+        return json_cacheable("categorias:por_id", Categoria.listar)
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
     except Exception as e:
         print("Error al obtener categorias:", e)
         return jsonify({"status": "error"}), 500
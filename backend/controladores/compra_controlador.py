@@ -0,0 +1,111 @@
+"""
+Controlador de compras.
+
+Define la API de compras a proveedores:
+- GET  /api/compras: líneas de compra paginadas y filtradas por fecha/proveedor.
+- GET  /api/compras/totales: totales general y mensuales calculados en SQL.
+- POST /api/compras: registra una compra con sus líneas.
+- POST /api/compras/<id>/recibir: marca la compra como recibida y genera los lotes.
+"""
+
+from datetime import date
+from flask import Blueprint, jsonify, request
+from backend.indice_codigos import indice_codigos
+from backend.modelos.compra_modelo import Compra
+from backend.utils.decoradores import api_login_requerido, lectura_en_replica
+
+compra_bp = Blueprint("compras", __name__, url_prefix="/api/compras")
+
+
+def _fecha(valor):
+    """Convierte 'YYYY-MM-DD' en date (None si viene vacío)."""
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {valor}")
+
+
+def _filtros():
+    """Filtros comunes de listado y totales tomados de la query string."""
+    return {
+        "desde": _fecha(request.args.get("desde")),
+        "hasta": _fecha(request.args.get("hasta")),
+        "proveedor": request.args.get("proveedor", default=None, type=int),
+        "proveedor_nombre": request.args.get("proveedor_nombre", "").strip() or None,
+    }
+
+
+@compra_bp.route("", methods=["GET"])
+@api_login_requerido
+@lectura_en_replica
+def listar_compras():
+    try:
+        pagina = Compra.listar(
+            limite=request.args.get("limite", default=100, type=int),
+            cursor=request.args.get("cursor") or None,
+            **_filtros()
+        )
+        return jsonify(pagina)
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error listando compras:", e)
+        return jsonify({"status": "error"}), 500
+
+
+@compra_bp.route("/totales", methods=["GET"])
+@api_login_requerido
+@lectura_en_replica
+def totales_compras():
+    try:
+        return jsonify(Compra.totales(mes=request.args.get("mes") or None, **_filtros()))
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error calculando totales de compras:", e)
+        return jsonify({"status": "error"}), 500
+
+
+@compra_bp.route("", methods=["POST"])
+@api_login_requerido
+def crear_compra():
+    """
+    Cuerpo JSON: {"id_proveedor": 1, "fecha": "2024-05-01",
+                  "items": [{"id_producto": 1, "cantidad": 10, "precio_unitario": 1.25}, ...]}
+    """
+    try:
+        data = request.get_json() or {}
+        resultado = Compra.crear(
+            id_proveedor=int(data["id_proveedor"]),
+            items=data.get("items") or [],
+            fecha=_fecha(data.get("fecha")),
+        )
+        return jsonify({"status": "ok", **resultado}), 201
+    except (KeyError, ValueError) as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error registrando compra:", e)
+        return jsonify({"status": "error", "mensaje": "Error interno del servidor"}), 500
+
+
+@compra_bp.route("/<int:id_compra>/recibir", methods=["POST"])
+@api_login_requerido
+def recibir_compra(id_compra):
+    """
+    Cuerpo JSON: {"vencimientos": {"<id_producto>": "YYYY-MM-DD", ...}}
+    """
+    try:
+        data = request.get_json() or {}
+        vencimientos = {int(k): _fecha(v) for k, v in (data.get("vencimientos") or {}).items()}
+        lotes = Compra.recibir(id_compra, vencimientos)
+        indice_codigos.actualizar(*vencimientos)
+        return jsonify({"status": "ok", "lotes_creados": lotes})
+    except LookupError as le:
+        return jsonify({"status": "error", "mensaje": str(le)}), 404
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error recibiendo compra:", e)
+        return jsonify({"status": "error", "mensaje": "Error interno del servidor"}), 500
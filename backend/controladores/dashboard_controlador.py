@@ -0,0 +1,29 @@
+"""
+Controlador del dashboard del menú principal.
+
+- GET /api/dashboard: indicadores (ventas de hoy, compras del mes, productos
+  bajo el mínimo, lotes por vencer y más vendidos), calculados en paralelo
+  y guardados unos segundos en caché (ver backend/dashboard.py).
+"""
+
+from flask import Blueprint, jsonify
+from backend import dashboard
+from backend.cache import cache_dashboard
+from backend.utils.decoradores import api_login_requerido, lectura_en_replica
+from backend.utils.respuestas import json_cacheable
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+
+@dashboard_bp.route("/api/dashboard", methods=["GET"])
+@api_login_requerido
+@lectura_en_replica
+def obtener_dashboard():
+    try:
+        # Con la caché vencida solo una petición recalcula; las demás esperan su resultado
+        with dashboard._armando:
+            # Vence por tiempo (DASHBOARD_TTL), así que puede armarse desde una réplica
+            return json_cacheable(dashboard.CLAVE_CACHE, dashboard.armar, cache=cache_dashboard, primaria=False)
+    except Exception as e:
+        print("Error armando el dashboard:", e)
+        return jsonify({"status": "error"}), 500
@@ -0,0 +1,74 @@
+"""
+Controlador de inventario.
+
+Define la API de existencias:
+- GET /api/inventario: stock por producto, paginado.
+- GET /api/inventario/bajo_minimo: productos con stock por debajo de stock_minimo.
+- GET /api/inventario/alertas: alertas de vencimiento sin atender (las escribe el planificador).
+- POST /api/inventario/alertas/<id>/atender: marca una alerta como atendida.
+"""
+
+from flask import Blueprint, jsonify, request
+from backend.modelos.inventario_modelo import Inventario
+from backend.utils.decoradores import api_login_requerido, lectura_en_replica
+
+inventario_bp = Blueprint("inventario", __name__, url_prefix="/api/inventario")
+
+
+def _pagina(solo_bajo_minimo: bool):
+    try:
+        pagina = Inventario.listar(
+            limite=request.args.get("limite", default=100, type=int),
+            cursor=request.args.get("cursor") or None,
+            categoria=request.args.get("categoria", default=None, type=int),
+            solo_bajo_minimo=solo_bajo_minimo,
+        )
+        return jsonify(pagina)
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error consultando inventario:", e)
+        return jsonify({"status": "error"}), 500
+
+
+@inventario_bp.route("", methods=["GET"])
+@api_login_requerido
+@lectura_en_replica
+def listar_inventario():
+    return _pagina(solo_bajo_minimo=False)
+
+
+@inventario_bp.route("/bajo_minimo", methods=["GET"])
+@api_login_requerido
+@lectura_en_replica
+def bajo_minimo():
+    return _pagina(solo_bajo_minimo=True)
+
+
+@inventario_bp.route("/alertas", methods=["GET"])
+@api_login_requerido
+@lectura_en_replica
+def alertas_vencimiento():
+    try:
+        return jsonify(Inventario.alertas(
+            limite=request.args.get("limite", default=100, type=int),
+            cursor=request.args.get("cursor") or None,
+            tipo=request.args.get("tipo") or None,
+        ))
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error consultando alertas de vencimiento:", e)
+        return jsonify({"status": "error"}), 500
+
+
+@inventario_bp.route("/alertas/<int:id_alerta>/atender", methods=["POST"])
+@api_login_requerido
+def atender_alerta(id_alerta):
+    try:
+        if not Inventario.atender_alerta(id_alerta):
+            return jsonify({"status": "error", "mensaje": "Alerta no encontrada o ya atendida"}), 404
+        return jsonify({"status": "ok"})
+    except Exception as e:
+        print("Error atendiendo alerta:", e)
+        return jsonify({"status": "error"}), 500
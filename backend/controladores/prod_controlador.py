@@ -1,87 +1,159 @@
 # backend/controladores/prod_controlador.py
-from flask import Blueprint, jsonify, request
+import io
+from itertools import chain
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from psycopg2 import errors
+from backend.cache import cache_busqueda
 from backend.db import DB
+from backend.indice_codigos import indice_codigos
+from backend.modelos.cate_modelo import Categoria
+from backend.modelos.prod_modelo import Producto
+from backend.sincronizacion import leer_since
+from backend.utils.decoradores import lectura_en_replica
+from backend.utils.respuestas import json_cacheable, json_stream
 
 prod_bp = Blueprint("productos", __name__)
 
 @prod_bp.route("/categorias", methods=["GET"])
+@lectura_en_replica
 def obtener_categorias():
     try:
-        # Trae todas las categorías
-        categorias = DB.fetch_all("SELECT id_categoria, nombre FROM categoria_producto ORDER BY nombre")
-        lista = [{"id": cat[0], "nombre": cat[1]} for cat in categorias]
-        return jsonify(lista)
+        # Con ?since= solo las categorías cambiadas (sincronización incremental)
+        desde = leer_since()
+        if desde is not None:
+            return jsonify(Categoria.cambios_desde(desde))
+
+        # Trae todas las categorías (desde la caché si están vigentes)
+        def cargar():
+            return DB.fetch_dicts("SELECT id_categoria AS id, nombre FROM categoria_producto ORDER BY nombre")
+        return json_cacheable("categorias:por_nombre", cargar)
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
     except Exception as e:
         print("Error cargando categorías:", e)
         return jsonify([]), 500
     
 #Obtener los proveedores
 @prod_bp.route("/proveedores", methods=["GET"])
+@lectura_en_replica
 def obtener_proveedores():
     try:
-        # Trae todos los Proveedores
-        proveedores = DB.fetch_all("SELECT id_proveedor, nombre FROM proveedores ORDER BY nombre")
-        lista = [{"id": prov[0], "nombre": prov[1]} for prov in proveedores]
-        return jsonify(lista)
+        # Trae todos los Proveedores (desde la caché si están vigentes)
+        def cargar():
+            return DB.fetch_dicts("SELECT id_proveedor AS id, nombre FROM proveedores ORDER BY nombre")
+        return json_cacheable("proveedores:por_nombre", cargar)
     except Exception as e:
         print("Error cargando proveedores:", e)
         return jsonify([]), 500
     
 #Estraer la informacion de la tabla productos en general
 @prod_bp.route("/productos_filtro", methods=["GET"])
+@lectura_en_replica
 def obtener_productos():
+    """
+    Lista productos con filtros opcionales.
+
+    Filtros: categoria, proveedor, q (busca en nombre, código y descripción),
+    precio_min y precio_max (sobre precio de venta).
+
+    Si se envía ``limite`` o ``cursor`` responde una página
+    {"productos", "siguiente"} paginada por (nombre, id_producto); con
+    ``total=1`` añade ``total_estimado``. Sin esos parámetros devuelve el
+    arreglo completo en streaming (comportamiento anterior).
+
+    Con ``since=<version>`` ignora filtros y paginación y devuelve solo los
+    productos cambiados desde esa versión (ver backend/sincronizacion).
+    """
     try:
-        # Opción de filtrar por categoría
-        categoria_id = request.args.get("categoria", default=None, type=int)
-
-        sql = """
-            SELECT p.id_producto, p.nombre, c.nombre as categoria, pr.nombre as proveedor,
-                   p.precio_compra, p.precio_venta, p.stock_minimo, p.descripcion,
-                   c.id_categoria, pr.id_proveedor
-            FROM producto p
-            JOIN categoria_producto c ON p.id_categoria = c.id_categoria
-            JOIN proveedores pr ON p.id_proveedor = pr.id_proveedor
-        """
-        params = []
-        if categoria_id:
-            sql += " WHERE p.id_categoria = %s"
-            params.append(categoria_id)
-
-        sql += " ORDER BY p.nombre"
-
-        productos = DB.fetch_all(sql, params)
-        lista = [
-            {
-                "id_producto": p[0],
-                "nombre": p[1],
-                "categoria": p[2],
-                "proveedor": p[3],
-                "precio_compra": float(p[4]),
-                "precio_venta": float(p[5]),
-                "stock_minimo": p[6],
-                "descripcion": p[7],
-                "id_categoria": p[8],
-                "id_proveedor": p[9]
-            }
-            for p in productos
-        ]
-        return jsonify(lista)
+        desde = leer_since()
+        if desde is not None:
+            return jsonify(Producto.cambios_desde(desde))
 
+        filtros = {
+            "categoria": request.args.get("categoria", default=None, type=int),
+            "proveedor": request.args.get("proveedor", default=None, type=int),
+            "q": request.args.get("q", default="", type=str).strip() or None,
+            "precio_min": request.args.get("precio_min", default=None, type=float),
+            "precio_max": request.args.get("precio_max", default=None, type=float),
+        }
+
+        if "limite" in request.args or "cursor" in request.args:
+            pagina = Producto.pagina(
+                limite=request.args.get("limite", default=50, type=int),
+                cursor=request.args.get("cursor") or None,
+                descendente=request.args.get("orden", "asc").lower() == "desc",
+                con_total=request.args.get("total") == "1",
+                **filtros
+            )
+            return jsonify(pagina)
+
+        # Se envía fila a fila: no se materializa la lista completa en memoria
+        return json_stream(Producto.iterar(**filtros))
+
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
     except Exception as e:
         print("Error cargando productos:", e)
         return jsonify([]), 500
 
+@prod_bp.route("/productos/importar", methods=["POST"])
+def importar_productos():
+    """
+    Importa productos desde un CSV (campo de formulario ``archivo`` o el
+    cuerpo de la petición con Content-Type text/csv). Inserta los códigos
+    nuevos y actualiza los existentes; responde el reporte de errores por fila.
+    """
+    try:
+        archivo = request.files.get("archivo")
+        binario = archivo.stream if archivo else request.stream
+        texto = io.TextIOWrapper(binario, encoding="utf-8-sig", newline="")
+
+        resultado = Producto.importar_csv(texto)
+        if resultado["insertados"] or resultado["actualizados"]:
+            indice_codigos.cargar()
+            cache_busqueda.invalidar()
+        return jsonify({"status": "ok", **resultado})
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except UnicodeDecodeError:
+        return jsonify({"status": "error", "mensaje": "El archivo debe estar en UTF-8"}), 400
+    except Exception as e:
+        print("Error importando productos:", e)
+        return jsonify({"status": "error", "mensaje": "Error interno del servidor"}), 500
+
+@prod_bp.route("/productos/exportar", methods=["GET"])
+@lectura_en_replica
+def exportar_productos():
+    """Descarga todos los productos en CSV, enviado mientras PostgreSQL lo genera."""
+    try:
+        datos = Producto.exportar_csv()
+        # El primer trozo se pide ya: si falla la conexión se responde 500
+        primero = next(datos, b"")
+        respuesta = Response(stream_with_context(chain([primero], datos)), mimetype="text/csv")
+        respuesta.call_on_close(datos.close)
+        respuesta.headers["Content-Disposition"] = "attachment; filename=productos.csv"
+        return respuesta
+    except Exception as e:
+        print("Error exportando productos:", e)
+        return jsonify({"status": "error"}), 500
+
 @prod_bp.route("/agregar_producto", methods=["POST"])
 def agregar_producto():
     try:
         data = request.get_json()
         print("Datos recibidos del formulario:", data)
 
+        codigo = str(data.get("codigo") or "").strip()
+        if not codigo:
+            return jsonify({"status": "error", "mensaje": "El código es obligatorio"}), 400
+
         query = """
-        INSERT INTO producto (nombre, descripcion, id_categoria, precio_compra, precio_venta, stock_minimo, id_proveedor)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO producto (codigo, nombre, descripcion, id_categoria, precio_compra, precio_venta, stock_minimo, id_proveedor)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        RETURNING id_producto
         """
         params = (
+            codigo,
             data["nombre"],
             data["descripcion"],
             int(data["categoria"]),
@@ -91,10 +163,13 @@ def agregar_producto():
             int(data["proveedor"])
         )
 
-        # Usando el helper DB (ej. DB.execute)
-        DB.execute(query, params)
+        id_producto = DB.execute_returning(query, params)[0]
+        indice_codigos.actualizar(id_producto)
+        cache_busqueda.invalidar()
 
-        return jsonify({"status": "ok"})
+        return jsonify({"status": "ok", "id_producto": id_producto})
+    except errors.UniqueViolation:
+        return jsonify({"status": "error", "mensaje": "Ya existe un producto con ese código"}), 409
     except Exception as e:
         print("Error agregando producto:", e)
         return jsonify({"status": "error"}), 500
@@ -110,6 +185,8 @@ def eliminar_producto(id_producto):
         filas_afectadas = DB.execute(query, params)
 
         if filas_afectadas > 0:
+            indice_codigos.quitar(id_producto)
+            cache_busqueda.invalidar()
             return jsonify({"status": "ok"})
         else:
             return jsonify({"status": "error", "msg": "Producto no encontrado"}), 404
@@ -122,21 +199,105 @@ def eliminar_producto(id_producto):
 def editar_producto(id_producto):
     try:
         data = request.get_json()
+        codigo = str(data.get("codigo") or "").strip()
+        if not codigo:
+            return jsonify({"status": "error", "mensaje": "El código es obligatorio"}), 400
         query = """
             UPDATE producto
-            SET nombre=%s, descripcion=%s, id_categoria=%s, precio_compra=%s,
+            SET codigo=%s, nombre=%s, descripcion=%s, id_categoria=%s, precio_compra=%s,
                 precio_venta=%s, stock_minimo=%s, id_proveedor=%s
             WHERE id_producto=%s
         """
         params = (
-            data["nombre"], data["descripcion"], int(data["categoria"]),
+            codigo, data["nombre"], data["descripcion"], int(data["categoria"]),
             float(data["precio_compra"]), float(data["precio_venta"]),
             int(data["stock_minimo"]), int(data["proveedor"]), id_producto
         )
         DB.execute(query, params)
+        indice_codigos.actualizar(id_producto)
+        cache_busqueda.invalidar()
         return jsonify({"status": "ok"})
+    except errors.UniqueViolation:
+        return jsonify({"status": "error", "mensaje": "Ya existe un producto con ese código"}), 409
     except Exception as e:
         print("Error editando producto:", e)
         return jsonify({"status": "error"}), 500
 
+@prod_bp.route("/productos/actualizar_masivo", methods=["POST"])
+def actualizar_masivo():
+    """
+    Cambia precios, stock mínimo o categoría de muchos productos a la vez:
+    {"seleccion": {"categoria"|"proveedor"|"ids"}, "cambios": {...},
+     "simular": bool, "muestra": n}. Con ``simular`` solo devuelve cuántos
+    productos cambiarían y una muestra de las diferencias.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        simular = bool(data.get("simular"))
+        resultado = Producto.actualizar_masivo(
+            data.get("cambios") or {},
+            data.get("seleccion") or {},
+            simular=simular,
+            muestra=int(data.get("muestra", 20)),
+        )
+        if not simular and resultado["afectados"]:
+            indice_codigos.actualizar(*resultado["ids"])
+            cache_busqueda.invalidar()
+        return jsonify({"status": "ok", **resultado})
+    except (ValueError, TypeError) as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except errors.ForeignKeyViolation:
+        return jsonify({"status": "error", "mensaje": "La categoría indicada no existe"}), 400
+    except errors.NumericValueOutOfRange:
+        return jsonify({"status": "error", "mensaje": "Algún valor resultante está fuera de rango"}), 400
+    except Exception as e:
+        print("Error en actualización masiva de productos:", e)
+        return jsonify({"status": "error", "mensaje": "Error interno del servidor"}), 500
 
+#Sugerencias del buscador (typeahead) por similitud de texto
+#(sin @lectura_en_replica: el resultado va a cache_busqueda, compartida por todas las sesiones)
+@prod_bp.route("/api/productos/buscar", methods=["GET"])
+def buscar_productos():
+    try:
+        q, limite = Producto.normalizar_busqueda(
+            request.args.get("q", default="", type=str).lower(),
+            request.args.get("limite", default=10, type=int),
+        )
+        if not q:
+            return jsonify([])
+        entrada = cache_busqueda.obtener(
+            f"productos:{limite}:{q}", lambda: Producto.buscar_similares(q, limite)
+        )
+        return jsonify(entrada.valor)
+    except Exception as e:
+        print("Error en búsqueda de productos:", e)
+        return jsonify({"status": "error"}), 500
+
+#Búsqueda por código de barras (punto de venta), resuelta desde el índice en memoria
+@prod_bp.route("/api/productos/codigo/<path:codigo>", methods=["GET"])
+def buscar_por_codigo(codigo):
+    try:
+        registro = indice_codigos.buscar(codigo)
+        if registro is None:
+            return jsonify({"status": "error", "mensaje": "Código no encontrado"}), 404
+        return jsonify(registro._asdict())
+    except Exception as e:
+        print("Error buscando código:", e)
+        return jsonify({"status": "error"}), 500
+
+@prod_bp.route("/api/productos/codigos", methods=["POST"])
+def buscar_por_codigos():
+    """Resuelve varios códigos escaneados en una sola llamada: {"codigos": [...]}."""
+    try:
+        data = request.get_json(silent=True) or {}
+        codigos = data.get("codigos")
+        if not isinstance(codigos, list) or len(codigos) > 1000:
+            return jsonify({"status": "error", "mensaje": "Se espera una lista 'codigos' (máximo 1000)"}), 400
+        resultado = indice_codigos.buscar_varios(str(c) for c in codigos)
+        return jsonify({
+            "productos": {c: r._asdict() for c, r in resultado.items() if r is not None},
+            "no_encontrados": [c for c, r in resultado.items() if r is None],
+        })
+    except Exception as e:
+        print("Error buscando códigos:", e)
+        return jsonify({"status": "error"}), 500
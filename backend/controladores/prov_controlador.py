@@ -1,8 +1,17 @@
 from flask import Blueprint, jsonify, request
+from backend import sincronizacion
 from backend.db import DB
+from backend.cache import cache_busqueda, cache_referencia
+from backend.utils.decoradores import lectura_en_replica
+from backend.utils.respuestas import json_cacheable
 
 prov_bp = Blueprint("proveedor", __name__)
 
+_DUPLICADO = DB.registrar(
+    "proveedor.duplicado",
+    "SELECT id_proveedor FROM proveedores WHERE LOWER(nombre)=LOWER(%s) AND telefono=%s",
+)
+
 # Agregar proveedor
 @prov_bp.route("/agregar_proveedor", methods=["POST"])
 def agregar_proveedor():
@@ -17,12 +26,7 @@ def agregar_proveedor():
             return jsonify({"status": "error", "mensaje": "El nombre no puede estar vacío"}), 400
 
         # Verificar si ya existe el proveedor con mismo nombre y teléfono
-        check_query = """
-            SELECT id_proveedor 
-            FROM proveedores 
-            WHERE LOWER(nombre)=LOWER(%s) AND telefono=%s
-        """
-        existe = DB.fetch_one(check_query, (nombre, telefono))
+        existe = DB.fetch_one(_DUPLICADO, (nombre, telefono))
         if existe:
             return jsonify({"status": "error", "mensaje": "El proveedor ya existe"}), 400
 
@@ -32,6 +36,8 @@ def agregar_proveedor():
             VALUES(%s, %s, %s, %s)
         """
         DB.execute(query, (nombre, telefono, email, direccion))
+        cache_referencia.invalidar("proveedores:")
+        cache_busqueda.invalidar()
 
         return jsonify({"status": "ok"})
     except Exception as e:
@@ -40,24 +46,37 @@ def agregar_proveedor():
 
 
 # Listar proveedores
+def _proveedor_a_dict(prov):
+    return {
+        "id": prov[0],
+        "nombre": prov[1],
+        "telefono": prov[2],
+        "email": prov[3],
+        "direccion": prov[4]
+    }
+
+
 @prov_bp.route("/list-proveedores", methods=["GET"])
+@lectura_en_replica
 def listar_proveedores():
     try:
-        query = "SELECT id_proveedor, nombre, telefono, email, direccion FROM proveedores ORDER BY id_proveedor"
-        proveedores = DB.fetch_all(query)
-
-        # Convertir a lista de diccionarios
-        proveedores_dict = [
-            {
-                "id": prov[0],
-                "nombre": prov[1],
-                "telefono": prov[2],
-                "email": prov[3],
-                "direccion": prov[4]
-            } for prov in proveedores
-        ]
-
-        return jsonify(proveedores_dict)
+        # Con ?since= solo los proveedores cambiados (sincronización incremental)
+        desde = sincronizacion.leer_since()
+        if desde is not None:
+            query = """
+                SELECT id_proveedor, nombre, telefono, email, direccion FROM proveedores
+                WHERE version >= %(desde)s::xid8 ORDER BY id_proveedor
+            """
+            return jsonify(sincronizacion.delta("proveedores", desde, query, _proveedor_a_dict))
+
+        def cargar():
+            return DB.fetch_dicts(
+                "SELECT id_proveedor AS id, nombre, telefono, email, direccion FROM proveedores ORDER BY id_proveedor"
+            )
+
+        return json_cacheable("proveedores:lista", cargar)
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
     except Exception as e:
         print("Error al obtener proveedores:", e)
         return jsonify({"status": "error"}), 500
@@ -68,6 +87,8 @@ def listar_proveedores():
 def eliminar_proveedor(id_prov):
     try:
         DB.execute("DELETE FROM proveedores WHERE id_proveedor=%s", (id_prov,))
+        cache_referencia.invalidar("proveedores:")
+        cache_busqueda.invalidar()
         return jsonify({"status": "ok"})
     except Exception as e:
         print("Error eliminando proveedor:", e)
@@ -93,6 +114,8 @@ def editar_proveedor(id_prov):
             WHERE id_proveedor=%s
         """
         DB.execute(query, (nombre, telefono, email, direccion, id_prov))
+        cache_referencia.invalidar("proveedores:")
+        cache_busqueda.invalidar()
 
         return jsonify({"status": "ok"})
     except Exception as e:
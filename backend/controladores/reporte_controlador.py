@@ -0,0 +1,53 @@
+"""
+Controlador de reportes de ventas y compras.
+
+- GET /api/reportes/ventas?agrupar=dia|semana|mes|categoria|producto|metodo_pago
+- GET /api/reportes/compras?agrupar=dia|semana|mes|categoria|producto|proveedor[&estado=]
+
+Parámetros comunes: desde y hasta (YYYY-MM-DD, por defecto los últimos 30
+días) y formato=csv para descargar el reporte en CSV (en streaming).
+Los días cerrados salen de los resúmenes diarios (ver Reporte).
+"""
+
+from datetime import date
+from flask import Blueprint, jsonify, request
+from backend.modelos.reporte_modelo import Reporte
+from backend.utils.decoradores import api_login_requerido, lectura_en_replica
+from backend.utils.respuestas import csv_stream
+
+reporte_bp = Blueprint("reportes", __name__, url_prefix="/api/reportes")
+
+
+def _fecha(valor):
+    """Convierte 'YYYY-MM-DD' en date (None si viene vacío)."""
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {valor}")
+
+
+@reporte_bp.route("/<tipo>", methods=["GET"])
+@api_login_requerido
+@lectura_en_replica
+def reporte(tipo):
+    try:
+        agrupar = request.args.get("agrupar", "dia")
+        desde, hasta = Reporte.rango(_fecha(request.args.get("desde")), _fecha(request.args.get("hasta")))
+        filas = Reporte.generar(tipo, agrupar, desde, hasta, estado=request.args.get("estado") or None)
+
+        if request.args.get("formato") == "csv":
+            return csv_stream(filas, f"reporte_{tipo}_{agrupar}_{desde}_{hasta}.csv")
+        return jsonify({
+            "tipo": tipo,
+            "agrupar": agrupar,
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "filas": list(filas),
+        })
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error generando reporte:", e)
+        return jsonify({"status": "error"}), 500
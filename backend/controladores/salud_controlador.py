@@ -0,0 +1,33 @@
+"""
+Controlador de salud del proceso para el balanceador / orquestador.
+
+- GET /healthz: el proceso responde (no toca la base de datos).
+- GET /readyz: el worker terminó su calentamiento, no se está apagando y
+  puede obtener una conexión del pool; si no, 503.
+"""
+
+from flask import Blueprint, jsonify
+from backend import arranque
+from backend.db import DB
+
+salud_bp = Blueprint("salud", __name__)
+
+
+@salud_bp.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok"})
+
+
+@salud_bp.route("/readyz", methods=["GET"])
+def readyz():
+    datos = arranque.resumen()
+    if not datos["listo"] or datos["drenando"]:
+        return jsonify({"status": "no_listo", **datos}), 503
+    try:
+        pool = DB.get_pool()
+        conn = pool.getconn(timeout=1)
+        pool.putconn(conn)
+    except Exception as e:
+        print("Readyz sin conexión:", e)
+        return jsonify({"status": "sin_conexion", **datos}), 503
+    return jsonify({"status": "ok", **datos})
@@ -0,0 +1,39 @@
+"""
+Controlador de ventas.
+
+Define la API usada por la caja para registrar tickets:
+- POST /api/ventas: registra una venta con sus líneas en una transacción.
+"""
+
+from flask import Blueprint, jsonify, request, session
+from backend.indice_codigos import indice_codigos
+from backend.modelos.venta_modelo import StockInsuficienteError, Venta
+from backend.utils.decoradores import api_login_requerido
+
+venta_bp = Blueprint("ventas", __name__, url_prefix="/api/ventas")
+
+
+@venta_bp.route("", methods=["POST"])
+@api_login_requerido
+def registrar_venta():
+    """
+    Registra un ticket.
+
+    Cuerpo JSON: {"metodo_pago": "efectivo", "items": [{"id_producto": 1, "cantidad": 2}, ...]}
+    """
+    try:
+        data = request.get_json() or {}
+        resultado = Venta.registrar(
+            id_usuario=session["usuario_id"],
+            metodo_pago=data.get("metodo_pago", "efectivo"),
+            items=data.get("items") or [],
+        )
+        indice_codigos.actualizar(*(linea["id_producto"] for linea in resultado["lineas"]))
+        return jsonify({"status": "ok", **resultado}), 201
+    except StockInsuficienteError as se:
+        return jsonify({"status": "error", "mensaje": str(se)}), 409
+    except ValueError as ve:
+        return jsonify({"status": "error", "mensaje": str(ve)}), 400
+    except Exception as e:
+        print("Error registrando venta:", e)
+        return jsonify({"status": "error", "mensaje": "Error interno del servidor"}), 500
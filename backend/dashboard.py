@@ -0,0 +1,142 @@
+"""Indicadores (KPI) del menú principal: ``GET /api/dashboard``.
+
+Cada indicador es una consulta independiente. En lugar de ejecutarlas una
+tras otra (la latencia sería la suma), ``armar`` las lanza a la vez en un
+pool de hilos acotado; cada hilo toma su propia conexión del pool de la
+base, así que la respuesta tarda lo que la consulta más lenta.
+
+- El pool de hilos (``DASHBOARD_HILOS``) es compartido por todas las
+  peticiones del proceso: acota cuántas conexiones puede ocupar el
+  dashboard aunque muchos usuarios abran el menú a la vez.
+- El resultado se guarda ``DASHBOARD_TTL`` segundos en ``cache_dashboard``
+  (igual para todos los usuarios) y solo una petición a la vez lo
+  recalcula; las demás esperan y leen la caché.
+- Si un indicador falla se devuelve el resto con ``errores`` y ese
+  resultado parcial no se guarda en la caché.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from backend.cache import cache_dashboard
+from backend.config import Config
+from backend.db import DB
+
+CLAVE_CACHE = "dashboard"
+
+
+# ---------------------------
+# Indicadores (uno por consulta)
+# ---------------------------
+def ventas_hoy() -> Dict[str, Any]:
+    tickets, total = DB.fetch_one(
+        "SELECT COUNT(*), COALESCE(SUM(total), 0) FROM ventas WHERE fecha = CURRENT_DATE"
+    )
+    return {"tickets": tickets, "total": float(total)}
+
+
+def compras_mes() -> Dict[str, Any]:
+    compras, total = DB.fetch_one(
+        "SELECT COUNT(*), COALESCE(SUM(total), 0) FROM compras "
+        "WHERE fecha >= date_trunc('month', CURRENT_DATE)::date AND estado IS DISTINCT FROM 'cancelado'"
+    )
+    return {"compras": compras, "total": float(total)}
+
+
+def bajo_minimo() -> int:
+    return DB.fetch_one(
+        "SELECT COUNT(*) FROM producto p LEFT JOIN stock_actual s ON s.id_producto = p.id_producto "
+        "WHERE COALESCE(s.cantidad, 0) < p.stock_minimo"
+    )[0]
+
+
+def por_vencer() -> Dict[str, Any]:
+    dias = Config.DASHBOARD_DIAS_VENCIMIENTO
+    lotes, unidades = DB.fetch_one(
+        "SELECT COUNT(*), COALESCE(SUM(cantidad), 0) FROM lotes "
+        "WHERE cantidad > 0 AND fecha_vencimiento BETWEEN CURRENT_DATE AND CURRENT_DATE + %s",
+        (dias,),
+    )
+    return {"dias": dias, "lotes": lotes, "unidades": int(unidades)}
+
+
+def mas_vendidos() -> list:
+    from backend.modelos.reporte_modelo import Reporte
+
+    hasta = date.today()
+    desde = hasta - timedelta(days=Config.DASHBOARD_DIAS_TOP - 1)
+    return list(Reporte.generar("ventas", "producto", desde, hasta, limite=Config.DASHBOARD_TOP))
+
+
+INDICADORES: Dict[str, Callable[[], Any]] = {
+    "ventas_hoy": ventas_hoy,
+    "compras_mes": compras_mes,
+    "bajo_minimo": bajo_minimo,
+    "por_vencer": por_vencer,
+    "mas_vendidos": mas_vendidos,
+}
+
+
+# ---------------------------
+# Pool de hilos (uno por proceso)
+# ---------------------------
+_hilos: Optional[ThreadPoolExecutor] = None
+_hilos_pid: Optional[int] = None
+_hilos_lock = threading.Lock()
+_armando = threading.Lock()  # una sola petición recalcula a la vez
+
+
+def _obtener_hilos() -> ThreadPoolExecutor:
+    """Crea el pool la primera vez que se usa en este proceso (y tras un fork)."""
+    global _hilos, _hilos_pid
+    with _hilos_lock:
+        if _hilos is None or _hilos_pid != os.getpid():
+            _hilos = ThreadPoolExecutor(max_workers=Config.DASHBOARD_HILOS, thread_name_prefix="dashboard")
+            _hilos_pid = os.getpid()
+        return _hilos
+
+
+def armar() -> Dict[str, Any]:
+    """Ejecuta todos los indicadores en paralelo y arma la respuesta."""
+    inicio = time.perf_counter()
+    hilos = _obtener_hilos()
+    # Cada hilo corre en una copia del contexto: si la vista usa réplicas, los indicadores también
+    futuros = {nombre: hilos.submit(copy_context().run, funcion) for nombre, funcion in INDICADORES.items()}
+    wait(futuros.values(), timeout=Config.DASHBOARD_TIMEOUT)
+
+    datos: Dict[str, Any] = {}
+    errores: Dict[str, str] = {}
+    for nombre, futuro in futuros.items():
+        if not futuro.done():
+            futuro.cancel()
+            datos[nombre] = None
+            errores[nombre] = "Tiempo de espera agotado"
+            continue
+        try:
+            datos[nombre] = futuro.result()
+        except Exception as e:
+            print(f"Error calculando el indicador {nombre}:", e)
+            datos[nombre] = None
+            errores[nombre] = "Error al consultar"
+
+    datos["generado_en"] = datetime.now().isoformat(timespec="seconds")
+    datos["duracion_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+    datos["errores"] = errores
+    if errores:
+        # Invalidar durante la carga hace que la caché no guarde este resultado parcial
+        cache_dashboard.invalidar(CLAVE_CACHE)
+    return datos
+
+
+def cerrar_hilos() -> None:
+    """Detiene el pool de hilos (al apagar el worker)."""
+    global _hilos
+    with _hilos_lock:
+        if _hilos is not None and _hilos_pid == os.getpid():
+            _hilos.shutdown(wait=False, cancel_futures=True)
+        _hilos = None
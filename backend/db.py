@@ -1,26 +1,225 @@
-"""Módulo db: manejo de conexiones a PostgreSQL con pool y métodos de ayuda."""
+"""Módulo db: manejo de conexiones a PostgreSQL con pool y métodos de ayuda.
 
+Además de las filas como tuplas (``fetch_*``), ofrece filas listas para
+JSON (``fetch_dicts``, ``stream(..., para_json=True)``): el cursor
+convierte NUMERIC a float y date/timestamp a texto ISO al leer la
+respuesta, así que no se crean objetos Decimal/date que luego haya que
+convertir uno por uno, y ``a_json`` las serializa con el codificador en C
+de la biblioteca estándar sin llamar a ``default`` por cada valor. Los
+nombres de columna se leen una vez por cursor (``fabrica_filas``).
+
+Las consultas fijas de las rutas más usadas se registran con nombre
+(``DB.registrar``) y se ejecutan con los mismos ``fetch_*``/``execute``:
+cada conexión del pool las prepara (PREPARE) la primera vez que las usa y
+desde entonces solo envía ``EXECUTE nombre(parámetros)``, sin que
+PostgreSQL vuelva a analizar ni planificar el texto.
+
+Con réplicas configuradas (``PG_REPLICAS``, ver ``backend.replicas``), las
+lecturas de ``fetch_*``/``stream``/``copy_stream`` dentro de
+``DB.en_replica()`` se sirven desde una réplica; el resto, desde la primaria.
+"""
+
+import json
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Any, Iterable, Optional, Tuple, List
-from psycopg2.pool import SimpleConnectionPool
+from contextvars import ContextVar, copy_context
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, List, Union
+import psycopg2.errors
+import psycopg2.extensions
 from backend.config import Config
+from backend.pool import PoolConexiones
+from backend.replicas import Replicas, destinos, fijada_a_primaria
+from backend import metricas
+
+
+class CursorMedido(psycopg2.extensions.cursor):
+    """Cursor que informa a ``metricas`` la duración y filas de cada consulta.
+
+    Solo se usa con ``Config.METRICAS`` activo; si no, ``DB`` crea cursores
+    normales y la instrumentación no cuesta nada.
+    """
+
+    def execute(self, query, vars=None):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, self.rowcount, self.query)
+
+    def copy_expert(self, sql, file, size=8192):
+        inicio = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            metricas.registrar_consulta(sql, time.perf_counter() - inicio, self.rowcount)
+
+
+# ---------------------------
+# Filas y serialización JSON
+# ---------------------------
+def _por_defecto(valor: Any) -> Any:
+    """Serializa los tipos que devuelve psycopg2 y json no conoce."""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+_CODIFICADOR = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_por_defecto)
+
+
+def a_json(valor: Any) -> str:
+    """Serializa ``valor`` en JSON compacto (Decimal → float, date → ISO)."""
+    return _CODIFICADOR.encode(valor)
+
+
+# Conversores de tipo para los cursores "para_json": el texto que envía
+# PostgreSQL ya es ISO 8601 para date y timestamp ("2024-05-01 13:45:00").
+_CONVERSORES_JSON = (
+    psycopg2.extensions.new_type(
+        psycopg2.extensions.DECIMAL.values, "NUMERIC_JSON",
+        lambda valor, cur: None if valor is None else float(valor)),
+    psycopg2.extensions.new_type(
+        psycopg2.extensions.DATE.values, "DATE_JSON", lambda valor, cur: valor),
+    psycopg2.extensions.new_type(
+        psycopg2.extensions.PYDATETIME.values, "TIMESTAMP_JSON",
+        lambda valor, cur: None if valor is None else valor.replace(" ", "T", 1)),
+)
+
+
+def preparar_para_json(cur) -> None:
+    """Registra en ``cur`` los conversores NUMERIC → float y date/timestamp → texto ISO."""
+    for conversor in _CONVERSORES_JSON:
+        psycopg2.extensions.register_type(conversor, cur)
+
+
+def fabrica_filas(cur) -> Callable[[Tuple[Any, ...]], Dict[str, Any]]:
+    """
+    Convierte las tuplas de ``cur`` en diccionarios columna → valor. Los
+    nombres se leen de ``cur.description`` una sola vez, no en cada fila, y
+    el diccionario se arma con ``zip`` (en C).
+    """
+    columnas = tuple(desc[0] for desc in cur.description)
+    return lambda fila: dict(zip(columnas, fila))
+
+
+# ---------------------------
+# Consultas preparadas
+# ---------------------------
+_MARCADOR = re.compile(r"%%|%\((\w+)\)s|%s")
+
+
+class Consulta:
+    """
+    Consulta con nombre (ver ``DB.registrar``).
+
+    Guarda el texto original con marcadores de psycopg2 (``%s`` o
+    ``%(nombre)s``, sin mezclarlos) y su versión para PREPARE con ``$1..$n``.
+    """
+
+    def __init__(self, nombre: str, sql: str) -> None:
+        self.nombre = nombre
+        self.sql = sql
+        self.sentencia = "q_" + re.sub(r"\W", "_", nombre)
+        posicionales = 0
+        nombres: List[str] = []
+
+        def numerar(marcador) -> str:
+            nonlocal posicionales
+            if marcador.group(0) == "%%":
+                return "%"
+            if marcador.group(1) is None:
+                posicionales += 1
+                return f"${posicionales}"
+            if marcador.group(1) not in nombres:
+                nombres.append(marcador.group(1))
+            return f"${nombres.index(marcador.group(1)) + 1}"
+
+        cuerpo = _MARCADOR.sub(numerar, sql)
+        if posicionales and nombres:
+            raise ValueError(f"La consulta '{nombre}' mezcla parámetros %s y %(nombre)s")
+        self.nombres = tuple(nombres)
+        self.cuerpo = cuerpo
+        self.cantidad = cantidad = posicionales or len(nombres)
+        self.preparar = f"PREPARE {self.sentencia} AS {cuerpo}"
+        self.ejecutar = f"EXECUTE {self.sentencia}" + (f" ({', '.join(['%s'] * cantidad)})" if cantidad else "")
+
+    def argumentos(self, params: Any) -> Tuple[Any, ...]:
+        """Parámetros en el orden de ``$1..$n``."""
+        if self.nombres:
+            return tuple(params[n] for n in self.nombres)
+        return tuple(params or ())
+
+
+class ConexionPreparada(psycopg2.extensions.connection):
+    """
+    Conexión del pool que recuerda qué consultas con nombre tiene preparadas.
+
+    Las sentencias viven en la sesión: una conexión nueva (reconexión,
+    reciclaje del pool) empieza sin ninguna y las prepara a medida que las
+    usa. Como mucho guarda ``PG_PREPARADAS_MAX``; al pasarse libera la
+    usada hace más tiempo (DEALLOCATE).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.preparadas: "OrderedDict[str, None]" = OrderedDict()
+        self.generacion = DB._generacion
+        self.reiniciar = False
+        self.replica = None  # la Replica de la que salió (None = primaria)
+        self.pool = None  # pool de la primaria que la prestó
+
+
+# Errores que indican que las sentencias de la conexión no coinciden con lo
+# anotado: no existe en la sesión (alguien hizo DEALLOCATE/DISCARD), ya
+# existía, o el esquema cambió las columnas del resultado ("cached plan
+# must not change result type").
+_SENTENCIA_OBSOLETA = (
+    psycopg2.errors.InvalidSqlStatementName,
+    psycopg2.errors.DuplicatePreparedStatement,
+    psycopg2.errors.FeatureNotSupported,
+)
+
+# True dentro de DB.en_replica() (si la sesión no está fijada a la primaria).
+# Es una ContextVar para que la decisión viaje a los hilos que la copian.
+_en_replica: ContextVar[bool] = ContextVar("en_replica", default=False)
 
 
 class DB:
     """Clase para manejar un pool de conexiones PostgreSQL y métodos de utilidad."""
 
-    _pool: Optional[SimpleConnectionPool] = None
+    _pool: Optional[PoolConexiones] = None
+    _replicas: Optional[Replicas] = None
+    _cursores = count(1)  # sufijo para nombrar cursores del lado del servidor
+    _consultas: Dict[str, Consulta] = {}
+    _generacion = 0  # se incrementa tras un cambio de esquema (ver invalidar_preparadas)
+    _estadisticas_preparadas = {"aciertos": 0, "fallos": 0, "desalojos": 0, "reinicios": 0}
 
     # ---------------------------
     # Inicialización del pool
     # ---------------------------
     @classmethod
-    def init_app(cls, cfg: Config, minconn: int = 1, maxconn: int = 10) -> None:
-        """Inicializa el pool de conexiones si no existe."""
+    def init_app(cls, cfg: Config, minconn: Optional[int] = None, maxconn: Optional[int] = None) -> None:
+        """Inicializa el pool de conexiones si no existe.
+
+        Los tamaños y tiempos se leen de ``Config`` (PG_POOL_*) salvo que se
+        pasen ``minconn``/``maxconn`` explícitos.
+        """
         if cls._pool is None:
-            cls._pool = SimpleConnectionPool(
-                minconn=minconn,
-                maxconn=maxconn,
+            cls._pool = PoolConexiones(
+                minconn=cfg.PG_POOL_MIN if minconn is None else minconn,
+                maxconn=cfg.PG_POOL_MAX if maxconn is None else maxconn,
+                timeout=cfg.PG_POOL_TIMEOUT,
+                max_ocioso=cfg.PG_POOL_IDLE,
+                validar_tras=cfg.PG_POOL_VALIDAR,
                 host=cfg.PG_HOST,
                 port=cfg.PG_PORT,
                 dbname=cfg.PG_DB,
@@ -28,36 +227,140 @@ class DB:
                 password=cfg.PG_PASS,
                 client_encoding="UTF8",
                 connect_timeout=10,
-                application_name="mi-app"
+                application_name="mi-app",
+                connection_factory=ConexionPreparada,
             )
             print("✅ Pool de conexiones PostgreSQL inicializado correctamente.")
+        if cls._replicas is None and cfg.PG_REPLICAS:
+            cls._replicas = Replicas(
+                destinos(cfg),
+                minconn=0,
+                maxconn=cfg.PG_REPLICA_POOL_MAX,
+                timeout=cfg.PG_POOL_TIMEOUT,
+                max_ocioso=cfg.PG_POOL_IDLE,
+                validar_tras=cfg.PG_POOL_VALIDAR,
+                client_encoding="UTF8",
+                connect_timeout=3,
+                application_name="mi-app-lectura",
+                connection_factory=ConexionPreparada,
+            )
+            print(f"✅ Réplicas de lectura: {len(cls._replicas.lista)}")
+
+    @classmethod
+    def cerrar(cls, timeout: float = 30.0) -> bool:
+        """Drena y cierra el pool (al apagar un worker). Permite un nuevo ``init_app``.
+
+        Cada conexión prestada recuerda su pool (``conn.pool``/``conn.replica``),
+        así que las que se devuelvan durante el drenaje llegan a él aunque
+        ``DB`` ya no lo tenga.
+        """
+        pool, cls._pool = cls._pool, None
+        replicas, cls._replicas = cls._replicas, None
+        limite = time.monotonic() + timeout
+        limpio = pool.drenar(timeout) if pool is not None else True
+        if replicas is not None:
+            limpio = replicas.cerrar(max(0.0, limite - time.monotonic())) and limpio
+        return limpio
 
     @classmethod
-    def get_pool(cls) -> Optional[SimpleConnectionPool]:
+    def get_pool(cls) -> Optional[PoolConexiones]:
         """Retorna el pool de conexiones."""
         return cls._pool
 
+    @classmethod
+    def estadisticas_pool(cls) -> Dict[str, Any]:
+        """Devuelve los contadores del pool (checkouts, esperas, en uso, libres, descartadas)."""
+        if cls._pool is None:
+            return {}
+        return cls._pool.estadisticas()
+
+    @classmethod
+    def estadisticas_replicas(cls) -> Dict[str, Any]:
+        """Salud, retraso, lecturas y pool de cada réplica ({} sin réplicas)."""
+        if cls._replicas is None:
+            return {}
+        return cls._replicas.resumen()
+
     # ---------------------------
     # Métodos de conexión
     # ---------------------------
     @classmethod
-    def obtener_conexion(cls):
+    @contextmanager
+    def en_replica(cls):
+        """
+        Las lecturas dentro del bloque pueden servirse desde una réplica.
+
+        No tiene efecto sin réplicas o si la sesión escribió hace poco
+        (ver ``backend.replicas``). Solo lo usan ``fetch_*``, ``stream``,
+        ``explicar`` y ``copy_stream``; ``connection()`` y las escrituras
+        siguen yendo a la primaria.
+        """
+        token = _en_replica.set(cls._replicas is not None and not fijada_a_primaria())
+        try:
+            yield
+        finally:
+            _en_replica.reset(token)
+
+    @classmethod
+    @contextmanager
+    def en_primaria(cls):
+        """
+        Las lecturas del bloque van a la primaria aunque se esté dentro de
+        ``en_replica``.
+
+        Para cargar cachés compartidas por todas las sesiones: tras una
+        invalidación por NOTIFY, una réplica atrasada guardaría en la caché
+        las filas anteriores al cambio hasta que venza.
+        """
+        token = _en_replica.set(False)
+        try:
+            yield
+        finally:
+            _en_replica.reset(token)
+
+    @classmethod
+    def obtener_conexion(cls, lectura: bool = False):
+        """Conexión de la primaria; con ``lectura`` dentro de ``en_replica``, de una réplica si hay una sana."""
         if cls._pool is None:
             raise RuntimeError("DB.init_app(Config) no fue llamado.")
-        return cls._pool.getconn()
+        inicio = time.perf_counter() if metricas.ACTIVAS else 0.0
+        conn = None
+        if lectura and _en_replica.get() and cls._replicas is not None:
+            conn = cls._replicas.obtener()
+        if conn is None:
+            pool = cls._pool
+            conn = pool.getconn()
+            conn.pool = pool
+        if metricas.ACTIVAS:
+            metricas.registrar_espera_pool(time.perf_counter() - inicio)
+        return conn
 
     @classmethod
     def liberar_conexion(cls, conn):
-        if cls._pool:
-            cls._pool.putconn(conn)
+        if getattr(conn, "replica", None) is not None:
+            Replicas.devolver(conn)
+            return
+        # Su propio pool: si DB.cerrar() está drenando, cls._pool ya es None
+        pool = getattr(conn, "pool", None) or cls._pool
+        if pool is not None:
+            pool.putconn(conn)
 
     @classmethod
     @contextmanager
-    def connection(cls):
-        """Context manager para (conn, cur) con commit/rollback automático."""
-        conn = cls.obtener_conexion()
+    def connection(cls, para_json: bool = False, lectura: bool = False):
+        """Context manager para (conn, cur) con commit/rollback automático.
+
+        Todas las consultas de la aplicación pasan por aquí (también las de
+        ``fetch_*`` y ``execute*``): con métricas activas el cursor es un
+        ``CursorMedido``. Con ``para_json`` el cursor devuelve NUMERIC como
+        float y fechas como texto ISO (ver ``preparar_para_json``). Con
+        ``lectura`` (solo para SELECT) puede tocar una réplica, ver ``en_replica``.
+        """
+        conn = cls.obtener_conexion(lectura)
         try:
-            with conn.cursor() as cur:
+            with conn.cursor(cursor_factory=CursorMedido if metricas.ACTIVAS else None) as cur:
+                if para_json:
+                    preparar_para_json(cur)
                 yield conn, cur
                 conn.commit()
         except Exception:
@@ -67,53 +370,298 @@ class DB:
             cls.liberar_conexion(conn)
 
     # ---------------------------
-    # Métodos de consulta
+    # Consultas preparadas
     # ---------------------------
     @classmethod
-    def fetch_one(cls, sql: str, params: Optional[Iterable[Any]] = None) -> Optional[Tuple[Any, ...]]:
-        with cls.connection() as (_, cur):
+    def registrar(cls, nombre: str, sql: str) -> Consulta:
+        """
+        Registra una consulta fija con nombre y la devuelve.
+
+        El resultado se pasa en lugar del texto a ``fetch_one``, ``fetch_all``,
+        ``fetch_dicts``, ``execute``, ``execute_returning`` o ``ejecutar``. Se
+        registra una vez, al importar el módulo que la usa.
+
+        Raises:
+            ValueError: El nombre ya está registrado con otro texto.
+        """
+        existente = cls._consultas.get(nombre)
+        if existente is not None:
+            if existente.sql != sql:
+                raise ValueError(f"La consulta '{nombre}' ya está registrada con otro texto")
+            return existente
+        consulta = Consulta(nombre, sql)
+        cls._consultas[nombre] = consulta
+        return consulta
+
+    @classmethod
+    def invalidar_preparadas(cls) -> None:
+        """Tras un cambio de esquema: cada conexión descarta sus sentencias antes de su próximo uso."""
+        cls._generacion += 1
+
+    @classmethod
+    def estadisticas_preparadas(cls) -> Dict[str, Any]:
+        """Aciertos (EXECUTE directo), fallos (hubo que preparar), desalojos del LRU y reinicios."""
+        datos = dict(cls._estadisticas_preparadas)
+        usos = datos["aciertos"] + datos["fallos"]
+        datos["registradas"] = len(cls._consultas)
+        datos["tasa_aciertos"] = round(datos["aciertos"] / usos, 4) if usos else None
+        return datos
+
+    @classmethod
+    def ejecutar(cls, cur, sql: Union[str, Consulta], params: Any = None) -> None:
+        """
+        Ejecuta ``sql`` en ``cur``; si es una ``Consulta``, como sentencia preparada.
+
+        Es lo que usan los ``fetch_*``; se llama directamente dentro de un
+        ``DB.connection()`` con varias sentencias. Si la sentencia resultó
+        obsoleta la transacción queda abortada y se propaga el error; la
+        conexión rehace sus sentencias en el próximo uso.
+        """
+        if not isinstance(sql, Consulta):
             cur.execute(sql, params or ())
+            return
+        conn = cur.connection
+        preparadas = getattr(conn, "preparadas", None)
+        if preparadas is None or not Config.PG_PREPARADAS:
+            cur.execute(sql.sql, params or ())
+            return
+
+        estadisticas = cls._estadisticas_preparadas
+        try:
+            if conn.reiniciar or conn.generacion != cls._generacion:
+                cur.execute("DEALLOCATE ALL")
+                preparadas.clear()
+                conn.generacion = cls._generacion
+                conn.reiniciar = False
+                estadisticas["reinicios"] += 1
+
+            if sql.sentencia in preparadas:
+                preparadas.move_to_end(sql.sentencia)
+                estadisticas["aciertos"] += 1
+            else:
+                while len(preparadas) >= Config.PG_PREPARADAS_MAX:
+                    vieja, _ = preparadas.popitem(last=False)
+                    cur.execute(f"DEALLOCATE {vieja}")
+                    estadisticas["desalojos"] += 1
+                cur.execute(sql.preparar)
+                preparadas[sql.sentencia] = None
+                estadisticas["fallos"] += 1
+            cur.execute(sql.ejecutar, sql.argumentos(params))
+        except _SENTENCIA_OBSOLETA:
+            conn.reiniciar = True
+            raise
+
+    @classmethod
+    def _ejecutar_propia(cls, cur, sql: Union[str, Consulta], params: Any) -> None:
+        """``ejecutar`` para los métodos que abren su propia transacción de una sentencia.
+
+        Como no hay nada más en la transacción, una sentencia obsoleta se
+        resuelve volviendo a prepararla y reintentando una vez.
+        """
+        try:
+            cls.ejecutar(cur, sql, params)
+        except _SENTENCIA_OBSOLETA:
+            if not isinstance(sql, Consulta):
+                raise
+            cur.connection.rollback()
+            cls.ejecutar(cur, sql, params)
+
+    # ---------------------------
+    # Métodos de consulta
+    # ---------------------------
+    @classmethod
+    def fetch_one(cls, sql: Union[str, Consulta], params: Any = None) -> Optional[Tuple[Any, ...]]:
+        with cls.connection(lectura=True) as (_, cur):
+            cls._ejecutar_propia(cur, sql, params)
             return cur.fetchone()
 
     @classmethod
-    def fetch_all(cls, sql: str, params: Optional[Iterable[Any]] = None) -> List[Tuple[Any, ...]]:
-        with cls.connection() as (_, cur):
-            cur.execute(sql, params or ())
+    def fetch_all(cls, sql: Union[str, Consulta], params: Any = None) -> List[Tuple[Any, ...]]:
+        with cls.connection(lectura=True) as (_, cur):
+            cls._ejecutar_propia(cur, sql, params)
             return cur.fetchall()
 
     @classmethod
-    def execute(cls, sql: str, params: Optional[Iterable[Any]] = None) -> int:
+    def fetch_dicts(cls, sql: Union[str, Consulta], params: Any = None) -> List[Dict[str, Any]]:
+        """Todas las filas como diccionarios listos para JSON (claves = nombres de columna)."""
+        with cls.connection(para_json=True, lectura=True) as (_, cur):
+            cls._ejecutar_propia(cur, sql, params)
+            return list(map(fabrica_filas(cur), cur.fetchall()))
+
+    @classmethod
+    def execute(cls, sql: Union[str, Consulta], params: Any = None) -> int:
         with cls.connection() as (_, cur):
-            cur.execute(sql, params or ())
+            cls._ejecutar_propia(cur, sql, params)
             return cur.rowcount
 
     @classmethod
-    def execute_returning(cls, sql: str, params: Optional[Iterable[Any]] = None) -> Tuple[Any, ...]:
+    def execute_returning(cls, sql: Union[str, Consulta], params: Any = None) -> Tuple[Any, ...]:
         with cls.connection() as (_, cur):
-            cur.execute(sql, params or ())
+            cls._ejecutar_propia(cur, sql, params)
             return cur.fetchone()
 
     @classmethod
-    def ejecutar_consulta(
+    def explicar(cls, sql: Union[str, Consulta], params: Optional[Iterable[Any]] = None) -> Dict[str, Any]:
+        """Devuelve el nodo raíz del plan de ``sql`` (EXPLAIN FORMAT JSON, sin ejecutarla)."""
+        if isinstance(sql, Consulta):
+            sql = sql.sql
+        with cls.connection(lectura=True) as (_, cur):
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params or ())
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]["Plan"]
+
+    @classmethod
+    def explicar_generico(cls, sql: Union[str, Consulta]) -> Dict[str, Any]:
+        """
+        Plan genérico de ``sql``: el que sirve para cualquier valor de los parámetros.
+
+        Se prepara con otro nombre y se explica con NULL en cada parámetro
+        bajo ``plan_cache_mode = force_generic_plan`` (PostgreSQL 12+), así
+        que no hacen falta valores de ejemplo.
+        """
+        if not isinstance(sql, Consulta):
+            sql = Consulta("plan", sql)
+        nombre = f"plan_generico_{next(cls._cursores)}"
+        argumentos = f" ({', '.join(['NULL'] * sql.cantidad)})" if sql.cantidad else ""
+        with cls.connection() as (conn, cur):
+            cur.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+            try:
+                cur.execute(f"PREPARE {nombre} AS {sql.cuerpo}")
+                cur.execute(f"EXPLAIN (FORMAT JSON) EXECUTE {nombre}{argumentos}")
+                plan = cur.fetchone()[0]
+                cur.execute(f"DEALLOCATE {nombre}")
+            except psycopg2.Error:
+                # Con la transacción abortada no se puede DEALLOCATE: que la
+                # conexión descarte todas sus sentencias en el próximo uso
+                conn.reiniciar = True
+                raise
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    @classmethod
+    def estimar_filas(cls, sql: Union[str, Consulta], params: Optional[Iterable[Any]] = None) -> int:
+        """Estimación de filas del planificador para ``sql``.
+
+        Sirve para mostrar totales aproximados sin recorrer la tabla con COUNT(*).
+        """
+        return int(cls.explicar(sql, params)["Plan Rows"])
+
+    @classmethod
+    def stream(
         cls,
-        consulta: str,
+        sql: Union[str, Consulta],
         params: Optional[Iterable[Any]] = None,
+        batch_size: int = 1000,
+        como_dict: bool = False,
+        para_json: bool = False,
+    ) -> Iterator[Any]:
+        """Recorre el resultado con un cursor con nombre (del lado del servidor).
+
+        Solo hay ``batch_size`` filas en memoria a la vez. La conexión queda
+        prestada mientras se consume el generador y se devuelve al agotarlo
+        o al cerrarlo (``close()``), por lo que no debe abandonarse a medias.
+        ``para_json`` convierte los valores como ``fetch_dicts``. Una
+        ``Consulta`` se ejecuta por su texto: un cursor con nombre no puede
+        declararse sobre un EXECUTE.
+        """
+        if isinstance(sql, Consulta):
+            sql = sql.sql
+        conn = cls.obtener_conexion(lectura=True)
+        try:
+            with conn.cursor(
+                name=f"stream_{next(cls._cursores)}",
+                cursor_factory=CursorMedido if metricas.ACTIVAS else None,
+            ) as cur:
+                if para_json:
+                    preparar_para_json(cur)
+                cur.itersize = batch_size
+                cur.execute(sql, params or ())
+                convertir = None
+                while True:
+                    filas = cur.fetchmany(batch_size)
+                    if not filas:
+                        break
+                    if como_dict:
+                        if convertir is None:
+                            convertir = fabrica_filas(cur)
+                        yield from map(convertir, filas)
+                    else:
+                        yield from filas
+            conn.commit()
+        except BaseException:
+            # Incluye GeneratorExit: el consumidor dejó de leer a medias
+            conn.rollback()
+            raise
+        finally:
+            cls.liberar_conexion(conn)
+
+    @classmethod
+    def copy_stream(cls, sql: str, tam_cola: int = 16) -> Iterator[bytes]:
+        """Ejecuta un ``COPY ... TO STDOUT`` y entrega los datos por trozos.
+
+        ``copy_expert`` escribe en un archivo; aquí lo hace un hilo auxiliar
+        sobre una cola acotada, así el generador produce los datos a medida
+        que llegan sin acumular la tabla en memoria. Si el consumidor deja de
+        leer (``close()``), el COPY se cancela y la conexión vuelve al pool.
+        """
+        cola: "queue.Queue" = queue.Queue(maxsize=tam_cola)
+        cancelado = threading.Event()
+        fin = object()
+
+        class _Escritor:
+            def write(self, datos):
+                if cancelado.is_set():
+                    raise RuntimeError("COPY cancelado por el consumidor")
+                cola.put(datos if isinstance(datos, bytes) else datos.encode("utf-8"))
+
+        def copiar():
+            try:
+                with cls.connection(lectura=True) as (_, cur):
+                    cur.copy_expert(sql, _Escritor())
+                cola.put(fin)
+            except BaseException as e:  # se re-lanza en el hilo consumidor
+                cola.put(e)
+
+        # El hilo hereda el contexto: si se pidió dentro de en_replica(), lee de una réplica
+        hilo = threading.Thread(target=copy_context().run, args=(copiar,), name="copy-stream", daemon=True)
+        hilo.start()
+        try:
+            while True:
+                trozo = cola.get()
+                if trozo is fin:
+                    break
+                if isinstance(trozo, BaseException):
+                    raise trozo
+                yield trozo
+        finally:
+            cancelado.set()
+            # Vaciar la cola desbloquea al hilo si estaba esperando espacio
+            while hilo.is_alive():
+                try:
+                    cola.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    @classmethod
+    def ejecutar_consulta(
+        cls,
+        consulta: Union[str, Consulta],
+        params: Any = None,
         fetch_all: bool = False,
         fetch_one: bool = False
     ) -> Optional[Any]:
         with cls.connection() as (_, cur):
-            cur.execute(consulta, params or ())
+            cls._ejecutar_propia(cur, consulta, params)
 
             if fetch_all:
-                columnas = [desc[0] for desc in cur.description]
-                return [dict(zip(columnas, fila)) for fila in cur.fetchall()]
+                return list(map(fabrica_filas(cur), cur.fetchall()))
 
             if fetch_one:
                 fila = cur.fetchone()
-                if fila:
-                    columnas = [desc[0] for desc in cur.description]
-                    return dict(zip(columnas, fila))
-                return None
+                return fabrica_filas(cur)(fila) if fila else None
 
             return None
 
@@ -0,0 +1,34 @@
+"""Configuración de gunicorn para backend.wsgi:app.
+
+- ``preload_app``: el código se importa una vez en el maestro (arranque
+  rápido de workers y memoria compartida); no se abre ninguna conexión.
+- ``post_fork``: cada worker crea su propio pool, abre ``PG_POOL_MIN``
+  conexiones y calienta las cachés antes de atender tráfico.
+- ``worker_exit``: drena el pool al reciclar o apagar un worker.
+
+Variables de entorno: GUNICORN_BIND, GUNICORN_WORKERS, GUNICORN_THREADS.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))  # Config lo lee también para acotar SSE_MAX_CLIENTES
+worker_class = "gthread"
+preload_app = True
+timeout = 60
+graceful_timeout = int(os.getenv("APAGADO_TIMEOUT", "25")) + 5
+# Reciclar workers periódicamente (con desfase para que no se reinicien a la vez)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = max_requests // 10
+
+
+def post_fork(server, worker):
+    from backend import arranque
+    arranque.iniciar_worker()
+
+
+def worker_exit(server, worker):
+    from backend import arranque
+    arranque.detener_worker()
@@ -0,0 +1,47 @@
+"""Configuración de gunicorn para el flujo de cambios (``/api/cambios``).
+
+    gunicorn -c backend/gunicorn_sse_conf.py backend.wsgi:app
+
+Un cliente SSE pasa casi todo el tiempo esperando avisos. En un worker
+gthread ocuparía un hilo durante toda la conexión, así que este proceso usa
+workers gevent: cada cliente es una corrutina y un worker atiende cientos.
+El proxy delante (nginx) envía ``/api/cambios`` aquí y el resto a
+gunicorn_conf.py:
+
+    location /api/cambios { proxy_pass http://127.0.0.1:8001; proxy_buffering off; }
+
+- Sin ``preload_app``: gevent parchea la biblioteca estándar al iniciar el
+  worker, antes de importar la aplicación.
+- ``post_worker_init`` (ya parcheado, no ``post_fork``): psycopg2 espera a
+  la base cediendo el control (``wait_select``) y el worker solo crea el
+  pool y el oyente de cambios (``arranque.iniciar_flujo``).
+
+Variables de entorno: SSE_BIND, SSE_WORKERS, SSE_CONEXIONES.
+"""
+
+import os
+
+bind = os.getenv("SSE_BIND", "0.0.0.0:8001")
+workers = int(os.getenv("SSE_WORKERS", "1"))
+worker_class = "gevent"
+worker_connections = int(os.getenv("SSE_CONEXIONES", "1000"))  # clientes simultáneos por worker
+preload_app = False
+timeout = 60
+graceful_timeout = int(os.getenv("APAGADO_TIMEOUT", "25")) + 5
+
+
+def post_worker_init(worker):
+    import psycopg2.extensions
+    import psycopg2.extras
+    from backend import arranque
+    from backend.config import Config
+
+    psycopg2.extensions.set_wait_callback(psycopg2.extras.wait_select)
+    # Sin hilos que cuidar: el tope es el de conexiones del worker (deja lugar a /readyz)
+    Config.SSE_MAX_CLIENTES = max(1, worker_connections - 10)
+    arranque.iniciar_flujo()
+
+
+def worker_exit(server, worker):
+    from backend import arranque
+    arranque.detener_worker()
@@ -0,0 +1,197 @@
+"""Índice en memoria de códigos de barras (producto.codigo) para el punto de venta.
+
+Cada escaneo en caja debe resolverse al instante a producto y precio. El
+índice guarda, por proceso, codigo → ``Registro`` (id, nombre, precio de
+venta, stock) y responde sin ir a la base de datos.
+
+- Se carga completo con una sola consulta (al calentar el worker o en la
+  primera búsqueda).
+- Los manejadores de alta, edición y baja de productos, y los que mueven
+  stock (ventas, recepción de compras), lo actualizan por producto.
+- Los cambios hechos por otros procesos se recogen con una recarga completa
+  en segundo plano cada ``INDICE_CODIGOS_REFRESCO`` segundos; mientras
+  tanto se sigue respondiendo con la versión anterior. Lo que se actualice
+  o quite durante la recarga se anota y se vuelve a aplicar sobre el índice
+  nuevo antes de reemplazar el anterior, para no perder esos cambios.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from backend.config import Config
+from backend.db import DB
+
+
+class Registro(NamedTuple):
+    """Datos mínimos de un producto para la caja."""
+    id_producto: int
+    codigo: str
+    nombre: str
+    precio_venta: float
+    stock: int
+
+
+_SELECT = """
+    SELECT p.id_producto, p.codigo, p.nombre, p.precio_venta, COALESCE(s.cantidad, 0)
+    FROM producto p
+    LEFT JOIN stock_actual s ON s.id_producto = p.id_producto
+"""
+
+_POR_IDS = DB.registrar("indice_codigos.por_ids", _SELECT + " WHERE p.id_producto = ANY(%s)")
+
+
+def _registro(fila) -> Registro:
+    return Registro(fila[0], fila[1], fila[2], float(fila[3]), int(fila[4]))
+
+
+def _poner_en(por_codigo: Dict[str, Registro], codigo_por_id: Dict[int, str], registro: Registro) -> None:
+    anterior = codigo_por_id.get(registro.id_producto)
+    if anterior is not None and anterior != registro.codigo:
+        por_codigo.pop(anterior, None)
+    por_codigo[registro.codigo] = registro
+    codigo_por_id[registro.id_producto] = registro.codigo
+
+
+def _quitar_de(por_codigo: Dict[str, Registro], codigo_por_id: Dict[int, str], id_producto: int) -> None:
+    codigo = codigo_por_id.pop(id_producto, None)
+    if codigo is not None:
+        por_codigo.pop(codigo, None)
+
+
+class IndiceCodigos:
+    """Índice codigo → Registro, seguro entre hilos.
+
+    Las lecturas no toman candado: los diccionarios se reemplazan completos
+    al recargar y las actualizaciones por producto son asignaciones simples.
+    """
+
+    def __init__(self, refresco: float) -> None:
+        self.refresco = refresco
+        self._por_codigo: Dict[str, Registro] = {}
+        self._codigo_por_id: Dict[int, str] = {}
+        self._cargado_en: Optional[float] = None
+        self._lock = threading.Lock()
+        self._carga_lock = threading.Lock()  # una sola carga inicial aunque lleguen varias peticiones
+        self._recargando = False
+        # Una entrada por carga en curso: id_producto → Registro (o None si se quitó)
+        self._tocados: List[Dict[int, Optional[Registro]]] = []
+        self.aciertos = 0
+        self.fallos = 0
+
+    # ---------------------------
+    # Carga
+    # ---------------------------
+    def cargar(self) -> int:
+        """Recarga el índice completo desde la base y devuelve cuántos códigos tiene."""
+        tocados: Dict[int, Optional[Registro]] = {}
+        with self._lock:
+            self._tocados.append(tocados)
+        try:
+            por_codigo: Dict[str, Registro] = {}
+            for fila in DB.stream(_SELECT, batch_size=5000):
+                registro = _registro(fila)
+                por_codigo[registro.codigo] = registro
+            codigo_por_id = {r.id_producto: c for c, r in por_codigo.items()}
+            with self._lock:
+                # La lectura pudo ser anterior a actualizar()/quitar() hechos mientras tanto
+                for id_producto, registro in tocados.items():
+                    if registro is None:
+                        _quitar_de(por_codigo, codigo_por_id, id_producto)
+                    else:
+                        _poner_en(por_codigo, codigo_por_id, registro)
+                self._por_codigo, self._codigo_por_id = por_codigo, codigo_por_id
+                self._cargado_en = time.monotonic()
+        finally:
+            with self._lock:
+                self._tocados.remove(tocados)
+        return len(por_codigo)
+
+    def _recargar_en_segundo_plano(self) -> None:
+        def recargar():
+            try:
+                self.cargar()
+            except Exception as e:
+                print("Error recargando índice de códigos:", e)
+            finally:
+                self._recargando = False
+
+        threading.Thread(target=recargar, name="indice-codigos", daemon=True).start()
+
+    def _vigente(self) -> None:
+        """Carga el índice si nunca se cargó; programa una recarga si está viejo."""
+        if self._cargado_en is None:
+            with self._carga_lock:
+                if self._cargado_en is None:
+                    self.cargar()
+            return
+        if self.refresco and time.monotonic() - self._cargado_en >= self.refresco:
+            with self._lock:
+                if self._recargando:
+                    return
+                self._recargando = True
+            self._recargar_en_segundo_plano()
+
+    # ---------------------------
+    # Consultas
+    # ---------------------------
+    def buscar(self, codigo: str) -> Optional[Registro]:
+        """Registro del producto con ``codigo``, o None."""
+        self._vigente()
+        registro = self._por_codigo.get(codigo.strip())
+        if registro is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return registro
+
+    def buscar_varios(self, codigos: Iterable[str]) -> Dict[str, Optional[Registro]]:
+        """Busca varios códigos a la vez (por ejemplo, una canasta escaneada)."""
+        self._vigente()
+        por_codigo = self._por_codigo
+        resultado = {}
+        for codigo in codigos:
+            resultado[codigo] = por_codigo.get(str(codigo).strip())
+        encontrados = sum(r is not None for r in resultado.values())
+        self.aciertos += encontrados
+        self.fallos += len(resultado) - encontrados
+        return resultado
+
+    # ---------------------------
+    # Coherencia con las escrituras
+    # ---------------------------
+    def actualizar(self, *ids: int) -> None:
+        """Relee de la base los productos ``ids`` (tras alta, edición o movimiento de stock)."""
+        if not ids or self._cargado_en is None:
+            return
+        filas = DB.fetch_all(_POR_IDS, (list(ids),))
+        with self._lock:
+            for fila in filas:
+                registro = _registro(fila)
+                _poner_en(self._por_codigo, self._codigo_por_id, registro)
+                for tocados in self._tocados:
+                    tocados[registro.id_producto] = registro
+            encontrados = {f[0] for f in filas}
+            for id_producto in set(ids) - encontrados:
+                self._quitar(id_producto)
+
+    def quitar(self, id_producto: int) -> None:
+        """Elimina un producto borrado del índice."""
+        with self._lock:
+            self._quitar(id_producto)
+
+    def _quitar(self, id_producto: int) -> None:
+        _quitar_de(self._por_codigo, self._codigo_por_id, id_producto)
+        for tocados in self._tocados:
+            tocados[id_producto] = None
+
+    def estadisticas(self) -> Dict:
+        return {
+            "codigos": len(self._por_codigo),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "edad_seg": round(time.monotonic() - self._cargado_en, 1) if self._cargado_en else None,
+        }
+
+
+indice_codigos = IndiceCodigos(Config.INDICE_CODIGOS_REFRESCO)
@@ -0,0 +1,269 @@
+"""Métricas de la aplicación en formato Prometheus.
+
+Registra, por petición, el tiempo total, el tiempo esperando conexión del
+pool y el tiempo y número de consultas SQL; por consulta (agrupada por su
+huella: el texto normalizado), la duración y las filas. Las consultas que
+superan ``Config.SQL_LENTA_MS`` se escriben en el log 'backend.sql'.
+
+Todo se expone en ``GET /metrics`` junto con los contadores del pool y de
+la caché de referencia. Con ``Config.METRICAS`` desactivado ``DB`` usa
+cursores normales y no se registra nada: el costo es leer una variable.
+
+De cada huella de lectura (SELECT/WITH) se guarda además el texto completo
+de una ejecución, con sus valores (``muestras()``): es lo que revisa
+``verificar-planes`` además de las consultas registradas.
+
+Las respuestas en streaming consultan la base después de ``after_request``,
+así que sus consultas cuentan en las métricas SQL pero no en las de la
+petición.
+"""
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from flask import Flask, Response, g, has_request_context, request
+from backend.config import Config
+
+log_sql = logging.getLogger("backend.sql")
+
+ACTIVAS: bool = Config.METRICAS
+SQL_LENTA_SEG: float = Config.SQL_LENTA_MS / 1000.0
+
+BUCKETS_SEG = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+# ---------------------------
+# Tipos de métrica
+# ---------------------------
+def _etiquetas(nombres: Sequence[str], valores: Sequence[str]) -> str:
+    pares = [
+        f'{n}="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ") + '"'
+        for n, v in zip(nombres, valores)
+    ]
+    return ",".join(pares)
+
+
+class Contador:
+    """Contador acumulado con etiquetas."""
+
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def sumar(self, cantidad: float = 1, *valores: str) -> None:
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def exportar(self) -> Iterable[str]:
+        with self._lock:
+            copia = list(self._valores.items())
+        for valores, total in copia:
+            yield f"{self.nombre}{{{_etiquetas(self.etiquetas, valores)}}} {total}"
+
+
+class Histograma:
+    """Histograma acumulado (buckets, suma y cantidad) con etiquetas."""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_SEG) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores: str) -> None:
+        # Por serie: un contador por bucket + [suma, cantidad]
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [0] * len(self.buckets) + [0.0, 0]
+            if indice < len(self.buckets):
+                serie[indice] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def exportar(self) -> Iterable[str]:
+        with self._lock:
+            copia = [(v, list(s)) for v, s in self._series.items()]
+        for valores, serie in copia:
+            base = _etiquetas(self.etiquetas, valores)
+            sep = "," if base else ""
+            acumulado = 0
+            for limite, cantidad in zip(self.buckets, serie):
+                acumulado += cantidad
+                yield f'{self.nombre}_bucket{{{base}{sep}le="{limite}"}} {acumulado}'
+            yield f'{self.nombre}_bucket{{{base}{sep}le="+Inf"}} {serie[-1]}'
+            yield f"{self.nombre}_sum{{{base}}} {serie[-2]}"
+            yield f"{self.nombre}_count{{{base}}} {serie[-1]}"
+
+
+peticion_seg = Histograma("app_peticion_segundos", "Duración de las peticiones HTTP",
+                          ("metodo", "endpoint", "estado"))
+peticion_sql_seg = Histograma("app_peticion_sql_segundos", "Tiempo en SQL por petición", ("endpoint",))
+peticion_consultas = Histograma("app_peticion_consultas", "Consultas SQL por petición", ("endpoint",),
+                                BUCKETS_CONSULTAS)
+pool_espera_seg = Histograma("app_pool_espera_segundos", "Espera para obtener conexión del pool")
+sql_seg = Histograma("app_sql_segundos", "Duración de las consultas SQL por huella", ("consulta",))
+sql_filas = Contador("app_sql_filas_total", "Filas devueltas o afectadas por huella", ("consulta",))
+sql_lentas = Contador("app_sql_lentas_total", "Consultas que superaron SQL_LENTA_MS", ("consulta",))
+
+REGISTRO = [peticion_seg, peticion_sql_seg, peticion_consultas, pool_espera_seg, sql_seg, sql_filas, sql_lentas]
+
+
+# ---------------------------
+# Registro de consultas
+# ---------------------------
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACIOS = re.compile(r"\s+")
+_LECTURA = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+MUESTRAS_MAX = 500
+_muestras: Dict[str, str] = {}  # huella -> texto enviado en una ejecución
+
+
+@lru_cache(maxsize=1024)
+def huella(sql: str) -> str:
+    """Texto normalizado de una consulta: sin literales ni espacios repetidos.
+
+    Las consultas de la aplicación usan parámetros, así que hay pocas
+    huellas distintas y la caché evita repetir las expresiones regulares.
+    """
+    texto = _ESPACIOS.sub(" ", _LITERALES.sub("?", sql)).strip()
+    return texto if len(texto) <= 160 else texto[:157] + "..."
+
+
+def registrar_consulta(sql, duracion: float, filas: int, enviada=None) -> None:
+    """Registra una consulta ejecutada (la llama el cursor medido de ``DB``).
+
+    ``enviada`` es el texto que recibió el servidor, con los parámetros ya
+    interpolados (``cursor.query``).
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    clave = huella(str(sql))
+    if enviada and clave not in _muestras and len(_muestras) < MUESTRAS_MAX:
+        if isinstance(enviada, bytes):
+            enviada = enviada.decode("utf-8", "replace")
+        if len(enviada) <= 20000 and _LECTURA.match(enviada):
+            _muestras[clave] = enviada
+    sql_seg.observar(duracion, clave)
+    if filas > 0:
+        sql_filas.sumar(filas, clave)
+    if SQL_LENTA_SEG and duracion >= SQL_LENTA_SEG:
+        sql_lentas.sumar(1, clave)
+        log_sql.warning("Consulta lenta (%.1f ms, %d filas): %s", duracion * 1000, filas, clave)
+    if has_request_context() and "_metricas" in g:
+        g._metricas[0] += 1
+        g._metricas[1] += duracion
+
+
+def muestras() -> Dict[str, str]:
+    """Texto completo de una ejecución por huella de lectura vista en este proceso."""
+    return dict(_muestras)
+
+
+def registrar_espera_pool(duracion: float) -> None:
+    """Registra el tiempo que se esperó por una conexión del pool."""
+    pool_espera_seg.observar(duracion)
+    if has_request_context() and "_metricas" in g:
+        g._metricas[2] += duracion
+
+
+# ---------------------------
+# Integración con Flask
+# ---------------------------
+def _antes() -> None:
+    # [consultas, segundos en SQL, segundos esperando el pool, inicio]
+    g._metricas = [0, 0.0, 0.0, time.perf_counter()]
+
+
+def _despues(response: Response) -> Response:
+    datos = g.pop("_metricas", None)
+    if datos is None:
+        return response
+    consultas, sql, pool, inicio = datos
+    total = time.perf_counter() - inicio
+    endpoint = request.endpoint or "sin_ruta"
+    peticion_seg.observar(total, request.method, endpoint, str(response.status_code))
+    peticion_sql_seg.observar(sql, endpoint)
+    peticion_consultas.observar(consultas, endpoint)
+    response.headers["Server-Timing"] = (
+        f'pool;dur={pool * 1000:.1f}, db;dur={sql * 1000:.1f};desc="{consultas} consultas", '
+        f"total;dur={total * 1000:.1f}"
+    )
+    return response
+
+
+def _gauges() -> Iterable[str]:
+    """Contadores del pool, consultas preparadas, réplicas, caché y planificador, leídos al momento de exportar."""
+    from backend.db import DB
+    from backend.cache import cache_referencia
+    from backend.indice_codigos import indice_codigos
+
+    valores = {f"app_pool_{k}": v for k, v in DB.estadisticas_pool().items()}
+    for clave, valor in DB.estadisticas_preparadas().items():
+        if valor is not None:
+            valores[f"app_preparadas_{clave}"] = valor
+    for i, replica in enumerate(DB.estadisticas_replicas().values()):
+        valores[f"app_replica{i}_sana"] = int(replica["sana"])
+        valores[f"app_replica{i}_lecturas"] = replica["lecturas"]
+        valores[f"app_replica{i}_caidas"] = replica["caidas"]
+        if replica["retraso_seg"] is not None:
+            valores[f"app_replica{i}_retraso_segundos"] = replica["retraso_seg"]
+    valores["app_cache_referencia_aciertos"] = cache_referencia.aciertos
+    valores["app_cache_referencia_fallos"] = cache_referencia.fallos
+    for clave, valor in indice_codigos.estadisticas().items():
+        if valor is not None:
+            valores[f"app_indice_codigos_{clave}"] = valor
+    from backend.planificador import planificador
+
+    valores["app_planificador_lider"] = int(planificador.lider)
+    for tarea in planificador.tareas:
+        prefijo = f"app_planificador_{tarea.nombre}"
+        valores[f"{prefijo}_ejecuciones"] = tarea.ejecuciones
+        valores[f"{prefijo}_errores"] = tarea.errores
+        if tarea.ultima_ejecucion is not None:
+            valores[f"{prefijo}_ultima_ejecucion"] = tarea.ultima_ejecucion
+            valores[f"{prefijo}_duracion_segundos"] = tarea.ultima_duracion_seg
+        for clave, valor in ((tarea.ultimo_resultado or {}).get("pendientes") or {}).items():
+            valores[f"{prefijo}_pendientes_{clave}"] = valor
+    for nombre, valor in valores.items():
+        yield f"# TYPE {nombre} gauge"
+        yield f"{nombre} {valor}"
+
+
+def exportar() -> str:
+    """Todas las métricas en el formato de texto de Prometheus."""
+    lineas: List[str] = []
+    for metrica in REGISTRO:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        lineas.extend(metrica.exportar())
+    lineas.extend(_gauges())
+    return "\n".join(lineas) + "\n"
+
+
+def init_app(app: Flask) -> None:
+    """Registra los temporizadores por petición (si están activos) y ``/metrics``."""
+    if ACTIVAS:
+        app.before_request(_antes)
+        app.after_request(_despues)
+    app.add_url_rule(
+        "/metrics", "metricas",
+        lambda: Response(exportar(), mimetype="text/plain; version=0.0.4; charset=utf-8"),
+    )
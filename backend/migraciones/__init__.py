@@ -0,0 +1,106 @@
+"""Migraciones versionadas del esquema BDTJM.
+
+Cada archivo ``sql/NNNN_descripcion.sql`` es una migración; se aplican en
+orden de versión, cada una en su propia transacción, y quedan registradas
+en la tabla ``schema_migraciones``. Un candado consultivo evita que dos
+procesos (por ejemplo varios workers arrancando a la vez) migren en paralelo.
+
+Uso:
+    flask --app backend.app:crear_app migrar
+o al iniciar la aplicación con la variable MIGRAR_AL_INICIAR=1.
+"""
+
+import os
+import re
+from typing import List, Tuple
+from backend.db import DB
+
+CARPETA_SQL = os.path.join(os.path.dirname(__file__), "sql")
+_PATRON = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+
+# Identificador del candado consultivo (pg_advisory_lock) de las migraciones
+_CANDADO = 728_401
+
+_CREAR_TABLA = """
+    CREATE TABLE IF NOT EXISTS schema_migraciones (
+        version    integer PRIMARY KEY,
+        nombre     varchar(200) NOT NULL,
+        aplicada_en timestamp NOT NULL DEFAULT now()
+    )
+"""
+
+
+def disponibles() -> List[Tuple[int, str, str]]:
+    """Devuelve (version, nombre, ruta) de cada archivo de migración, ordenados."""
+    migraciones = []
+    for archivo in os.listdir(CARPETA_SQL):
+        m = _PATRON.match(archivo)
+        if m:
+            migraciones.append((int(m.group(1)), m.group(2), os.path.join(CARPETA_SQL, archivo)))
+    migraciones.sort()
+    return migraciones
+
+
+def aplicadas() -> List[int]:
+    """Versiones ya registradas en la base de datos."""
+    with DB.connection() as (_, cur):
+        cur.execute(_CREAR_TABLA)
+        cur.execute("SELECT version FROM schema_migraciones ORDER BY version")
+        return [fila[0] for fila in cur.fetchall()]
+
+
+def pendientes() -> List[Tuple[int, str, str]]:
+    """Migraciones disponibles que aún no se aplicaron."""
+    hechas = set(aplicadas())
+    return [m for m in disponibles() if m[0] not in hechas]
+
+
+def aplicar() -> List[str]:
+    """
+    Aplica las migraciones pendientes y devuelve sus nombres.
+
+    Si una falla se revierte solo esa migración y se propaga el error; las
+    anteriores quedan aplicadas.
+    """
+    hechas: List[str] = []
+    conn = DB.obtener_conexion()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_CREAR_TABLA)
+            conn.commit()
+
+            cur.execute("SELECT pg_advisory_lock(%s)", (_CANDADO,))
+            conn.commit()
+            try:
+                # Se vuelve a consultar con el candado tomado: otro proceso pudo adelantarse
+                cur.execute("SELECT version FROM schema_migraciones")
+                ya = {fila[0] for fila in cur.fetchall()}
+                conn.commit()
+
+                for version, nombre, ruta in disponibles():
+                    if version in ya:
+                        continue
+                    with open(ruta, encoding="utf-8") as f:
+                        sql = f.read()
+                    try:
+                        cur.execute(sql)
+                        cur.execute(
+                            "INSERT INTO schema_migraciones (version, nombre) VALUES (%s, %s)",
+                            (version, nombre),
+                        )
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    etiqueta = f"{version:04d}_{nombre}"
+                    print(f"✅ Migración aplicada: {etiqueta}")
+                    hechas.append(etiqueta)
+            finally:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (_CANDADO,))
+                conn.commit()
+    finally:
+        DB.liberar_conexion(conn)
+    if hechas:
+        # Los planes preparados pueden haber quedado con columnas viejas
+        DB.invalidar_preparadas()
+    return hechas
@@ -0,0 +1,90 @@
+"""Verificación de planes de ejecución de las consultas de la aplicación.
+
+Ejecuta EXPLAIN (sin ANALYZE, así que no modifica datos) y reporta las
+consultas que hacen un recorrido secuencial (Seq Scan) sobre tablas con más
+de ``umbral`` filas estimadas. Sirve como comprobación después de migrar o
+antes de desplegar:
+
+    flask --app backend.app:crear_app verificar-planes --umbral 10000
+
+Las consultas salen de fuentes reales, no de una lista a mano:
+
+- Las registradas con ``DB.registrar``, con su plan genérico (el que sirve
+  para cualquier valor de los parámetros, ver ``DB.explicar_generico``).
+- La búsqueda que hace cada clave foránea al borrar o actualizar la fila
+  referenciada (sin índice en la columna, es un Seq Scan por fila borrada).
+- Las lecturas ejecutadas en este proceso (``metricas.muestras()``), tal
+  como se enviaron. Desde la CLI no hay ninguna; ``backend.bench.suite
+  --planes`` verifica al terminar los escenarios, con todo lo que corrieron.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+import psycopg2
+
+from backend import metricas
+from backend.db import DB
+
+# Una búsqueda por cada clave foránea de una columna del esquema public
+_SQL_CLAVES_FORANEAS = """
+    SELECT c.conname, format('SELECT 1 FROM %s WHERE %I = $1', c.conrelid::regclass, a.attname)
+    FROM pg_constraint c
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+    WHERE c.contype = 'f'
+      AND cardinality(c.conkey) = 1
+      AND c.connamespace = 'public'::regnamespace
+    ORDER BY c.conname
+"""
+
+
+def consultas() -> Iterator[Tuple[str, Callable[[], Dict[str, Any]]]]:
+    """(nombre, función que devuelve el plan) de cada consulta a verificar."""
+    for consulta in sorted(DB._consultas.values(), key=lambda c: c.nombre):
+        yield consulta.nombre, lambda c=consulta: DB.explicar_generico(c)
+    for nombre, sql in DB.fetch_all(_SQL_CLAVES_FORANEAS):
+        yield f"fk.{nombre}", lambda s=sql: DB.explicar_generico(s)
+    for clave, sql in sorted(metricas.muestras().items()):
+        # Ya trae los valores interpolados: '%' es literal, no un marcador
+        yield f"ejecutada: {clave}", lambda s=sql.replace("%", "%%"): DB.explicar_generico(s)
+
+
+def _nodos(plan: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    """Recorre recursivamente los nodos de un plan en formato JSON."""
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos(hijo)
+
+
+def _filas_estimadas(tablas: Iterable[str]) -> Dict[str, float]:
+    """reltuples de pg_class para las tablas indicadas."""
+    tablas = list(set(tablas))
+    if not tablas:
+        return {}
+    filas = DB.fetch_all(
+        "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relname = ANY(%s)",
+        (tablas,),
+    )
+    return {nombre: float(tuplas) for nombre, tuplas in filas}
+
+
+def verificar(umbral: int = 10000) -> List[Dict[str, Any]]:
+    """
+    Devuelve un reporte por consulta con los recorridos secuenciales detectados.
+
+    Cada elemento: {"consulta", "seq_scans": [(tabla, filas)], "ok"} y, si
+    no se pudo explicar (p. ej. un parámetro sin tipo deducible), "error".
+    Una consulta falla si recorre secuencialmente una tabla con más de
+    ``umbral`` filas estimadas.
+    """
+    reporte = []
+    for nombre, explicar in consultas():
+        try:
+            plan = explicar()
+        except psycopg2.Error as e:
+            reporte.append({"consulta": nombre, "seq_scans": [], "ok": False, "error": str(e).strip()})
+            continue
+        recorridos = [n["Relation Name"] for n in _nodos(plan) if n.get("Node Type") == "Seq Scan"]
+        tamanos = _filas_estimadas(recorridos)
+        grandes = [(t, int(tamanos.get(t, 0))) for t in recorridos if tamanos.get(t, 0) > umbral]
+        reporte.append({"consulta": nombre, "seq_scans": grandes, "ok": not grandes})
+    return reporte
@@ -0,0 +1,35 @@
+-- Índices para las claves foráneas y las búsquedas por nombre.
+-- PostgreSQL no indexa automáticamente las columnas FK: sin estos índices
+-- borrar una categoría o listar el detalle de una venta recorre la tabla completa.
+
+-- producto
+CREATE INDEX IF NOT EXISTS idx_producto_id_categoria ON producto (id_categoria);
+CREATE INDEX IF NOT EXISTS idx_producto_id_proveedor ON producto (id_proveedor);
+-- Clave de orden del listado paginado (/productos_filtro)
+CREATE INDEX IF NOT EXISTS idx_producto_nombre_id ON producto (nombre, id_producto);
+
+-- detalle_ventas / detalle_compras
+CREATE INDEX IF NOT EXISTS idx_detalle_ventas_id_venta ON detalle_ventas (id_venta);
+CREATE INDEX IF NOT EXISTS idx_detalle_ventas_id_producto ON detalle_ventas (id_producto);
+CREATE INDEX IF NOT EXISTS idx_detalle_compras_id_compra ON detalle_compras (id_compra);
+CREATE INDEX IF NOT EXISTS idx_detalle_compras_id_producto ON detalle_compras (id_producto);
+
+-- lotes: también sirve para recorrer los lotes de un producto por vencimiento
+CREATE INDEX IF NOT EXISTS idx_lotes_producto_vencimiento ON lotes (id_producto, fecha_vencimiento);
+
+-- compras / ventas
+CREATE INDEX IF NOT EXISTS idx_compras_id_proveedor ON compras (id_proveedor);
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha);
+
+-- Búsquedas sin distinguir mayúsculas (Categoria.agregar, agregar_proveedor)
+CREATE INDEX IF NOT EXISTS idx_categoria_nombre_lower ON categoria_producto (LOWER(nombre));
+CREATE INDEX IF NOT EXISTS idx_proveedores_nombre_lower ON proveedores (LOWER(nombre), telefono);
+
+ANALYZE producto;
+ANALYZE categoria_producto;
+ANALYZE proveedores;
+ANALYZE lotes;
+ANALYZE compras;
+ANALYZE detalle_compras;
+ANALYZE ventas;
+ANALYZE detalle_ventas;
@@ -0,0 +1,2 @@
+-- El listado de /api/compras filtra por rango de fechas y ordena por fecha descendente
+CREATE INDEX IF NOT EXISTS idx_compras_fecha_id ON compras (fecha, id_compra);
@@ -0,0 +1,70 @@
+-- Existencias por producto mantenidas por trigger sobre 'lotes'.
+-- Cualquier camino que modifique lotes (ventas, recepción de compras,
+-- vencimientos o ediciones manuales) actualiza el resumen en la misma
+-- transacción, así que leer el stock de un producto es una búsqueda por PK.
+--
+-- Los triggers son por sentencia (con tablas de transición): una venta que
+-- descuenta varios lotes hace un solo upsert por producto, y los productos
+-- se actualizan en orden de id para que dos ventas concurrentes con los
+-- mismos productos no se interbloqueen.
+
+CREATE TABLE IF NOT EXISTS stock_producto (
+    id_producto    integer PRIMARY KEY REFERENCES producto(id_producto) ON DELETE CASCADE,
+    cantidad       bigint NOT NULL DEFAULT 0,
+    actualizado_en timestamp NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION fn_stock_producto_lotes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stock_producto AS s (id_producto, cantidad)
+        SELECT id_producto, SUM(cantidad) FROM lotes_nuevos
+        GROUP BY id_producto ORDER BY id_producto
+        ON CONFLICT (id_producto) DO UPDATE
+            SET cantidad = s.cantidad + EXCLUDED.cantidad, actualizado_en = now();
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stock_producto AS s (id_producto, cantidad)
+        SELECT id_producto, -SUM(cantidad) FROM lotes_viejos
+        GROUP BY id_producto ORDER BY id_producto
+        ON CONFLICT (id_producto) DO UPDATE
+            SET cantidad = s.cantidad + EXCLUDED.cantidad, actualizado_en = now();
+    ELSE
+        INSERT INTO stock_producto AS s (id_producto, cantidad)
+        SELECT id_producto, SUM(delta)
+        FROM (
+            SELECT id_producto, cantidad AS delta FROM lotes_nuevos
+            UNION ALL
+            SELECT id_producto, -cantidad FROM lotes_viejos
+        ) cambios
+        GROUP BY id_producto
+        HAVING SUM(delta) <> 0
+        ORDER BY id_producto
+        ON CONFLICT (id_producto) DO UPDATE
+            SET cantidad = s.cantidad + EXCLUDED.cantidad, actualizado_en = now();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_lotes_stock_ins ON lotes;
+CREATE TRIGGER trg_lotes_stock_ins
+    AFTER INSERT ON lotes REFERENCING NEW TABLE AS lotes_nuevos
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_stock_producto_lotes();
+
+DROP TRIGGER IF EXISTS trg_lotes_stock_upd ON lotes;
+CREATE TRIGGER trg_lotes_stock_upd
+    AFTER UPDATE ON lotes REFERENCING OLD TABLE AS lotes_viejos NEW TABLE AS lotes_nuevos
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_stock_producto_lotes();
+
+DROP TRIGGER IF EXISTS trg_lotes_stock_del ON lotes;
+CREATE TRIGGER trg_lotes_stock_del
+    AFTER DELETE ON lotes REFERENCING OLD TABLE AS lotes_viejos
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_stock_producto_lotes();
+
+-- Carga inicial desde los lotes existentes
+INSERT INTO stock_producto (id_producto, cantidad)
+SELECT p.id_producto, COALESCE(SUM(l.cantidad), 0)
+FROM producto p
+LEFT JOIN lotes l ON l.id_producto = p.id_producto
+GROUP BY p.id_producto
+ON CONFLICT (id_producto) DO UPDATE SET cantidad = EXCLUDED.cantidad, actualizado_en = now();
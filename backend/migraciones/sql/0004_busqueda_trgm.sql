@@ -0,0 +1,14 @@
+-- Búsqueda aproximada (typeahead) de productos con pg_trgm.
+-- Los índices GIN de trigramas sirven a los operadores de similitud
+-- (<%, %) y también a LIKE/ILIKE con comodines a ambos lados, que un
+-- índice B-tree no puede usar.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_producto_nombre_trgm ON producto USING gin (nombre gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_producto_codigo_trgm ON producto USING gin (codigo gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_producto_descripcion_trgm ON producto USING gin (descripcion gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_categoria_nombre_trgm ON categoria_producto USING gin (nombre gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_proveedores_nombre_trgm ON proveedores USING gin (nombre gin_trgm_ops);
+
+ANALYZE producto;
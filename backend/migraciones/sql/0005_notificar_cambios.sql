@@ -0,0 +1,71 @@
+-- Aviso de cambios en producto, categoria_producto y proveedores por NOTIFY.
+-- Cada sentencia envía al canal 'cambios' un mensaje JSON
+--   {"tabla": "...", "op": "insert|update|delete", "ids": [...]}
+-- que recibe el oyente de cada proceso (backend/notificaciones.py). Los
+-- avisos se entregan al confirmar la transacción, y solo llevan los ids:
+-- el oyente lee las filas una vez y las reparte a todos sus clientes.
+--
+-- Son triggers por sentencia con tablas de transición, así que una
+-- importación masiva genera un aviso por cada 500 filas y no uno por fila
+-- (el mensaje de NOTIFY está limitado a 8000 bytes).
+
+CREATE OR REPLACE FUNCTION fn_notificar_cambios() RETURNS trigger AS $$
+DECLARE
+    columna_id text := TG_ARGV[0];
+    lote integer[];
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        FOR lote IN
+            SELECT array_agg(id ORDER BY id) FROM (
+                SELECT (to_jsonb(v) ->> columna_id)::integer AS id,
+                       (row_number() OVER () - 1) / 500 AS grupo
+                FROM filas_viejas v
+            ) x GROUP BY grupo
+        LOOP
+            PERFORM pg_notify('cambios', json_build_object(
+                'tabla', TG_TABLE_NAME, 'op', 'delete', 'ids', lote)::text);
+        END LOOP;
+    ELSE
+        FOR lote IN
+            SELECT array_agg(id ORDER BY id) FROM (
+                SELECT (to_jsonb(n) ->> columna_id)::integer AS id,
+                       (row_number() OVER () - 1) / 500 AS grupo
+                FROM filas_nuevas n
+            ) x GROUP BY grupo
+        LOOP
+            PERFORM pg_notify('cambios', json_build_object(
+                'tabla', TG_TABLE_NAME, 'op', lower(TG_OP), 'ids', lote)::text);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('producto', 'id_producto'),
+            ('categoria_producto', 'id_categoria'),
+            ('proveedores', 'id_proveedor')
+        ) AS v(tabla, columna)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_notificar_ins ON %1$I', t.tabla);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_notificar_upd ON %1$I', t.tabla);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_notificar_del ON %1$I', t.tabla);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_notificar_ins AFTER INSERT ON %1$I
+             REFERENCING NEW TABLE AS filas_nuevas
+             FOR EACH STATEMENT EXECUTE FUNCTION fn_notificar_cambios(%2$L)', t.tabla, t.columna);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_notificar_upd AFTER UPDATE ON %1$I
+             REFERENCING NEW TABLE AS filas_nuevas
+             FOR EACH STATEMENT EXECUTE FUNCTION fn_notificar_cambios(%2$L)', t.tabla, t.columna);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_notificar_del AFTER DELETE ON %1$I
+             REFERENCING OLD TABLE AS filas_viejas
+             FOR EACH STATEMENT EXECUTE FUNCTION fn_notificar_cambios(%2$L)', t.tabla, t.columna);
+    END LOOP;
+END $$;
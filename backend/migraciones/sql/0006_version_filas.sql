@@ -0,0 +1,87 @@
+-- Versión de fila para la sincronización incremental (?since=<version>).
+--
+-- producto, categoria_producto y proveedores guardan en "version" el id de
+-- la transacción (xid8) que escribió la fila por última vez; las bajas dejan
+-- una lápida en sync_bajas con el mismo dato.
+--
+-- Se usa el id de transacción y no una secuencia porque el lector puede
+-- calcular una marca segura: el xmin de su snapshot. Toda transacción con
+-- id menor ya terminó, así que ningún cambio puede aparecer después por
+-- debajo de la marca (con una secuencia, un valor tomado por una transacción
+-- que confirma más tarde quedaría por debajo de la marca ya entregada). A
+-- cambio, lo escrito por transacciones aún abiertas puede enviarse dos
+-- veces; el cliente aplica los cambios por id, así que repetirlos no daña.
+--
+-- sync_purga guarda hasta qué versión se purgaron lápidas por tabla: un
+-- cliente con una versión anterior debe volver a descargar la tabla completa.
+
+ALTER TABLE producto ADD COLUMN IF NOT EXISTS version xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE categoria_producto ADD COLUMN IF NOT EXISTS version xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE proveedores ADD COLUMN IF NOT EXISTS version xid8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE INDEX IF NOT EXISTS idx_producto_version ON producto (version);
+CREATE INDEX IF NOT EXISTS idx_categoria_version ON categoria_producto (version);
+CREATE INDEX IF NOT EXISTS idx_proveedores_version ON proveedores (version);
+
+CREATE TABLE IF NOT EXISTS sync_bajas (
+    tabla        text      NOT NULL,
+    id           integer   NOT NULL,
+    version      xid8      NOT NULL DEFAULT pg_current_xact_id(),
+    eliminado_en timestamp NOT NULL DEFAULT now(),
+    PRIMARY KEY (tabla, id)
+);
+CREATE INDEX IF NOT EXISTS idx_sync_bajas_version ON sync_bajas (tabla, version);
+
+CREATE TABLE IF NOT EXISTS sync_purga (
+    tabla text PRIMARY KEY,
+    hasta xid8 NOT NULL
+);
+
+-- Las actualizaciones que no cambian nada (p. ej. un upsert de importación
+-- con los mismos datos) no mueven la versión: el trigger tiene WHEN.
+CREATE OR REPLACE FUNCTION fn_version_fila() RETURNS trigger AS $$
+BEGIN
+    NEW.version := pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_registrar_bajas() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sync_bajas AS b (tabla, id)
+    SELECT TG_TABLE_NAME, (to_jsonb(v) ->> TG_ARGV[0])::integer
+    FROM filas_viejas v
+    ORDER BY 2
+    ON CONFLICT (tabla, id) DO UPDATE
+        SET version = EXCLUDED.version, eliminado_en = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('producto', 'id_producto'),
+            ('categoria_producto', 'id_categoria'),
+            ('proveedores', 'id_proveedor')
+        ) AS v(tabla, columna)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_version ON %1$I', t.tabla);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_bajas ON %1$I', t.tabla);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_version BEFORE UPDATE ON %1$I
+             FOR EACH ROW WHEN (OLD IS DISTINCT FROM NEW)
+             EXECUTE FUNCTION fn_version_fila()', t.tabla);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_bajas AFTER DELETE ON %1$I
+             REFERENCING OLD TABLE AS filas_viejas
+             FOR EACH STATEMENT EXECUTE FUNCTION fn_registrar_bajas(%2$L)', t.tabla, t.columna);
+    END LOOP;
+END $$;
+
+ANALYZE producto;
+ANALYZE categoria_producto;
+ANALYZE proveedores;
@@ -0,0 +1,131 @@
+-- Resúmenes diarios de ventas y compras para los reportes (/api/reportes).
+--
+-- resumen_ventas_diario y resumen_compras_diario guardan, por día y
+-- producto (y método de pago / proveedor y estado), las unidades y los
+-- importes. Los llena el comando `flask consolidar-reportes` para los días
+-- ya cerrados; los reportes leen el resumen de esos días y las filas
+-- originales solo del día en curso y de los días con cambios pendientes.
+--
+-- resumen_cambios es un registro de solo inserción: cada sentencia que toca
+-- ventas, compras o sus detalles anota el día afectado con el id de su
+-- transacción. Solo se inserta (nunca se actualiza una fila existente), así
+-- que dos cajas que venden a la vez no compiten por la misma fila. La
+-- consolidación borra las anotaciones de transacciones anteriores al xmin
+-- de su snapshot: las de transacciones todavía abiertas se quedan y ese día
+-- se vuelve a consolidar en la siguiente pasada.
+--
+-- El costo de las ventas se calcula con producto.precio_compra al
+-- consolidar (el detalle de ventas no guarda el costo): el margen de un día
+-- cerrado queda fijo aunque después cambie el precio de compra.
+
+CREATE TABLE IF NOT EXISTS resumen_ventas_diario (
+    fecha       date          NOT NULL,
+    id_producto integer       NOT NULL,
+    metodo_pago varchar(20)   NOT NULL,
+    unidades    numeric(14,2) NOT NULL,
+    ingresos    numeric(14,2) NOT NULL,
+    costo       numeric(14,2) NOT NULL,
+    PRIMARY KEY (fecha, id_producto, metodo_pago)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_compras_diario (
+    fecha        date          NOT NULL,
+    id_producto  integer       NOT NULL,
+    id_proveedor integer       NOT NULL,
+    estado       varchar(20)   NOT NULL,
+    unidades     numeric(14,2) NOT NULL,
+    total        numeric(14,2) NOT NULL,
+    PRIMARY KEY (fecha, id_producto, id_proveedor, estado)
+);
+
+CREATE TABLE IF NOT EXISTS resumen_cambios (
+    tipo  text NOT NULL CHECK (tipo IN ('ventas', 'compras')),
+    fecha date NOT NULL,
+    xid   xid8 NOT NULL DEFAULT pg_current_xact_id()
+);
+CREATE INDEX IF NOT EXISTS idx_resumen_cambios_tipo_fecha ON resumen_cambios (tipo, fecha);
+
+-- Encabezados (ventas, compras): la fecha está en la misma fila.
+-- TG_ARGV[0] es el tipo ('ventas' o 'compras').
+CREATE OR REPLACE FUNCTION fn_resumen_marcar_encabezado() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO resumen_cambios (tipo, fecha)
+        SELECT DISTINCT TG_ARGV[0], (to_jsonb(n) ->> 'fecha')::date FROM filas_nuevas n;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO resumen_cambios (tipo, fecha)
+        SELECT DISTINCT TG_ARGV[0], (to_jsonb(v) ->> 'fecha')::date FROM filas_viejas v;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Detalles: la fecha se toma del encabezado. Si el encabezado ya se borró,
+-- su propio trigger anotó el día.
+CREATE OR REPLACE FUNCTION fn_resumen_marcar_detalle_ventas() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO resumen_cambios (tipo, fecha)
+        SELECT DISTINCT 'ventas', v.fecha FROM ventas v
+        WHERE v.id_venta IN (SELECT id_venta FROM filas_nuevas);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO resumen_cambios (tipo, fecha)
+        SELECT DISTINCT 'ventas', v.fecha FROM ventas v
+        WHERE v.id_venta IN (SELECT id_venta FROM filas_viejas);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_resumen_marcar_detalle_compras() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO resumen_cambios (tipo, fecha)
+        SELECT DISTINCT 'compras', c.fecha FROM compras c
+        WHERE c.id_compra IN (SELECT id_compra FROM filas_nuevas);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO resumen_cambios (tipo, fecha)
+        SELECT DISTINCT 'compras', c.fecha FROM compras c
+        WHERE c.id_compra IN (SELECT id_compra FROM filas_viejas);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        SELECT * FROM (VALUES
+            ('ventas', 'fn_resumen_marcar_encabezado(''ventas'')'),
+            ('compras', 'fn_resumen_marcar_encabezado(''compras'')'),
+            ('detalle_ventas', 'fn_resumen_marcar_detalle_ventas()'),
+            ('detalle_compras', 'fn_resumen_marcar_detalle_compras()')
+        ) AS v(tabla, funcion)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_resumen_ins ON %1$I', t.tabla);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_resumen_upd ON %1$I', t.tabla);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_resumen_del ON %1$I', t.tabla);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_resumen_ins AFTER INSERT ON %1$I
+             REFERENCING NEW TABLE AS filas_nuevas
+             FOR EACH STATEMENT EXECUTE FUNCTION %2$s', t.tabla, t.funcion);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_resumen_upd AFTER UPDATE ON %1$I
+             REFERENCING OLD TABLE AS filas_viejas NEW TABLE AS filas_nuevas
+             FOR EACH STATEMENT EXECUTE FUNCTION %2$s', t.tabla, t.funcion);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%1$s_resumen_del AFTER DELETE ON %1$I
+             REFERENCING OLD TABLE AS filas_viejas
+             FOR EACH STATEMENT EXECUTE FUNCTION %2$s', t.tabla, t.funcion);
+    END LOOP;
+END $$;
+
+-- Los días que ya tienen datos quedan pendientes: hasta consolidarlos, los
+-- reportes los calculan desde las filas originales.
+INSERT INTO resumen_cambios (tipo, fecha) SELECT DISTINCT 'ventas', fecha FROM ventas;
+INSERT INTO resumen_cambios (tipo, fecha) SELECT DISTINCT 'compras', fecha FROM compras;
@@ -0,0 +1,6 @@
+-- Lotes con existencias ordenados por vencimiento: el dashboard cuenta los
+-- que vencen en los próximos días sin recorrer toda la tabla.
+CREATE INDEX IF NOT EXISTS idx_lotes_vencimiento_con_stock
+    ON lotes (fecha_vencimiento) WHERE cantidad > 0;
+
+ANALYZE lotes;
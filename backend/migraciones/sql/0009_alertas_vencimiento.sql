@@ -0,0 +1,25 @@
+-- Alertas de vencimiento de lotes, escritas por el planificador
+-- (backend/planificador.py, tarea "vencimiento_lotes").
+--
+-- Una alerta por lote y tipo:
+--   'por_vencer': el lote vence dentro de VENCIMIENTO_AVISO_DIAS y tiene stock.
+--   'vencido':    el lote venció; su cantidad se pasó a 0 y queda anotada aquí
+--                 (las unidades perdidas).
+-- El stock_producto se actualiza solo: el UPDATE de lotes dispara los
+-- triggers de la migración 0003.
+
+CREATE TABLE IF NOT EXISTS alertas_vencimiento (
+    id_alerta         serial PRIMARY KEY,
+    id_lote           integer   NOT NULL REFERENCES lotes(id_lote) ON DELETE CASCADE,
+    id_producto       integer   NOT NULL,
+    tipo              text      NOT NULL CHECK (tipo IN ('por_vencer', 'vencido')),
+    fecha_vencimiento date      NOT NULL,
+    cantidad          integer   NOT NULL,
+    creada_en         timestamp NOT NULL DEFAULT now(),
+    atendida          boolean   NOT NULL DEFAULT false,
+    UNIQUE (id_lote, tipo)
+);
+
+-- Listado de alertas pendientes (las atendidas no se consultan)
+CREATE INDEX IF NOT EXISTS idx_alertas_vencimiento_pendientes
+    ON alertas_vencimiento (id_alerta) WHERE NOT atendida;
@@ -0,0 +1,21 @@
+-- Resultados de la sugerencia de reposición (backend/analitica.py).
+--
+-- Una fila por combinación de parámetros (dias, entrega, revision),
+-- compartida por todos los workers: el primero que la reclama lanza el
+-- cálculo ('calculando') y el proceso de analítica guarda el resultado
+-- ('listo') o el error ('error'). Así cualquier worker responde la consulta
+-- y aplica la sugerencia, y no se repite el cálculo en cada uno.
+-- iniciado_en identifica la reclamación: un cálculo que no termina en
+-- ANALITICA_TIMEOUT segundos se da por perdido y se puede volver a lanzar.
+
+CREATE TABLE IF NOT EXISTS analitica_reposicion (
+    dias        integer     NOT NULL,
+    entrega     integer     NOT NULL,
+    revision    integer     NOT NULL,
+    estado      text        NOT NULL CHECK (estado IN ('calculando', 'listo', 'error')),
+    iniciado_en timestamptz NOT NULL,
+    generado_en timestamptz,
+    resultado   json,  -- json y no jsonb: se devuelve tal cual a la API
+    error       text,
+    PRIMARY KEY (dias, entrega, revision)
+);
@@ -0,0 +1,54 @@
+-- Movimientos de stock de solo inserción, para que las ventas del mismo
+-- producto no compitan por su fila de stock_producto.
+--
+-- Con la migración 0003, cada sentencia sobre 'lotes' hacía un upsert en la
+-- fila de resumen de cada producto. Dos cajas que vendían el mismo producto
+-- se esperaban en esa fila hasta confirmar. Ahora el trigger solo inserta la
+-- diferencia en stock_movimientos (como resumen_cambios en 0007), y la tarea
+-- 'consolidar_stock' del planificador la suma al resumen por tandas: en una
+-- misma transacción borra los movimientos y actualiza stock_producto.
+--
+-- El stock vigente es el resumen más los movimientos todavía sin consolidar:
+-- leerlo de la vista stock_actual (una fila por producto). La subconsulta
+-- por producto usa el índice de stock_movimientos y recorre pocas filas
+-- mientras la consolidación se mantenga al día.
+
+CREATE TABLE IF NOT EXISTS stock_movimientos (
+    id_movimiento bigserial PRIMARY KEY,
+    id_producto   integer NOT NULL REFERENCES producto(id_producto) ON DELETE CASCADE,
+    delta         bigint  NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stock_movimientos_producto ON stock_movimientos (id_producto);
+
+-- Misma función que usan los triggers de 0003: ahora solo inserta
+CREATE OR REPLACE FUNCTION fn_stock_producto_lotes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stock_movimientos (id_producto, delta)
+        SELECT id_producto, SUM(cantidad) FROM lotes_nuevos GROUP BY id_producto;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stock_movimientos (id_producto, delta)
+        SELECT id_producto, -SUM(cantidad) FROM lotes_viejos GROUP BY id_producto;
+    ELSE
+        INSERT INTO stock_movimientos (id_producto, delta)
+        SELECT id_producto, SUM(delta)
+        FROM (
+            SELECT id_producto, cantidad AS delta FROM lotes_nuevos
+            UNION ALL
+            SELECT id_producto, -cantidad FROM lotes_viejos
+        ) cambios
+        GROUP BY id_producto
+        HAVING SUM(delta) <> 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE VIEW stock_actual AS
+SELECT p.id_producto,
+       (COALESCE(s.cantidad, 0)
+         + COALESCE((SELECT SUM(m.delta) FROM stock_movimientos m WHERE m.id_producto = p.id_producto), 0)
+       )::bigint AS cantidad,
+       s.actualizado_en
+FROM producto p
+LEFT JOIN stock_producto s ON s.id_producto = p.id_producto;
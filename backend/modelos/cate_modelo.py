@@ -1,17 +1,21 @@
-from typing import List, Dict
+from typing import Dict, Iterable, List
+from backend import sincronizacion
 from backend.db import DB
+from backend.cache import cache_busqueda, cache_referencia
 
 class Categoria:
     """Modelo para la entidad 'categoria_producto'."""
 
+    _DUPLICADA = DB.registrar(
+        "categoria.duplicado",
+        "SELECT id_categoria FROM categoria_producto WHERE LOWER(nombre) = LOWER(%s)",
+    )
+
     @staticmethod
     def agregar(nombre: str) -> int:
         """Agrega una categoría y devuelve su ID."""
         # Verificar si ya existe (ignorando mayúsculas/minúsculas)
-        existente = DB.fetch_one(
-            "SELECT id_categoria FROM categoria_producto WHERE LOWER(nombre) = LOWER(%s)",
-            (nombre,)
-        )
+        existente = DB.fetch_one(Categoria._DUPLICADA, (nombre,))
         if existente:
             raise ValueError("La categoría ya existe")
 
@@ -20,20 +24,41 @@ class Categoria:
             "INSERT INTO categoria_producto(nombre) VALUES(%s) RETURNING id_categoria",
             (nombre,)
         )
+        cache_referencia.invalidar("categorias:")
+        cache_busqueda.invalidar()
         return int(row[0])
 
     @staticmethod
     def listar() -> List[Dict]:
         """Devuelve todas las categorías como lista de diccionarios."""
-        rows = DB.fetch_all(
+        return DB.fetch_dicts(
             "SELECT id_categoria AS id, nombre FROM categoria_producto ORDER BY id_categoria"
         )
-        return [{"id": r[0], "nombre": r[1]} for r in rows]
+
+    @staticmethod
+    def por_ids(ids: Iterable[int]) -> List[Dict]:
+        """Devuelve las categorías ``ids`` con el mismo formato que ``listar``."""
+        return DB.fetch_dicts(
+            "SELECT id_categoria AS id, nombre FROM categoria_producto WHERE id_categoria = ANY(%s) ORDER BY id_categoria",
+            (list(ids),)
+        )
+
+    @staticmethod
+    def cambios_desde(desde: int) -> Dict:
+        """Categorías cambiadas desde la versión ``desde`` (ver backend/sincronizacion)."""
+        return sincronizacion.delta(
+            "categoria_producto", desde,
+            "SELECT id_categoria, nombre FROM categoria_producto "
+            "WHERE version >= %(desde)s::xid8 ORDER BY id_categoria",
+            lambda r: {"id": r[0], "nombre": r[1]}
+        )
 
     @staticmethod
     def eliminar(id_categoria: int):
         """Elimina una categoría por ID."""
         DB.execute("DELETE FROM categoria_producto WHERE id_categoria=%s", (id_categoria,))
+        cache_referencia.invalidar("categorias:")
+        cache_busqueda.invalidar()
 
     @staticmethod
     def editar(id_categoria: int, nombre: str):
@@ -41,4 +66,6 @@ class Categoria:
         DB.execute(
             "UPDATE categoria_producto SET nombre=%s WHERE id_categoria=%s",
             (nombre, id_categoria)
-        )
\ No newline at end of file
+        )
+        cache_referencia.invalidar("categorias:")
+        cache_busqueda.invalidar()
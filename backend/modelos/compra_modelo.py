@@ -0,0 +1,215 @@
+"""Modelo Compra: registro de compras a proveedores, recepción y totales."""
+
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from psycopg2.extras import execute_values
+from backend.db import DB
+from backend.utils import cursores
+
+
+class Compra:
+    """Operaciones sobre las tablas 'compras', 'detalle_compras' y 'lotes'."""
+
+    LIMITE_MAXIMO = 500
+
+    @staticmethod
+    def _validar_lineas(items: Iterable[Dict[str, Any]]) -> List[Tuple[int, Decimal, Decimal]]:
+        """Convierte las líneas a (id_producto, cantidad, precio_unitario)."""
+        lineas = []
+        for item in items:
+            try:
+                id_producto = int(item["id_producto"])
+                cantidad = Decimal(str(item["cantidad"]))
+                precio = Decimal(str(item["precio_unitario"]))
+            except (KeyError, TypeError, ValueError, InvalidOperation):
+                raise ValueError("Cada línea necesita id_producto, cantidad y precio_unitario")
+            if cantidad <= 0 or precio < 0:
+                raise ValueError("Cantidad y precio deben ser positivos")
+            lineas.append((id_producto, cantidad, precio))
+        if not lineas:
+            raise ValueError("La compra no tiene productos")
+        return lineas
+
+    @classmethod
+    def crear(
+        cls,
+        id_proveedor: int,
+        items: Iterable[Dict[str, Any]],
+        fecha: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """
+        Registra una compra (estado 'pendiente') y sus líneas en una sola transacción.
+
+        Las líneas de 'detalle_compras' se insertan con un único INSERT
+        multi-fila (``execute_values``).
+
+        Returns:
+            dict: {"id_compra", "total"}
+        """
+        lineas = cls._validar_lineas(items)
+        total = sum((c * p for _, c, p in lineas), Decimal("0")).quantize(Decimal("0.01"))
+
+        with DB.connection() as (_, cur):
+            cur.execute(
+                "INSERT INTO compras (id_proveedor, fecha, estado, total) "
+                "VALUES (%s, COALESCE(%s, CURRENT_DATE), 'pendiente', %s) RETURNING id_compra",
+                (id_proveedor, fecha, total),
+            )
+            id_compra = cur.fetchone()[0]
+            execute_values(
+                cur,
+                "INSERT INTO detalle_compras (id_compra, id_producto, cantidad, precio_unitario) VALUES %s",
+                [(id_compra, i, c, p) for i, c, p in lineas],
+            )
+        return {"id_compra": id_compra, "total": float(total)}
+
+    @staticmethod
+    def recibir(id_compra: int, vencimientos: Dict[int, date]) -> int:
+        """
+        Marca una compra pendiente como 'recibido' y genera sus lotes.
+
+        Se crea un lote por línea de detalle, con la fecha de vencimiento
+        indicada para su producto, con un único INSERT ... SELECT.
+
+        Args:
+            id_compra (int): Compra a recibir.
+            vencimientos (dict): id_producto → fecha de vencimiento.
+
+        Returns:
+            int: Cantidad de lotes creados.
+
+        Raises:
+            LookupError: La compra no existe o no está pendiente.
+            ValueError: Falta la fecha de vencimiento de algún producto.
+        """
+        with DB.connection() as (_, cur):
+            cur.execute(
+                "UPDATE compras SET estado = 'recibido' "
+                "WHERE id_compra = %s AND estado = 'pendiente' RETURNING id_compra",
+                (id_compra,),
+            )
+            if cur.fetchone() is None:
+                raise LookupError("La compra no existe o no está pendiente")
+
+            cur.execute("SELECT DISTINCT id_producto FROM detalle_compras WHERE id_compra = %s", (id_compra,))
+            sin_fecha = [fila[0] for fila in cur.fetchall() if fila[0] not in vencimientos]
+            if sin_fecha:
+                raise ValueError(f"Falta fecha_vencimiento para los productos {sin_fecha}")
+
+            productos = list(vencimientos)
+            cur.execute(
+                """
+                INSERT INTO lotes (id_producto, fecha_vencimiento, cantidad)
+                SELECT d.id_producto, v.fecha, ROUND(d.cantidad)::integer
+                FROM detalle_compras d
+                JOIN unnest(%s::integer[], %s::date[]) AS v(id_producto, fecha)
+                  ON v.id_producto = d.id_producto
+                WHERE d.id_compra = %s
+                """,
+                (productos, [vencimientos[p] for p in productos], id_compra),
+            )
+            return cur.rowcount
+
+    # ---------------------------
+    # Consultas
+    # ---------------------------
+    @staticmethod
+    def _filtros(
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        proveedor: Optional[int] = None,
+        proveedor_nombre: Optional[str] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        condiciones: List[str] = []
+        params: List[Any] = []
+        if desde:
+            condiciones.append("c.fecha >= %s")
+            params.append(desde)
+        if hasta:
+            condiciones.append("c.fecha <= %s")
+            params.append(hasta)
+        if proveedor:
+            condiciones.append("c.id_proveedor = %s")
+            params.append(proveedor)
+        if proveedor_nombre:
+            condiciones.append("pr.nombre ILIKE %s")
+            params.append("%" + proveedor_nombre.replace("%", "\\%").replace("_", "\\_") + "%")
+        return condiciones, params
+
+    @classmethod
+    def listar(cls, limite: int = 100, cursor: Optional[str] = None, **filtros) -> Dict[str, Any]:
+        """
+        Página de líneas de compra, de la más reciente a la más antigua.
+
+        Paginada por (fecha, id_compra, id_detalle) con cursor, igual que
+        el listado de productos.
+
+        Returns:
+            dict: {"compras": [...], "siguiente": str|None}
+        """
+        limite = max(1, min(int(limite), cls.LIMITE_MAXIMO))
+        condiciones, params = cls._filtros(**filtros)
+        if cursor:
+            fecha, id_compra, id_detalle = cursores.decodificar(cursor, 3)
+            condiciones.append("(c.fecha, c.id_compra, d.id_detalle) < (%s::date, %s, %s)")
+            params.extend([fecha, int(id_compra), int(id_detalle)])
+
+        sql = """
+            SELECT c.id_compra, d.id_detalle, pr.nombre AS proveedor, c.fecha, p.nombre AS producto,
+                   d.cantidad, d.precio_unitario, c.estado, d.cantidad * d.precio_unitario AS total
+            FROM compras c
+            JOIN detalle_compras d ON d.id_compra = c.id_compra
+            JOIN proveedores pr ON pr.id_proveedor = c.id_proveedor
+            JOIN producto p ON p.id_producto = d.id_producto
+        """
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY c.fecha DESC, c.id_compra DESC, d.id_detalle DESC LIMIT %s"
+        params.append(limite + 1)
+
+        filas = DB.fetch_dicts(sql, params)
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        siguiente = None
+        if hay_mas:
+            ultima = filas[-1]
+            siguiente = cursores.codificar((ultima["fecha"], ultima["id_compra"], ultima["id_detalle"]))
+        for f in filas:
+            del f["id_detalle"]  # solo para el cursor
+        return {"compras": filas, "siguiente": siguiente}
+
+    @classmethod
+    def totales(cls, mes: Optional[str] = None, **filtros) -> Dict[str, Any]:
+        """
+        Totales calculados en SQL (se excluyen las compras canceladas).
+
+        Args:
+            mes (str): "YYYY-MM" del que se quiere el total mensual.
+            filtros: desde, hasta, proveedor, proveedor_nombre.
+
+        Returns:
+            dict: {"total_general", "total_mes", "por_mes": [{"mes", "total"}]}
+        """
+        condiciones, params = cls._filtros(**filtros)
+        condiciones.append("c.estado IS DISTINCT FROM 'cancelado'")
+        where = " WHERE " + " AND ".join(condiciones)
+        join = " JOIN proveedores pr ON pr.id_proveedor = c.id_proveedor" if filtros.get("proveedor_nombre") else ""
+
+        filas = DB.fetch_all(
+            f"""
+            SELECT to_char(date_trunc('month', c.fecha), 'YYYY-MM') AS mes, COALESCE(SUM(c.total), 0)
+            FROM compras c{join}{where}
+            GROUP BY ROLLUP (1) ORDER BY 1
+            """,
+            params,
+        )
+        # ROLLUP añade una fila con mes NULL que es el total general (también
+        # sin compras: de ahí el COALESCE)
+        por_mes = [{"mes": m, "total": float(t)} for m, t in filas if m is not None]
+        general = next((float(t) for m, t in filas if m is None), 0.0)
+        return {
+            "total_general": general,
+            "total_mes": next((x["total"] for x in por_mes if x["mes"] == mes), 0.0),
+            "por_mes": por_mes,
+        }
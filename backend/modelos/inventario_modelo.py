@@ -0,0 +1,282 @@
+"""Modelo Inventario: existencias por producto desde la vista 'stock_actual' y vencimiento de lotes."""
+
+from typing import Any, Dict, List, Optional
+from backend.db import DB
+from backend.utils import cursores
+
+
+class Inventario:
+    """Lecturas del resumen de existencias y su conciliación con 'lotes'.
+
+    Los triggers de 'lotes' (migraciones 0003 y 0011) anotan cada cambio en
+    'stock_movimientos' y ``consolidar_stock`` lo suma a 'stock_producto'.
+    La vista 'stock_actual' devuelve el resumen más lo pendiente, así que
+    consultar el stock no suma lotes: es una lectura por producto.
+    """
+
+    LIMITE_MAXIMO = 500
+
+    # Los alias son las claves del JSON (se lee con DB.fetch_dicts)
+    _SELECT = """
+        SELECT p.id_producto, p.nombre, c.nombre AS categoria, COALESCE(s.cantidad, 0) AS stock,
+               p.stock_minimo, COALESCE(s.cantidad, 0) < COALESCE(p.stock_minimo, 0) AS bajo_minimo,
+               s.actualizado_en
+        FROM producto p
+        JOIN categoria_producto c ON c.id_categoria = p.id_categoria
+        LEFT JOIN stock_actual s ON s.id_producto = p.id_producto
+    """
+
+    _STOCK = DB.registrar("inventario.stock", "SELECT cantidad FROM stock_actual WHERE id_producto = %s")
+
+    @classmethod
+    def listar(
+        cls,
+        limite: int = 100,
+        cursor: Optional[str] = None,
+        categoria: Optional[int] = None,
+        solo_bajo_minimo: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Página de existencias ordenada por (nombre, id_producto).
+
+        Returns:
+            dict: {"inventario": [...], "siguiente": str|None}
+        """
+        limite = max(1, min(int(limite), cls.LIMITE_MAXIMO))
+        condiciones: List[str] = []
+        params: List[Any] = []
+        if categoria:
+            condiciones.append("p.id_categoria = %s")
+            params.append(categoria)
+        if solo_bajo_minimo:
+            condiciones.append("COALESCE(s.cantidad, 0) < p.stock_minimo")
+        if cursor:
+            nombre, id_producto = cursores.decodificar(cursor, 2)
+            condiciones.append("(p.nombre, p.id_producto) > (%s, %s)")
+            params.extend([str(nombre), int(id_producto)])
+
+        sql = cls._SELECT
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY p.nombre, p.id_producto LIMIT %s"
+        params.append(limite + 1)
+
+        filas = DB.fetch_dicts(sql, params)
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        return {
+            "inventario": filas,
+            "siguiente": cursores.codificar((filas[-1]["nombre"], filas[-1]["id_producto"])) if hay_mas else None,
+        }
+
+    @staticmethod
+    def stock(id_producto: int) -> int:
+        """Existencias de un producto (0 si nunca tuvo lotes)."""
+        fila = DB.fetch_one(Inventario._STOCK, (id_producto,))
+        return int(fila[0]) if fila else 0
+
+    @staticmethod
+    def conciliar(corregir: bool = False) -> List[Dict[str, Any]]:
+        """
+        Compara el resumen con la suma real de 'lotes' y devuelve las diferencias.
+
+        Con ``corregir=True`` reescribe las filas discrepantes. Para que la
+        comparación y la corrección vean los mismos datos, se toma un candado
+        SHARE sobre 'lotes' mientras dura (bloquea ventas y recepciones unos
+        instantes), por lo que conviene ejecutarlo fuera del horario de caja.
+
+        Returns:
+            list: [{"id_producto", "resumen", "real"}] antes de corregir.
+        """
+        with DB.connection() as (_, cur):
+            if corregir:
+                cur.execute("LOCK TABLE lotes IN SHARE MODE")
+            cur.execute("""
+                SELECT p.id_producto, COALESCE(s.cantidad, 0), COALESCE(l.total, 0)
+                FROM producto p
+                LEFT JOIN stock_actual s ON s.id_producto = p.id_producto
+                LEFT JOIN (
+                    SELECT id_producto, SUM(cantidad) AS total FROM lotes GROUP BY id_producto
+                ) l ON l.id_producto = p.id_producto
+                WHERE COALESCE(s.cantidad, 0) <> COALESCE(l.total, 0)
+                ORDER BY p.id_producto
+            """)
+            diferencias = [
+                {"id_producto": f[0], "resumen": int(f[1]), "real": int(f[2])}
+                for f in cur.fetchall()
+            ]
+            if corregir and diferencias:
+                # El resumen pasa a ser el total real: sus movimientos pendientes ya están incluidos
+                ids = [d["id_producto"] for d in diferencias]
+                cur.execute("DELETE FROM stock_movimientos WHERE id_producto = ANY(%s)", (ids,))
+                cur.execute(
+                    """
+                    INSERT INTO stock_producto (id_producto, cantidad)
+                    SELECT * FROM unnest(%s::integer[], %s::bigint[])
+                    ON CONFLICT (id_producto) DO UPDATE
+                        SET cantidad = EXCLUDED.cantidad, actualizado_en = now()
+                    """,
+                    (ids, [d["real"] for d in diferencias]),
+                )
+        return diferencias
+
+    @staticmethod
+    def consolidar_stock(tam_lote: int) -> int:
+        """
+        Suma a 'stock_producto' hasta ``tam_lote`` movimientos pendientes y los
+        borra, en una transacción corta. La vista 'stock_actual' da lo mismo
+        antes y después.
+
+        Solo bloquea las filas de resumen de los productos movidos; las ventas
+        no las tocan, así que no espera a ninguna caja.
+
+        Returns:
+            int: movimientos consolidados (menos que ``tam_lote`` si no quedan).
+        """
+        with DB.connection() as (_, cur):
+            cur.execute(
+                """
+                WITH movidos AS (
+                    DELETE FROM stock_movimientos
+                    WHERE id_movimiento IN (
+                        SELECT id_movimiento FROM stock_movimientos ORDER BY id_movimiento LIMIT %s
+                    )
+                    RETURNING id_producto, delta
+                ), sumas AS (
+                    INSERT INTO stock_producto AS s (id_producto, cantidad)
+                    SELECT id_producto, SUM(delta) FROM movidos
+                    GROUP BY id_producto ORDER BY id_producto
+                    ON CONFLICT (id_producto) DO UPDATE
+                        SET cantidad = s.cantidad + EXCLUDED.cantidad, actualizado_en = now()
+                )
+                SELECT count(*) FROM movidos
+                """,
+                (tam_lote,),
+            )
+            return cur.fetchone()[0]
+
+    # ---------------------------
+    # Vencimiento de lotes (los llama el planificador)
+    # ---------------------------
+    @staticmethod
+    def vencer_lotes(tam_lote: int) -> List[int]:
+        """
+        Pasa a 0 hasta ``tam_lote`` lotes vencidos con stock y deja una alerta
+        'vencido' por cada uno, en una transacción corta.
+
+        Los lotes bloqueados por una venta en curso se saltan (``SKIP LOCKED``)
+        y se toman en la siguiente tanda; ``lock_timeout`` acota cualquier otra
+        espera (el trigger de 'lotes' solo inserta movimientos de stock).
+
+        Returns:
+            list: id_producto de los lotes vencidos (vacía si no quedan).
+        """
+        with DB.connection() as (_, cur):
+            cur.execute("SET LOCAL lock_timeout = '2s'")
+            cur.execute(
+                """
+                WITH vencidos AS (
+                    SELECT id_lote, id_producto, fecha_vencimiento, cantidad
+                    FROM lotes
+                    WHERE cantidad > 0 AND fecha_vencimiento < CURRENT_DATE
+                    ORDER BY fecha_vencimiento, id_lote
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ), alertas AS (
+                    INSERT INTO alertas_vencimiento AS a (id_lote, id_producto, tipo, fecha_vencimiento, cantidad)
+                    SELECT id_lote, id_producto, 'vencido', fecha_vencimiento, cantidad FROM vencidos
+                    ON CONFLICT (id_lote, tipo) DO UPDATE
+                        SET cantidad = a.cantidad + EXCLUDED.cantidad, atendida = false
+                )
+                UPDATE lotes l SET cantidad = 0
+                FROM vencidos v
+                WHERE l.id_lote = v.id_lote
+                RETURNING l.id_producto
+                """,
+                (tam_lote,),
+            )
+            return [f[0] for f in cur.fetchall()]
+
+    @staticmethod
+    def avisar_por_vencer(dias: int, tam_lote: int) -> int:
+        """Crea hasta ``tam_lote`` alertas 'por_vencer' nuevas. No bloquea los lotes."""
+        return DB.execute(
+            """
+            INSERT INTO alertas_vencimiento (id_lote, id_producto, tipo, fecha_vencimiento, cantidad)
+            SELECT l.id_lote, l.id_producto, 'por_vencer', l.fecha_vencimiento, l.cantidad
+            FROM lotes l
+            WHERE l.cantidad > 0
+              AND l.fecha_vencimiento BETWEEN CURRENT_DATE AND CURRENT_DATE + %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM alertas_vencimiento a WHERE a.id_lote = l.id_lote AND a.tipo = 'por_vencer'
+              )
+            ORDER BY l.fecha_vencimiento, l.id_lote
+            LIMIT %s
+            ON CONFLICT (id_lote, tipo) DO NOTHING
+            """,
+            (dias, tam_lote),
+        )
+
+    @staticmethod
+    def pendientes_vencimiento(dias: int) -> Dict[str, int]:
+        """Trabajo atrasado: lotes vencidos con stock, por vencer sin alerta y alertas sin atender."""
+        vencidos, sin_alerta, sin_atender = DB.fetch_one(
+            """
+            SELECT count(*) FILTER (WHERE l.fecha_vencimiento < CURRENT_DATE),
+                   count(*) FILTER (WHERE l.fecha_vencimiento >= CURRENT_DATE AND NOT EXISTS (
+                       SELECT 1 FROM alertas_vencimiento a WHERE a.id_lote = l.id_lote AND a.tipo = 'por_vencer')),
+                   (SELECT count(*) FROM alertas_vencimiento WHERE NOT atendida)
+            FROM lotes l
+            WHERE l.cantidad > 0 AND l.fecha_vencimiento <= CURRENT_DATE + %s
+            """,
+            (dias,),
+        )
+        return {"vencidos_con_stock": vencidos, "por_vencer_sin_alerta": sin_alerta, "alertas_sin_atender": sin_atender}
+
+    @staticmethod
+    def alertas(limite: int = 100, cursor: Optional[str] = None, tipo: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Alertas de vencimiento sin atender, de la más reciente a la más antigua.
+
+        Returns:
+            dict: {"alertas": [...], "siguiente": str|None}
+        """
+        limite = max(1, min(int(limite), Inventario.LIMITE_MAXIMO))
+        condiciones = ["NOT a.atendida"]
+        params: List[Any] = []
+        if tipo:
+            if tipo not in ("por_vencer", "vencido"):
+                raise ValueError("tipo debe ser 'por_vencer' o 'vencido'")
+            condiciones.append("a.tipo = %s")
+            params.append(tipo)
+        if cursor:
+            (id_alerta,) = cursores.decodificar(cursor, 1)
+            condiciones.append("a.id_alerta < %s")
+            params.append(int(id_alerta))
+        params.append(limite + 1)
+        filas = DB.fetch_dicts(
+            """
+            SELECT a.id_alerta, a.tipo, a.id_lote, a.id_producto, p.nombre AS producto,
+                   a.fecha_vencimiento, a.cantidad, a.creada_en
+            FROM alertas_vencimiento a
+            JOIN producto p ON p.id_producto = a.id_producto
+            WHERE """ + " AND ".join(condiciones) + """
+            ORDER BY a.id_alerta DESC
+            LIMIT %s
+            """,
+            params,
+        )
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        return {
+            "alertas": filas,
+            "siguiente": cursores.codificar((filas[-1]["id_alerta"],)) if hay_mas else None,
+        }
+
+    @staticmethod
+    def atender_alerta(id_alerta: int) -> bool:
+        """Marca una alerta como atendida. Devuelve False si no existe o ya lo estaba."""
+        return DB.execute(
+            "UPDATE alertas_vencimiento SET atendida = true WHERE id_alerta = %s AND NOT atendida",
+            (id_alerta,),
+        ) > 0
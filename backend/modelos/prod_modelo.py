@@ -0,0 +1,650 @@
+"""Modelo Producto: listados, paginación por cursor e importación/exportación masiva."""
+
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from backend import sincronizacion
+from backend.db import DB
+from backend.utils import cursores
+
+
+class Producto:
+    """Consultas de listado y carga masiva sobre la tabla 'producto'."""
+
+    LIMITE_MAXIMO = 200
+
+    _SELECT = """
+        SELECT p.id_producto, p.nombre, c.nombre as categoria, pr.nombre as proveedor,
+               p.precio_compra, p.precio_venta, p.stock_minimo, p.descripcion,
+               c.id_categoria, pr.id_proveedor, p.codigo
+        FROM producto p
+        JOIN categoria_producto c ON p.id_categoria = c.id_categoria
+        JOIN proveedores pr ON p.id_proveedor = pr.id_proveedor
+    """
+
+    @staticmethod
+    def _a_dict(p: Tuple) -> Dict[str, Any]:
+        """Convierte una fila del listado en diccionario serializable."""
+        return {
+            "id_producto": p[0],
+            "nombre": p[1],
+            "categoria": p[2],
+            "proveedor": p[3],
+            "precio_compra": float(p[4]),
+            "precio_venta": float(p[5]),
+            "stock_minimo": p[6],
+            "descripcion": p[7],
+            "id_categoria": p[8],
+            "id_proveedor": p[9],
+            "codigo": p[10]
+        }
+
+    @staticmethod
+    def _filtros(
+        categoria: Optional[int] = None,
+        proveedor: Optional[int] = None,
+        q: Optional[str] = None,
+        precio_min: Optional[float] = None,
+        precio_max: Optional[float] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        """Arma las condiciones WHERE (todas sobre la tabla 'producto p')."""
+        condiciones: List[str] = []
+        params: List[Any] = []
+        if categoria:
+            condiciones.append("p.id_categoria = %s")
+            params.append(categoria)
+        if proveedor:
+            condiciones.append("p.id_proveedor = %s")
+            params.append(proveedor)
+        if q:
+            patron = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            condiciones.append("(p.nombre ILIKE %s OR p.codigo ILIKE %s OR p.descripcion ILIKE %s)")
+            params.extend([patron, patron, patron])
+        if precio_min is not None:
+            condiciones.append("p.precio_venta >= %s")
+            params.append(precio_min)
+        if precio_max is not None:
+            condiciones.append("p.precio_venta <= %s")
+            params.append(precio_max)
+        return condiciones, params
+
+    @classmethod
+    def iterar(cls, **filtros) -> Iterator[Dict[str, Any]]:
+        """Recorre todos los productos que cumplen los filtros, ordenados por nombre."""
+        condiciones, params = cls._filtros(**filtros)
+        sql = cls._SELECT
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY p.nombre, p.id_producto"
+        # Las columnas de _SELECT ya tienen los nombres de _a_dict
+        return DB.stream(sql, params, como_dict=True, para_json=True)
+
+    # ---------------------------
+    # Paginación por cursor
+    # ---------------------------
+    @classmethod
+    def pagina(
+        cls,
+        limite: int = 50,
+        cursor: Optional[str] = None,
+        descendente: bool = False,
+        con_total: bool = False,
+        **filtros,
+    ) -> Dict[str, Any]:
+        """
+        Devuelve una página de productos ordenada por (nombre, id_producto).
+
+        La página siguiente se pide con el token ``siguiente``; la consulta
+        usa una comparación de fila sobre la clave de orden en lugar de
+        OFFSET, así que cuesta lo mismo en la primera página que en la última.
+
+        Args:
+            limite (int): Filas por página (1..LIMITE_MAXIMO).
+            cursor (str): Token ``siguiente`` de la página anterior.
+            descendente (bool): Orden Z→A.
+            con_total (bool): Incluir ``total_estimado`` (estimación del planificador).
+            filtros: categoria, proveedor, q, precio_min, precio_max.
+
+        Returns:
+            dict: {"productos": [...], "siguiente": str|None[, "total_estimado": int]}
+        """
+        limite = max(1, min(int(limite), cls.LIMITE_MAXIMO))
+        condiciones, params = cls._filtros(**filtros)
+        resultado: Dict[str, Any] = {}
+
+        if con_total:
+            sql_total = "SELECT 1 FROM producto p"
+            if condiciones:
+                sql_total += " WHERE " + " AND ".join(condiciones)
+            resultado["total_estimado"] = DB.estimar_filas(sql_total, params)
+
+        direccion = "DESC" if descendente else "ASC"
+        condiciones_pagina = list(condiciones)
+        params_pagina = list(params)
+        if cursor:
+            nombre, id_producto = cursores.decodificar(cursor, 2)
+            condiciones_pagina.append(f"(p.nombre, p.id_producto) {'<' if descendente else '>'} (%s, %s)")
+            params_pagina.extend([str(nombre), int(id_producto)])
+
+        sql = cls._SELECT
+        if condiciones_pagina:
+            sql += " WHERE " + " AND ".join(condiciones_pagina)
+        sql += f" ORDER BY p.nombre {direccion}, p.id_producto {direccion} LIMIT %s"
+        params_pagina.append(limite + 1)  # una fila extra indica si hay otra página
+
+        filas = DB.fetch_dicts(sql, params_pagina)
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+
+        resultado["productos"] = filas
+        resultado["siguiente"] = (
+            cursores.codificar((filas[-1]["nombre"], filas[-1]["id_producto"])) if hay_mas else None
+        )
+        return resultado
+
+    # ---------------------------
+    # Búsqueda aproximada (typeahead)
+    # ---------------------------
+    LIMITE_SUGERENCIAS = 50
+
+    # Cada rama del UNION usa su propio índice de trigramas (migración 0004);
+    # un OR sobre las cinco condiciones obligaría a recorrer la tabla.
+    # Por categoría y proveedor entran solo los 5 más parecidos y de cada uno
+    # a lo sumo ``limite`` productos: por esa vía todos puntúan igual, así que
+    # no hace falta traer todos los productos de una categoría grande.
+    _SQL_SIMILARES = DB.registrar("producto.buscar_similares", """
+        WITH cat AS (
+                 SELECT id_categoria, word_similarity(%(q)s, nombre) AS s
+                 FROM categoria_producto WHERE %(q)s <%% nombre
+                 ORDER BY s DESC LIMIT 5
+             ),
+             prov AS (
+                 SELECT id_proveedor, word_similarity(%(q)s, nombre) AS s
+                 FROM proveedores WHERE %(q)s <%% nombre
+                 ORDER BY s DESC LIMIT 5
+             ),
+             candidatos AS (
+                 SELECT id_producto FROM producto WHERE %(q)s <%% nombre
+                 UNION SELECT id_producto FROM producto WHERE codigo ILIKE %(prefijo)s
+                 UNION SELECT id_producto FROM producto WHERE %(q)s <%% descripcion
+                 UNION SELECT x.id_producto FROM cat CROSS JOIN LATERAL (
+                     SELECT id_producto FROM producto WHERE id_categoria = cat.id_categoria LIMIT %(limite)s
+                 ) x
+                 UNION SELECT x.id_producto FROM prov CROSS JOIN LATERAL (
+                     SELECT id_producto FROM producto WHERE id_proveedor = prov.id_proveedor LIMIT %(limite)s
+                 ) x
+             )
+        SELECT p.id_producto, p.codigo, p.nombre, p.precio_venta, c.nombre, pr.nombre,
+               GREATEST(
+                   word_similarity(%(q)s, p.nombre),
+                   CASE WHEN p.codigo ILIKE %(prefijo)s THEN 1 ELSE 0 END,
+                   word_similarity(%(q)s, COALESCE(p.descripcion, '')) * 0.8,
+                   COALESCE(cat.s, 0) * 0.6,
+                   COALESCE(prov.s, 0) * 0.5
+               ) AS puntaje
+        FROM candidatos k
+        JOIN producto p ON p.id_producto = k.id_producto
+        JOIN categoria_producto c ON c.id_categoria = p.id_categoria
+        LEFT JOIN proveedores pr ON pr.id_proveedor = p.id_proveedor
+        LEFT JOIN cat ON cat.id_categoria = p.id_categoria
+        LEFT JOIN prov ON prov.id_proveedor = p.id_proveedor
+        ORDER BY puntaje DESC, p.nombre, p.id_producto
+        LIMIT %(limite)s
+    """)
+
+    # Con una o dos letras los trigramas no discriminan: se busca por prefijo
+    _SQL_PREFIJO = DB.registrar("producto.buscar_prefijo", """
+        SELECT p.id_producto, p.codigo, p.nombre, p.precio_venta, c.nombre, pr.nombre, 1.0
+        FROM producto p
+        JOIN categoria_producto c ON c.id_categoria = p.id_categoria
+        LEFT JOIN proveedores pr ON pr.id_proveedor = p.id_proveedor
+        WHERE p.nombre ILIKE %(prefijo)s OR p.codigo ILIKE %(prefijo)s
+        ORDER BY p.nombre, p.id_producto
+        LIMIT %(limite)s
+    """)
+
+    _POR_IDS = DB.registrar("producto.por_ids", _SELECT + " WHERE p.id_producto = ANY(%s) ORDER BY p.id_producto")
+
+    @classmethod
+    def por_ids(cls, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Filas del listado para los productos ``ids`` (para el flujo de cambios)."""
+        return DB.fetch_dicts(cls._POR_IDS, (list(ids),))
+
+    @classmethod
+    def cambios_desde(cls, desde: int) -> Dict[str, Any]:
+        """
+        Productos cambiados desde la versión ``desde`` (ver backend/sincronizacion).
+
+        Incluye los productos cuya categoría o proveedor cambió, porque el
+        listado lleva sus nombres.
+        """
+        sql = cls._SELECT + """
+            WHERE p.id_producto IN (
+                SELECT id_producto FROM producto WHERE version >= %(desde)s::xid8
+                UNION
+                SELECT id_producto FROM producto WHERE id_categoria IN (
+                    SELECT id_categoria FROM categoria_producto WHERE version >= %(desde)s::xid8)
+                UNION
+                SELECT id_producto FROM producto WHERE id_proveedor IN (
+                    SELECT id_proveedor FROM proveedores WHERE version >= %(desde)s::xid8)
+            )
+            ORDER BY p.id_producto
+        """
+        return sincronizacion.delta("producto", desde, sql, cls._a_dict)
+
+    @classmethod
+    def normalizar_busqueda(cls, q: str, limite: int) -> Tuple[str, int]:
+        """Texto y límite tal como los usa ``buscar_similares`` (sirven de clave de caché)."""
+        return " ".join(q.split())[:100], max(1, min(int(limite), cls.LIMITE_SUGERENCIAS))
+
+    @classmethod
+    def buscar_similares(cls, q: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Sugerencias para el buscador, ordenadas por similitud.
+
+        Compara ``q`` contra nombre, código (prefijo), descripción, categoría y
+        proveedor; el nombre y el código pesan más que el resto.
+
+        Returns:
+            list: [{"id_producto", "codigo", "nombre", "precio_venta", "categoria", "proveedor", "puntaje"}]
+        """
+        q, limite = cls.normalizar_busqueda(q, limite)
+        if not q:
+            return []
+        prefijo = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        sql = cls._SQL_SIMILARES if len(q) >= 3 else cls._SQL_PREFIJO
+        filas = DB.fetch_all(sql, {"q": q, "prefijo": prefijo, "limite": limite})
+        return [
+            {
+                "id_producto": f[0],
+                "codigo": f[1],
+                "nombre": f[2],
+                "precio_venta": float(f[3]),
+                "categoria": f[4],
+                "proveedor": f[5],
+                "puntaje": round(float(f[6]), 3),
+            }
+            for f in filas
+        ]
+
+    # ---------------------------
+    # Actualización masiva
+    # ---------------------------
+    # Columna → tipo SQL y modos de cambio admitidos
+    CAMPOS_MASIVOS = {
+        "precio_compra": ("numeric", ("porcentaje", "monto", "valor")),
+        "precio_venta": ("numeric", ("porcentaje", "monto", "valor")),
+        "stock_minimo": ("integer", ("porcentaje", "monto", "valor")),
+        "id_categoria": ("integer", ("valor",)),
+    }
+    MUESTRA_MAXIMA = 100
+
+    @classmethod
+    def _expresion(cls, campo: str, cambio: Any) -> Tuple[str, List[Any]]:
+        """SQL del valor nuevo de ``campo`` (calculado sobre la fila ``p``)."""
+        tipo, modos = cls.CAMPOS_MASIVOS[campo]
+        if not isinstance(cambio, dict):
+            cambio = {"valor": cambio}
+        if len(cambio) != 1 or next(iter(cambio)) not in modos:
+            raise ValueError(f"{campo}: indique uno de " + ", ".join(modos))
+        modo, valor = next(iter(cambio.items()))
+        try:
+            numero = Decimal(str(valor))
+            if not numero.is_finite():
+                raise InvalidOperation
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"{campo}: '{valor}' no es un número válido")
+        if tipo == "integer" and modo != "porcentaje":
+            if numero != numero.to_integral_value():
+                raise ValueError(f"{campo}: debe ser un número entero")
+            numero = int(numero)
+
+        if modo == "valor":
+            return f"%s::{tipo}", [numero]
+        if modo == "monto":
+            return f"p.{campo} + %s::{tipo}", [numero]
+        if tipo == "integer":
+            return f"round(p.{campo} * (1 + %s::numeric / 100))::integer", [numero]
+        return f"round(p.{campo} * (1 + %s::numeric / 100), 2)", [numero]
+
+    @classmethod
+    def _sql_masivo(
+        cls, cambios: Dict[str, Any], seleccion: Dict[str, Any], bloquear: bool
+    ) -> Tuple[str, List[Any], List[str]]:
+        """
+        CTE ``objetivo`` con los productos seleccionados que cambian: sus
+        valores actuales y los nuevos (columnas ``nuevo_<campo>``).
+
+        Returns:
+            tuple: (sql del CTE, parámetros, campos modificados)
+        """
+        if not cambios:
+            raise ValueError("Indique al menos un cambio")
+        desconocidos = set(cambios) - cls.CAMPOS_MASIVOS.keys()
+        if desconocidos:
+            raise ValueError("Campos no modificables: " + ", ".join(sorted(desconocidos)))
+
+        condiciones: List[str] = []
+        params_where: List[Any] = []
+        if seleccion.get("categoria"):
+            condiciones.append("p.id_categoria = %s")
+            params_where.append(int(seleccion["categoria"]))
+        if seleccion.get("proveedor"):
+            condiciones.append("p.id_proveedor = %s")
+            params_where.append(int(seleccion["proveedor"]))
+        if seleccion.get("ids"):
+            ids = seleccion["ids"]
+            if not isinstance(ids, list):
+                raise ValueError("ids debe ser una lista")
+            condiciones.append("p.id_producto = ANY(%s)")
+            params_where.append([int(i) for i in ids])
+        if not condiciones:
+            # Sin selección el cambio alcanzaría a todo el catálogo: se pide explícito
+            raise ValueError("Indique categoria, proveedor o ids de los productos a modificar")
+
+        campos = [c for c in cls.CAMPOS_MASIVOS if c in cambios]
+        expresiones: List[str] = []
+        params_expr: List[Any] = []
+        for campo in campos:
+            sql_campo, params_campo = cls._expresion(campo, cambios[campo])
+            expresiones.append(sql_campo)
+            params_expr.extend(params_campo)
+
+        # Las filas que quedarían igual no se tocan (ni cuentan como afectadas)
+        condiciones.append(
+            "(" + ", ".join(f"p.{c}" for c in campos) + ") IS DISTINCT FROM ("
+            + ", ".join(expresiones) + ")"
+        )
+        sql = (
+            "WITH objetivo AS ("
+            " SELECT p.id_producto, p.codigo, p.nombre, "
+            + ", ".join(f"p.{c}" for c in campos) + ", "
+            + ", ".join(f"{e} AS nuevo_{c}" for c, e in zip(campos, expresiones))
+            + " FROM producto p WHERE " + " AND ".join(condiciones)
+            + " ORDER BY p.id_producto"
+            + (" FOR UPDATE" if bloquear else "")
+            + ")"
+        )
+        return sql, params_expr + params_where + params_expr, campos
+
+    @staticmethod
+    def _diferencia(fila: Tuple, campos: List[str]) -> Dict[str, Any]:
+        """Fila del CTE ``objetivo`` → {"id_producto", "codigo", "nombre", "antes", "despues"}."""
+        n = len(campos)
+
+        def convertir(v):
+            return float(v) if isinstance(v, Decimal) else v
+
+        return {
+            "id_producto": fila[0],
+            "codigo": fila[1],
+            "nombre": fila[2],
+            "antes": {c: convertir(v) for c, v in zip(campos, fila[3:3 + n])},
+            "despues": {c: convertir(v) for c, v in zip(campos, fila[3 + n:3 + 2 * n])},
+        }
+
+    @classmethod
+    def actualizar_masivo(
+        cls,
+        cambios: Dict[str, Any],
+        seleccion: Dict[str, Any],
+        simular: bool = False,
+        muestra: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Aplica el mismo cambio a muchos productos con un único UPDATE.
+
+        Args:
+            cambios (dict): {campo: {"porcentaje"|"monto"|"valor": número}}
+                para precio_compra, precio_venta y stock_minimo, o
+                {"id_categoria": id} para reasignar la categoría.
+            seleccion (dict): categoria, proveedor y/o ids (se combinan con AND).
+            simular (bool): Solo calcular el resultado. Es un SELECT sin
+                bloqueos: no frena las ventas ni las ediciones en curso.
+            muestra (int): Cuántas diferencias incluir (0..MUESTRA_MAXIMA).
+
+        Returns:
+            dict: {"simulado", "afectados", "muestra": [...], "ids"} (``ids``
+                  solo al aplicar).
+
+        Lanza ValueError si los datos no son válidos o si algún valor
+        resultante sería negativo; en ese caso no se modifica nada.
+        """
+        muestra = max(0, min(int(muestra), cls.MUESTRA_MAXIMA))
+        cte, params, campos = cls._sql_masivo(cambios, seleccion, bloquear=not simular)
+        negativos = " OR ".join(f"nuevo_{c} < 0" for c in campos if c != "id_categoria") or "false"
+
+        if simular:
+            with DB.connection() as (_, cur):
+                cur.execute("SET TRANSACTION READ ONLY")
+                cur.execute(
+                    cte + " SELECT *, count(*) OVER (), count(*) FILTER (WHERE " + negativos + ") OVER ()"
+                    " FROM objetivo ORDER BY id_producto LIMIT %s",
+                    params + [max(muestra, 1)],
+                )
+                filas = cur.fetchall()
+            afectados = filas[0][-2] if filas else 0
+            resultado = {
+                "simulado": True,
+                "afectados": afectados,
+                "muestra": [cls._diferencia(f, campos) for f in filas[:muestra]],
+            }
+            if filas and filas[0][-1]:
+                resultado["negativos"] = filas[0][-1]
+            return resultado
+
+        # Las filas se bloquean en orden de id (FOR UPDATE en el CTE), así dos
+        # actualizaciones masivas que se solapan no se bloquean mutuamente.
+        sql = (
+            cte + " UPDATE producto p SET "
+            + ", ".join(f"{c} = o.nuevo_{c}" for c in campos)
+            + " FROM objetivo o WHERE p.id_producto = o.id_producto"
+            " RETURNING o.*, (" + negativos.replace("nuevo_", "o.nuevo_") + ")"
+        )
+        with DB.connection() as (_, cur):
+            cur.execute(sql, params)
+            filas = sorted(cur.fetchall())
+            if any(f[-1] for f in filas):
+                # Se lanza dentro de la transacción: el rollback deshace el UPDATE
+                raise ValueError(
+                    f"{sum(1 for f in filas if f[-1])} productos quedarían con valores negativos; no se aplicó ningún cambio"
+                )
+        return {
+            "simulado": False,
+            "afectados": len(filas),
+            "muestra": [cls._diferencia(f, campos) for f in filas[:muestra]],
+            "ids": [f[0] for f in filas],
+        }
+
+    # ---------------------------
+    # Importación / exportación CSV
+    # ---------------------------
+    COLUMNAS_CSV = (
+        "codigo", "nombre", "descripcion", "categoria", "proveedor",
+        "precio_compra", "precio_venta", "stock_minimo",
+    )
+    TAM_LOTE_IMPORTACION = 1000
+    MAX_ERRORES_REPORTADOS = 1000
+
+    @staticmethod
+    def _validar_fila(fila: Dict[str, str]) -> Tuple[Optional[tuple], List[str]]:
+        """Valida y convierte una fila del CSV. Devuelve (valores, errores)."""
+        errores = []
+        codigo = (fila.get("codigo") or "").strip()
+        nombre = (fila.get("nombre") or "").strip()
+        categoria = (fila.get("categoria") or "").strip()
+        proveedor = (fila.get("proveedor") or "").strip()
+
+        if not codigo:
+            errores.append("codigo vacío")
+        elif len(codigo) > 50:
+            errores.append("codigo excede 50 caracteres")
+        if not nombre:
+            errores.append("nombre vacío")
+        elif len(nombre) > 50:
+            errores.append("nombre excede 50 caracteres")
+        if not categoria:
+            errores.append("categoria vacía")
+        if not proveedor:
+            errores.append("proveedor vacío")
+
+        numeros = {}
+        for campo in ("precio_compra", "precio_venta"):
+            try:
+                valor = Decimal((fila.get(campo) or "").strip())
+                # numeric(10,2): un valor fuera de rango abortaría el COPY entero
+                if not valor.is_finite() or valor < 0 or valor >= Decimal("100000000"):
+                    raise InvalidOperation
+                numeros[campo] = valor
+            except InvalidOperation:
+                errores.append(f"{campo} inválido")
+        try:
+            numeros["stock_minimo"] = int((fila.get("stock_minimo") or "0").strip() or 0)
+            if numeros["stock_minimo"] < 0:
+                raise ValueError
+        except ValueError:
+            errores.append("stock_minimo inválido")
+
+        if errores:
+            return None, errores
+        return (
+            codigo, nombre, (fila.get("descripcion") or "").strip(), categoria, proveedor,
+            numeros["precio_compra"], numeros["precio_venta"], numeros["stock_minimo"],
+        ), []
+
+    @staticmethod
+    def _resolver_ids(cur, tabla: str, columna_id: str, nombres: Iterable[str], mapa: Dict[str, int]) -> None:
+        """Completa ``mapa`` (nombre en minúsculas → id) con una sola consulta por lote."""
+        faltantes = list({n.lower() for n in nombres} - mapa.keys())
+        if not faltantes:
+            return
+        cur.execute(
+            f"SELECT LOWER(nombre), MIN({columna_id}) FROM {tabla} "
+            f"WHERE LOWER(nombre) = ANY(%s) GROUP BY LOWER(nombre)",
+            (faltantes,),
+        )
+        mapa.update(cur.fetchall())
+
+    @classmethod
+    def importar_csv(cls, texto: Iterable[str]) -> Dict[str, Any]:
+        """
+        Importa productos desde un CSV con encabezado (ver ``COLUMNAS_CSV``).
+
+        Las filas se leen y validan por lotes; categoría y proveedor se
+        indican por nombre y se resuelven a id con una consulta por lote. Las
+        filas válidas se cargan con COPY a una tabla temporal y al final se
+        aplica un único INSERT ... ON CONFLICT (codigo) DO UPDATE. Todo ocurre
+        en una transacción: o se aplica la importación completa o nada.
+
+        Args:
+            texto (Iterable[str]): Líneas del archivo (p. ej. un TextIOWrapper).
+
+        Returns:
+            dict: insertados, actualizados, rechazados y la lista de errores
+                  por fila (número de línea del CSV, contando el encabezado).
+        """
+        lector = csv.DictReader(texto)
+        faltan = [c for c in ("codigo", "nombre", "categoria", "proveedor", "precio_compra", "precio_venta")
+                  if c not in (lector.fieldnames or [])]
+        if faltan:
+            raise ValueError("Faltan columnas en el CSV: " + ", ".join(faltan))
+
+        errores: List[Dict[str, Any]] = []
+        rechazados = 0
+        categorias: Dict[str, int] = {}
+        proveedores: Dict[str, int] = {}
+
+        def registrar_error(linea: int, motivos: List[str]):
+            nonlocal rechazados
+            rechazados += 1
+            if len(errores) < cls.MAX_ERRORES_REPORTADOS:
+                errores.append({"fila": linea, "errores": motivos})
+
+        with DB.connection() as (_, cur):
+            cur.execute("""
+                CREATE TEMP TABLE tmp_importacion_producto (
+                    fila integer, codigo varchar(50), nombre varchar(50), descripcion text,
+                    id_categoria integer, id_proveedor integer,
+                    precio_compra numeric(10,2), precio_venta numeric(10,2), stock_minimo integer
+                ) ON COMMIT DROP
+            """)
+
+            def cargar_lote(lote: List[Tuple[int, tuple]]):
+                cls._resolver_ids(cur, "categoria_producto", "id_categoria", (v[3] for _, v in lote), categorias)
+                cls._resolver_ids(cur, "proveedores", "id_proveedor", (v[4] for _, v in lote), proveedores)
+
+                buffer = io.StringIO()
+                escritor = csv.writer(buffer)
+                for linea, v in lote:
+                    id_cat = categorias.get(v[3].lower())
+                    id_prov = proveedores.get(v[4].lower())
+                    motivos = []
+                    if id_cat is None:
+                        motivos.append(f"categoria '{v[3]}' no existe")
+                    if id_prov is None:
+                        motivos.append(f"proveedor '{v[4]}' no existe")
+                    if motivos:
+                        registrar_error(linea, motivos)
+                        continue
+                    escritor.writerow((linea, v[0], v[1], v[2], id_cat, id_prov, v[5], v[6], v[7]))
+                buffer.seek(0)
+                cur.copy_expert("COPY tmp_importacion_producto FROM STDIN WITH (FORMAT csv)", buffer)
+
+            lote: List[Tuple[int, tuple]] = []
+            for fila in lector:
+                linea = lector.line_num
+                valores, motivos = cls._validar_fila(fila)
+                if motivos:
+                    registrar_error(linea, motivos)
+                    continue
+                lote.append((linea, valores))
+                if len(lote) >= cls.TAM_LOTE_IMPORTACION:
+                    cargar_lote(lote)
+                    lote = []
+            if lote:
+                cargar_lote(lote)
+
+            # Si un código se repite en el archivo gana la última fila
+            cur.execute("""
+                INSERT INTO producto (codigo, nombre, descripcion, id_categoria, id_proveedor,
+                                      precio_compra, precio_venta, stock_minimo)
+                SELECT DISTINCT ON (codigo)
+                       codigo, nombre, descripcion, id_categoria, id_proveedor,
+                       precio_compra, precio_venta, stock_minimo
+                FROM tmp_importacion_producto
+                ORDER BY codigo, fila DESC
+                ON CONFLICT (codigo) DO UPDATE SET
+                    nombre = EXCLUDED.nombre,
+                    descripcion = EXCLUDED.descripcion,
+                    id_categoria = EXCLUDED.id_categoria,
+                    id_proveedor = EXCLUDED.id_proveedor,
+                    precio_compra = EXCLUDED.precio_compra,
+                    precio_venta = EXCLUDED.precio_venta,
+                    stock_minimo = EXCLUDED.stock_minimo
+                RETURNING (xmax = 0) AS insertado
+            """)
+            marcas = [fila[0] for fila in cur.fetchall()]
+
+        insertados = sum(1 for m in marcas if m)
+        return {
+            "insertados": insertados,
+            "actualizados": len(marcas) - insertados,
+            "rechazados": rechazados,
+            "errores": errores,
+            "errores_truncados": rechazados > len(errores),
+        }
+
+    @staticmethod
+    def exportar_csv() -> Iterator[bytes]:
+        """CSV de todos los productos (mismo formato que acepta ``importar_csv``) vía COPY TO STDOUT."""
+        return DB.copy_stream("""
+            COPY (
+                SELECT p.codigo, p.nombre, p.descripcion, c.nombre AS categoria, pr.nombre AS proveedor,
+                       p.precio_compra, p.precio_venta, p.stock_minimo
+                FROM producto p
+                JOIN categoria_producto c ON p.id_categoria = c.id_categoria
+                JOIN proveedores pr ON p.id_proveedor = pr.id_proveedor
+                ORDER BY p.id_producto
+            ) TO STDOUT WITH (FORMAT csv, HEADER true)
+        """)
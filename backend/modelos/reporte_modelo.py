@@ -0,0 +1,257 @@
+"""Modelo Reporte: reportes de ventas y compras sobre resúmenes diarios."""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+from backend.db import DB
+
+
+class ConsolidacionEnCursoError(RuntimeError):
+    """Otro proceso está consolidando los resúmenes en este momento."""
+
+
+class Reporte:
+    """
+    Reportes agregados de ventas y compras (migración 0007).
+
+    Los días cerrados se leen de ``resumen_ventas_diario`` /
+    ``resumen_compras_diario``; el día en curso y los días con cambios
+    todavía sin consolidar (anotados en ``resumen_cambios``) se calculan
+    desde las tablas originales. Las dos partes se unen antes de agrupar, así
+    que el resultado es el mismo que sobre las filas originales.
+    """
+
+    TIPOS = ("ventas", "compras")
+    AGRUPACIONES = {
+        "ventas": ("dia", "semana", "mes", "categoria", "producto", "metodo_pago"),
+        "compras": ("dia", "semana", "mes", "categoria", "producto", "proveedor"),
+    }
+    DIAS_POR_DEFECTO = 30
+    DIAS_POR_LOTE = 31  # días consolidados por transacción
+
+    # Filas por día desde el resumen (días cerrados) y desde las tablas
+    # originales (hoy y días pendientes), con las mismas columnas.
+    _BASE = {
+        "ventas": """
+            WITH pendientes AS (
+                SELECT DISTINCT fecha FROM resumen_cambios
+                WHERE tipo = 'ventas' AND fecha BETWEEN %(desde)s AND %(hasta)s
+            ), base AS (
+                SELECT r.fecha, r.id_producto, r.metodo_pago, r.unidades, r.ingresos, r.costo
+                FROM resumen_ventas_diario r
+                WHERE r.fecha BETWEEN %(desde)s AND %(hasta)s
+                  AND r.fecha < CURRENT_DATE
+                  AND r.fecha NOT IN (SELECT fecha FROM pendientes)
+                UNION ALL
+                SELECT v.fecha, d.id_producto, COALESCE(v.metodo_pago, 'sin_dato'),
+                       SUM(d.cantidad), SUM(d.cantidad * d.precio_unitario), SUM(d.cantidad * p.precio_compra)
+                FROM ventas v
+                JOIN detalle_ventas d ON d.id_venta = v.id_venta
+                JOIN producto p ON p.id_producto = d.id_producto
+                WHERE v.fecha BETWEEN %(desde)s AND %(hasta)s
+                  AND (v.fecha >= CURRENT_DATE OR v.fecha IN (SELECT fecha FROM pendientes))
+                GROUP BY v.fecha, d.id_producto, COALESCE(v.metodo_pago, 'sin_dato')
+            )
+        """,
+        "compras": """
+            WITH pendientes AS (
+                SELECT DISTINCT fecha FROM resumen_cambios
+                WHERE tipo = 'compras' AND fecha BETWEEN %(desde)s AND %(hasta)s
+            ), base AS (
+                SELECT r.fecha, r.id_producto, r.id_proveedor, r.estado, r.unidades, r.total
+                FROM resumen_compras_diario r
+                WHERE r.fecha BETWEEN %(desde)s AND %(hasta)s
+                  AND r.fecha < CURRENT_DATE
+                  AND r.fecha NOT IN (SELECT fecha FROM pendientes)
+                UNION ALL
+                SELECT c.fecha, d.id_producto, c.id_proveedor, COALESCE(c.estado, 'sin_dato'),
+                       SUM(d.cantidad), SUM(d.cantidad * d.precio_unitario)
+                FROM compras c
+                JOIN detalle_compras d ON d.id_compra = c.id_compra
+                WHERE c.fecha BETWEEN %(desde)s AND %(hasta)s
+                  AND (c.fecha >= CURRENT_DATE OR c.fecha IN (SELECT fecha FROM pendientes))
+                GROUP BY c.fecha, d.id_producto, c.id_proveedor, COALESCE(c.estado, 'sin_dato')
+            )
+        """,
+    }
+
+    _METRICAS = {
+        "ventas": """
+            SUM(b.unidades) AS unidades, SUM(b.ingresos) AS ingresos, SUM(b.costo) AS costo,
+            SUM(b.ingresos) - SUM(b.costo) AS margen,
+            ROUND(100 * (SUM(b.ingresos) - SUM(b.costo)) / NULLIF(SUM(b.ingresos), 0), 2) AS margen_pct
+        """,
+        "compras": "SUM(b.unidades) AS unidades, SUM(b.total) AS total",
+    }
+
+    _JOIN_PRODUCTO = """
+        JOIN producto p ON p.id_producto = b.id_producto
+        JOIN categoria_producto c ON c.id_categoria = p.id_categoria
+    """
+
+    # agrupación → (columnas, joins, GROUP BY, ORDER BY)
+    _AGRUPAR = {
+        "dia": ("b.fecha AS periodo", "", "b.fecha", "periodo"),
+        "semana": ("date_trunc('week', b.fecha)::date AS periodo", "", "1", "periodo"),
+        "mes": ("date_trunc('month', b.fecha)::date AS periodo", "", "1", "periodo"),
+        "categoria": ("c.id_categoria, c.nombre AS categoria", _JOIN_PRODUCTO, "c.id_categoria, c.nombre", None),
+        "producto": ("p.id_producto, p.codigo, p.nombre AS producto", _JOIN_PRODUCTO,
+                     "p.id_producto, p.codigo, p.nombre", None),
+        "metodo_pago": ("b.metodo_pago", "", "b.metodo_pago", None),
+        "proveedor": ("pr.id_proveedor, pr.nombre AS proveedor",
+                      "JOIN proveedores pr ON pr.id_proveedor = b.id_proveedor",
+                      "pr.id_proveedor, pr.nombre", None),
+    }
+
+    @staticmethod
+    def rango(desde: Optional[date], hasta: Optional[date]) -> Tuple[date, date]:
+        """Rango de fechas del reporte (por defecto, los últimos 30 días)."""
+        hasta = hasta or date.today()
+        desde = desde or hasta - timedelta(days=Reporte.DIAS_POR_DEFECTO - 1)
+        if desde > hasta:
+            raise ValueError("La fecha 'desde' es posterior a 'hasta'")
+        return desde, hasta
+
+    @classmethod
+    def _sql(cls, tipo: str, agrupar: str, estado: Optional[str]) -> str:
+        if tipo not in cls.TIPOS:
+            raise ValueError(f"Tipo de reporte inválido: {tipo}")
+        if agrupar not in cls.AGRUPACIONES[tipo]:
+            raise ValueError(f"Agrupación inválida para {tipo}: {agrupar} "
+                             f"(opciones: {', '.join(cls.AGRUPACIONES[tipo])})")
+        columnas, joins, grupo, orden = cls._AGRUPAR[agrupar]
+        # Sin orden propio (categoría, producto...) primero lo que más mueve
+        orden = orden or ("ingresos DESC" if tipo == "ventas" else "total DESC")
+
+        sql = cls._BASE[tipo] + f"SELECT {columnas}, {cls._METRICAS[tipo]} FROM base b {joins}"
+        if tipo == "compras":
+            # Por defecto las compras canceladas no cuentan
+            sql += " WHERE b.estado = %(estado)s" if estado else " WHERE b.estado <> 'cancelado'"
+        return sql + f" GROUP BY {grupo} ORDER BY {orden}"
+
+    @classmethod
+    def generar(
+        cls,
+        tipo: str,
+        agrupar: str,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        estado: Optional[str] = None,
+        limite: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Filas del reporte ``tipo`` ('ventas' o 'compras') agrupado por ``agrupar``.
+
+        Se recorre con un cursor del lado del servidor, así que sirve tanto
+        para el JSON como para exportar CSV sin cargar todo en memoria.
+
+        Args:
+            tipo (str): 'ventas' o 'compras'.
+            agrupar (str): Ver ``AGRUPACIONES``.
+            desde, hasta (date): Rango inclusivo (por defecto, los últimos 30 días).
+            estado (str): Solo compras: filtrar por estado (por defecto, todas menos canceladas).
+            limite (int): Solo las primeras ``limite`` filas (p. ej. los más vendidos).
+
+        Returns:
+            Iterator[dict]: Una fila por grupo.
+        """
+        desde, hasta = cls.rango(desde, hasta)
+        sql = cls._sql(tipo, agrupar, estado)
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+        # para_json: Decimal → float y date → 'YYYY-MM-DD' ya en el cursor (igual en JSON y en CSV)
+        filas = DB.stream(sql, {"desde": desde, "hasta": hasta, "estado": estado}, como_dict=True, para_json=True)
+        try:
+            yield from filas
+        finally:
+            filas.close()  # devuelve la conexión aunque el consumidor corte a medias
+
+    # ---------------------------
+    # Consolidación
+    # ---------------------------
+    _CONSOLIDAR = {
+        "ventas": """
+            INSERT INTO resumen_ventas_diario (fecha, id_producto, metodo_pago, unidades, ingresos, costo)
+            SELECT v.fecha, d.id_producto, COALESCE(v.metodo_pago, 'sin_dato'),
+                   SUM(d.cantidad), SUM(d.cantidad * d.precio_unitario), SUM(d.cantidad * p.precio_compra)
+            FROM ventas v
+            JOIN detalle_ventas d ON d.id_venta = v.id_venta
+            JOIN producto p ON p.id_producto = d.id_producto
+            WHERE v.fecha = ANY(%s)
+            GROUP BY v.fecha, d.id_producto, COALESCE(v.metodo_pago, 'sin_dato')
+        """,
+        "compras": """
+            INSERT INTO resumen_compras_diario (fecha, id_producto, id_proveedor, estado, unidades, total)
+            SELECT c.fecha, d.id_producto, c.id_proveedor, COALESCE(c.estado, 'sin_dato'),
+                   SUM(d.cantidad), SUM(d.cantidad * d.precio_unitario)
+            FROM compras c
+            JOIN detalle_compras d ON d.id_compra = c.id_compra
+            WHERE c.fecha = ANY(%s)
+            GROUP BY c.fecha, d.id_producto, c.id_proveedor, COALESCE(c.estado, 'sin_dato')
+        """,
+    }
+
+    @classmethod
+    def consolidar(cls, hasta: Optional[date] = None) -> Dict[str, int]:
+        """
+        Recalcula los resúmenes de los días cerrados con cambios pendientes.
+
+        Procesa ``DIAS_POR_LOTE`` días por transacción (REPEATABLE READ): borra
+        el resumen de esos días, lo vuelve a calcular y borra sus anotaciones
+        en ``resumen_cambios`` anteriores al xmin del snapshot. Un cambio de
+        una transacción que seguía abierta deja su anotación y el día se
+        rehace en la próxima pasada. Un candado consultivo impide que dos
+        procesos consoliden a la vez.
+
+        Args:
+            hasta (date): Último día a consolidar (por defecto, ayer).
+
+        Returns:
+            dict: Días consolidados por tipo.
+
+        Raises:
+            ConsolidacionEnCursoError: Otro proceso está consolidando.
+        """
+        limite = min(hasta or date.today(), date.today() - timedelta(days=1))
+        hechos: Dict[str, int] = {}
+        for tipo in cls.TIPOS:
+            hechos[tipo] = 0
+            ultimo = date.min
+            while True:
+                with DB.connection() as (_, cur):
+                    cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                    cur.execute(
+                        "SELECT pg_try_advisory_xact_lock(hashtext('resumen_diario')), "
+                        "pg_snapshot_xmin(pg_current_snapshot())::text"
+                    )
+                    obtenido, xmin = cur.fetchone()
+                    if not obtenido:
+                        raise ConsolidacionEnCursoError("Ya hay una consolidación de reportes en curso")
+                    cur.execute(
+                        "SELECT DISTINCT fecha FROM resumen_cambios "
+                        "WHERE tipo = %s AND fecha > %s AND fecha <= %s AND fecha < CURRENT_DATE "
+                        "ORDER BY fecha LIMIT %s",
+                        (tipo, ultimo, limite, cls.DIAS_POR_LOTE),
+                    )
+                    dias = [f[0] for f in cur.fetchall()]
+                    if not dias:
+                        break
+                    cur.execute(f"DELETE FROM resumen_{tipo}_diario WHERE fecha = ANY(%s)", (dias,))
+                    cur.execute(cls._CONSOLIDAR[tipo], (dias,))
+                    cur.execute(
+                        "DELETE FROM resumen_cambios WHERE tipo = %s AND fecha = ANY(%s) AND xid < %s::xid8",
+                        (tipo, dias, xmin),
+                    )
+                hechos[tipo] += len(dias)
+                ultimo = dias[-1]
+        return hechos
+
+    @staticmethod
+    def marcar(desde: Optional[date] = None, hasta: Optional[date] = None) -> None:
+        """Marca como pendientes todos los días con datos en el rango (para rehacer resúmenes)."""
+        condiciones = "WHERE fecha BETWEEN COALESCE(%(desde)s, '-infinity'::date) AND COALESCE(%(hasta)s, 'infinity'::date)"
+        with DB.connection() as (_, cur):
+            for tipo in Reporte.TIPOS:
+                cur.execute(
+                    f"INSERT INTO resumen_cambios (tipo, fecha) SELECT DISTINCT %(tipo)s, fecha FROM {tipo} {condiciones}",
+                    {"tipo": tipo, "desde": desde, "hasta": hasta},
+                )
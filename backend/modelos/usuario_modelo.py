@@ -1,9 +1,16 @@
 """Modelo de Usuario: registro y autenticación con bcrypt."""
 
 from dataclasses import dataclass
-from typing import Optional, Tuple
-import bcrypt
+from typing import List, Optional, Tuple
 from backend.db import DB
+from backend import seguridad
+from backend.cache import cache_referencia
+
+# En cada inicio de sesión (consulta preparada, ver DB.registrar)
+_POR_NOMBRE = DB.registrar(
+    "usuario.por_nombre",
+    "SELECT id_usuario, nom_usuario, contrasena, id_rol FROM usuarios WHERE nom_usuario = %s",
+)
 
 
 @dataclass
@@ -27,26 +34,18 @@ class Usuario:
     @classmethod
     def buscar_por_nombre(cls, nom_usuario: str) -> Optional["Usuario"]:
         """Busca un usuario por su nombre."""
-        row = DB.fetch_one(
-            "SELECT id_usuario, nom_usuario, contrasena, id_rol "
-            "FROM usuarios WHERE nom_usuario = %s",
-            (nom_usuario,),
-        )
+        row = DB.fetch_one(_POR_NOMBRE, (nom_usuario,))
         return cls._row_to_usuario(row) if row else None
 
     @staticmethod
     def _hash_password(plain: str) -> str:
-        """Genera un hash seguro de la contraseña."""
-        salt = bcrypt.gensalt(rounds=12)
-        return bcrypt.hashpw(plain.encode("utf-8"), salt).decode("utf-8")
+        """Genera un hash seguro de la contraseña (en el pool de procesos)."""
+        return seguridad.hashear_contrasena(plain)
 
     @staticmethod
     def _check_password(plain: str, hashed: str) -> bool:
         """Verifica que la contraseña coincida con el hash almacenado."""
-        try:
-            return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
-        except (ValueError, TypeError):
-            return False
+        return seguridad.verificar_contrasena(plain, hashed)
 
     @classmethod
     def registrar(cls, nom_usuario: str, contrasena: str, id_rol: int = 1) -> int:
@@ -65,13 +64,26 @@ class Usuario:
 
     @classmethod
     def autenticar(cls, nom_usuario: str, contrasena: str) -> Optional["Usuario"]:
-        """Devuelve el usuario si la contraseña es correcta, si no None."""
+        """Devuelve el usuario si la contraseña es correcta, si no None.
+
+        Si el usuario no existe se verifica igualmente contra un hash
+        ficticio, para que ambos casos tarden lo mismo. Tras un login
+        correcto con un hash de costo distinto al configurado, se rehace.
+        """
         user = cls.buscar_por_nombre(nom_usuario)
-        if not user:
-            return None
-        if not cls._check_password(contrasena, user.contrasena_hash):
+        hashed = user.contrasena_hash if user else seguridad.hash_ficticio()
+        valida = cls._check_password(contrasena or "", hashed)
+        if not user or not valida:
             return None
+        if seguridad.necesita_rehash(hashed):
+            nuevo = cls._hash_password(contrasena)
+            DB.execute(
+                "UPDATE usuarios SET contrasena = %s WHERE id_usuario = %s AND contrasena = %s",
+                (nuevo, user.id_usuario, hashed),
+            )
+            user.contrasena_hash = nuevo
         return user
+
     @classmethod
     def obtener_todos(cls):
         """
@@ -110,8 +122,17 @@ class Usuario:
         DB.execute(sql, (nom_usuario, id_rol, id_usuario))
 
     @staticmethod
-    def obtener_nombre_rol(id_rol: int) -> str:
+    def listar_roles() -> List[Tuple[int, str]]:
+        """Devuelve (id_rol, nom_rol) de todos los roles, pasando por la caché."""
+        return cache_referencia.obtener(
+            "roles",
+            lambda: DB.fetch_all("SELECT id_rol, nom_rol FROM rol ORDER BY id_rol"),
+        ).valor
+
+    @classmethod
+    def obtener_nombre_rol(cls, id_rol: int) -> str:
         """Obtiene el nombre del rol dado su ID."""
-        query = "SELECT nom_rol FROM rol WHERE id_rol = %s"
-        row = DB.fetch_one(query, (id_rol,))
-        return row[0] if row else "Desconocido"
+        for rol_id, nom_rol in cls.listar_roles():
+            if rol_id == id_rol:
+                return nom_rol
+        return "Desconocido"
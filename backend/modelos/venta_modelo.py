@@ -0,0 +1,188 @@
+"""Modelo Venta: registro transaccional de tickets con descuento de lotes FEFO."""
+
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Tuple
+from psycopg2.extras import execute_values
+from backend.db import DB
+
+
+class StockInsuficienteError(ValueError):
+    """No hay unidades vigentes suficientes para cubrir una línea de la venta."""
+
+
+class Venta:
+    """Registro de ventas (tablas 'ventas', 'detalle_ventas' y 'lotes')."""
+
+    METODOS_PAGO = ("efectivo", "tarjeta", "transferencia")
+
+    # Sentencias fijas de cada venta, preparadas por conexión (ver DB.registrar)
+    _PRECIOS = DB.registrar(
+        "venta.precios", "SELECT id_producto, precio_venta FROM producto WHERE id_producto = ANY(%s)"
+    )
+    _SQL_LOTES = """
+        SELECT id_lote, cantidad
+        FROM lotes
+        WHERE id_producto = %s
+          AND cantidad > 0
+          AND fecha_vencimiento >= CURRENT_DATE
+          AND NOT (id_lote = ANY(%s))
+        ORDER BY fecha_vencimiento, id_lote
+        LIMIT %s
+        FOR UPDATE"""
+    _LOTES = DB.registrar("venta.lotes", _SQL_LOTES + " SKIP LOCKED")
+    _LOTES_ESPERANDO = DB.registrar("venta.lotes_esperando", _SQL_LOTES)
+    _LOTES_POR_VUELTA = 4  # lotes bloqueados por consulta hasta cubrir la cantidad
+    _INSERTAR = DB.registrar(
+        "venta.insertar",
+        "INSERT INTO ventas (fecha, id_usuario, total, metodo_pago) "
+        "VALUES (CURRENT_DATE, %s, %s, %s) RETURNING id_venta",
+    )
+
+    @staticmethod
+    def _agrupar_items(items: Iterable[Dict[str, Any]]) -> "OrderedDict[int, int]":
+        """Valida las líneas y suma cantidades por producto (ordenado por id).
+
+        El orden por id fija el orden en que se toman los lotes de cada
+        producto (ver ``_tomar_lotes``), de modo que dos ventas concurrentes
+        no se interbloquean.
+        """
+        cantidades: Dict[int, int] = {}
+        for item in items:
+            try:
+                id_producto = int(item["id_producto"])
+                cantidad = item["cantidad"]
+                if isinstance(cantidad, float) and not cantidad.is_integer():
+                    raise ValueError
+                cantidad = int(cantidad)
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Cada línea necesita id_producto y una cantidad entera")
+            if cantidad <= 0:
+                raise ValueError("Las cantidades deben ser mayores que cero")
+            cantidades[id_producto] = cantidades.get(id_producto, 0) + cantidad
+        if not cantidades:
+            raise ValueError("La venta no tiene productos")
+        return OrderedDict(sorted(cantidades.items()))
+
+    @classmethod
+    def _tomar_lotes(cls, cur, id_producto: int, cantidad: int) -> List[Tuple[int, int]]:
+        """
+        Reserva unidades de los lotes vigentes que vencen primero (FEFO).
+
+        Los lotes se bloquean de a ``_LOTES_POR_VUELTA`` y se para apenas se
+        cubre la cantidad, así solo quedan tomados los lotes que se descuentan.
+
+        Ventas del mismo producto corren en paralelo: ``SKIP LOCKED`` salta
+        los lotes que otra caja tiene tomados y sigue con los siguientes. El
+        stock no tiene otra fila en común (el trigger de 'lotes' solo inserta
+        en 'stock_movimientos'), así que nadie espera a nadie.
+
+        Si así no alcanza, puede ser por lotes saltados: se sueltan los
+        tomados de este producto (``ROLLBACK TO SAVEPOINT``) y se vuelven a
+        recorrer esperando cada lote. Las esperas siguen el orden FEFO dentro
+        del producto y el orden de id entre productos, así que no hay
+        interbloqueos.
+
+        Returns:
+            list: (id_lote, unidades a descontar).
+        """
+        cur.execute("SAVEPOINT lotes")
+        tomados, pendiente = cls._recorrer_lotes(cur, cls._LOTES, id_producto, cantidad)
+        if pendiente:
+            cur.execute("ROLLBACK TO SAVEPOINT lotes")
+            tomados, pendiente = cls._recorrer_lotes(cur, cls._LOTES_ESPERANDO, id_producto, cantidad)
+        if pendiente:
+            raise StockInsuficienteError(
+                f"Stock insuficiente para el producto {id_producto}: faltan {pendiente} unidades"
+            )
+        return tomados
+
+    @classmethod
+    def _recorrer_lotes(cls, cur, consulta, id_producto: int, cantidad: int) -> Tuple[List[Tuple[int, int]], int]:
+        """Bloquea lotes en orden FEFO hasta cubrir ``cantidad``. Devuelve (tomados, unidades faltantes)."""
+        tomados: List[Tuple[int, int]] = []
+        pendiente = cantidad
+        vistos: List[int] = []
+
+        while True:
+            DB.ejecutar(cur, consulta, (id_producto, vistos, cls._LOTES_POR_VUELTA))
+            filas = cur.fetchall()
+            if not filas:
+                return tomados, pendiente
+            for id_lote, disponible in filas:
+                vistos.append(id_lote)
+                usar = min(disponible, pendiente)
+                tomados.append((id_lote, usar))
+                pendiente -= usar
+                if pendiente == 0:
+                    return tomados, 0
+
+    @classmethod
+    def registrar(cls, id_usuario: int, metodo_pago: str, items: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Registra una venta completa en una sola transacción.
+
+        - Precios tomados de ``producto.precio_venta`` (no del cliente).
+        - Descuento de stock por lotes FEFO, producto por producto en orden
+          de id (ver ``_tomar_lotes``).
+        - Un INSERT en 'ventas' y todas las líneas de 'detalle_ventas' con
+          un único INSERT multi-fila (``execute_values``).
+
+        Args:
+            id_usuario (int): Usuario (cajero) que registra la venta.
+            metodo_pago (str): efectivo, tarjeta o transferencia.
+            items (Iterable[dict]): Líneas {"id_producto", "cantidad"}.
+
+        Returns:
+            dict: {"id_venta", "total", "lineas": [...]}
+
+        Raises:
+            ValueError: Datos inválidos o producto inexistente.
+            StockInsuficienteError: Alguna línea no puede cubrirse.
+        """
+        if metodo_pago not in cls.METODOS_PAGO:
+            raise ValueError("Método de pago inválido")
+        cantidades = cls._agrupar_items(items)
+        ids = list(cantidades)
+
+        with DB.connection() as (_, cur):
+            DB.ejecutar(cur, cls._PRECIOS, (ids,))
+            precios: Dict[int, Decimal] = dict(cur.fetchall())
+            faltantes = [i for i in ids if i not in precios]
+            if faltantes:
+                raise ValueError(f"Productos inexistentes: {faltantes}")
+
+            descuentos: List[Tuple[int, int]] = []
+            for id_producto, cantidad in cantidades.items():
+                descuentos.extend(cls._tomar_lotes(cur, id_producto, cantidad))
+
+            total = sum((precios[i] * c for i, c in cantidades.items()), Decimal("0"))
+            DB.ejecutar(cur, cls._INSERTAR, (id_usuario, total, metodo_pago))
+            id_venta = cur.fetchone()[0]
+
+            execute_values(
+                cur,
+                "INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario) VALUES %s",
+                [(id_venta, i, c, precios[i]) for i, c in cantidades.items()],
+            )
+
+            # El trigger de 'lotes' anota el movimiento en stock_movimientos
+            # (solo inserta: no compite con otras cajas).
+            execute_values(
+                cur,
+                """
+                UPDATE lotes AS l SET cantidad = l.cantidad - v.usar
+                FROM (VALUES %s) AS v(id_lote, usar)
+                WHERE l.id_lote = v.id_lote
+                """,
+                descuentos,
+            )
+
+        return {
+            "id_venta": id_venta,
+            "total": float(total),
+            "lineas": [
+                {"id_producto": i, "cantidad": c, "precio_unitario": float(precios[i])}
+                for i, c in cantidades.items()
+            ],
+        }
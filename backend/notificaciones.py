@@ -0,0 +1,325 @@
+"""Oyente de cambios (LISTEN/NOTIFY) y reparto a clientes por Server-Sent Events.
+
+Los triggers de la migración 0005 envían al canal 'cambios' los ids
+modificados en producto, categoria_producto y proveedores. En cada proceso
+un único hilo (``Oyente``) escucha ese canal con una conexión propia
+(fuera del pool, en autocommit) y por cada aviso:
+
+1. Invalida las cachés del proceso (referencia, búsqueda, índice de
+   códigos), de modo que los cambios hechos en otro worker se ven al
+   instante y no al vencer el TTL.
+2. Si hay clientes suscritos, lee las filas modificadas una sola vez y
+   las encola para cada cliente; la página actualiza solo esas filas.
+
+Cada cliente tiene una cola acotada: si no la consume (pestaña congelada,
+red lenta), se descarta y su flujo termina; al reconectar recibe el delta
+desde el último evento entregado.
+
+Cada evento lleva como ``id`` una versión de ``backend.sincronizacion``
+(el xmin del snapshot tomado antes de leer los avisos): todo lo que se
+confirme después tiene una versión mayor o igual. Al reconectar, el
+navegador la devuelve en ``Last-Event-ID`` y el flujo empieza con el delta
+``?since=`` de cada tabla, así la página no pierde cambios ni vuelve a
+bajar la lista completa.
+"""
+
+import json
+import queue
+import select
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import psycopg2
+from backend import sincronizacion
+from backend.config import Config
+from backend.db import DB
+
+CANAL = "cambios"
+TABLAS = ("producto", "categoria_producto", "proveedores")
+_SQL_VERSION = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text"
+
+
+# ---------------------------
+# Lectura de filas e invalidación por tabla
+# ---------------------------
+def _productos(ids: List[int]) -> List[Dict[str, Any]]:
+    from backend.modelos.prod_modelo import Producto
+    return Producto.por_ids(ids)
+
+
+def _categorias(ids: List[int]) -> List[Dict[str, Any]]:
+    from backend.modelos.cate_modelo import Categoria
+    return Categoria.por_ids(ids)
+
+
+def _proveedores(ids: List[int]) -> List[Dict[str, Any]]:
+    filas = DB.fetch_all(
+        "SELECT id_proveedor, nombre, telefono, email, direccion FROM proveedores "
+        "WHERE id_proveedor = ANY(%s) ORDER BY id_proveedor",
+        (ids,),
+    )
+    return [{"id": f[0], "nombre": f[1], "telefono": f[2], "email": f[3], "direccion": f[4]} for f in filas]
+
+
+_LEER_FILAS: Dict[str, Callable[[List[int]], List[Dict[str, Any]]]] = {
+    "producto": _productos,
+    "categoria_producto": _categorias,
+    "proveedores": _proveedores,
+}
+
+
+def _productos_desde(desde: int) -> Dict[str, Any]:
+    from backend.modelos.prod_modelo import Producto
+    return Producto.cambios_desde(desde)
+
+
+def _categorias_desde(desde: int) -> Dict[str, Any]:
+    from backend.modelos.cate_modelo import Categoria
+    return Categoria.cambios_desde(desde)
+
+
+def _proveedores_desde(desde: int) -> Dict[str, Any]:
+    return sincronizacion.delta(
+        "proveedores", desde,
+        "SELECT id_proveedor, nombre, telefono, email, direccion FROM proveedores "
+        "WHERE version >= %(desde)s::xid8 ORDER BY id_proveedor",
+        lambda f: {"id": f[0], "nombre": f[1], "telefono": f[2], "email": f[3], "direccion": f[4]},
+    )
+
+
+# Delta ?since= de cada tabla, con las filas en el mismo formato que _LEER_FILAS
+_LEER_DESDE: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "producto": _productos_desde,
+    "categoria_producto": _categorias_desde,
+    "proveedores": _proveedores_desde,
+}
+
+
+def pendientes(tablas: Iterable[str], desde: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Eventos ``cambio`` con lo ocurrido en ``tablas`` desde la versión ``desde``.
+
+    Devuelve None si alguna tabla ya purgó las bajas de esa época
+    (``completo`` en el delta): el cliente tiene que recargar la lista.
+    """
+    eventos: List[Dict[str, Any]] = []
+    for tabla in tablas:
+        cambios = _LEER_DESDE[tabla](desde)
+        if cambios["completo"]:
+            return None
+        if cambios["bajas"]:
+            eventos.append({"tabla": tabla, "op": "delete", "ids": cambios["bajas"]})
+        if cambios["filas"]:
+            ids = [f.get("id", f.get("id_producto")) for f in cambios["filas"]]
+            eventos.append({"tabla": tabla, "op": "update", "ids": ids, "filas": cambios["filas"]})
+    return eventos
+
+
+def _invalidar(tabla: str, op: str, ids: List[int]) -> None:
+    from backend.cache import cache_busqueda, cache_referencia
+    from backend.indice_codigos import indice_codigos
+
+    cache_busqueda.invalidar()
+    if tabla == "categoria_producto":
+        cache_referencia.invalidar("categorias:")
+    elif tabla == "proveedores":
+        cache_referencia.invalidar("proveedores:")
+    elif tabla == "producto":
+        if op == "delete":
+            for id_producto in ids:
+                indice_codigos.quitar(id_producto)
+        else:
+            indice_codigos.actualizar(*ids)
+
+
+# ---------------------------
+# Suscripciones
+# ---------------------------
+class Suscripcion:
+    """Cola de eventos de un cliente SSE."""
+
+    def __init__(self, tablas: Iterable[str], tam_cola: int) -> None:
+        self.tablas: Set[str] = set(tablas)
+        self.cola: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=tam_cola)
+        self.desbordada = False
+
+    def entregar(self, evento: Dict[str, Any]) -> None:
+        if self.desbordada or evento["tabla"] not in self.tablas:
+            return
+        try:
+            self.cola.put_nowait(evento)
+        except queue.Full:
+            # El cliente no consume: se cierra su flujo y se pone al día al reconectar
+            self.desbordada = True
+
+
+class Oyente:
+    """Hilo que escucha el canal 'cambios' y reparte los avisos."""
+
+    def __init__(self) -> None:
+        self._suscripciones: Set[Suscripcion] = set()
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self.avisos = 0
+        self.reconexiones = 0
+
+    # Suscripciones
+    def suscribir(self, tablas: Iterable[str]) -> Suscripcion:
+        with self._lock:
+            if len(self._suscripciones) >= Config.SSE_MAX_CLIENTES:
+                raise OverflowError("Demasiados clientes conectados al flujo de cambios")
+            suscripcion = Suscripcion(tablas, Config.SSE_TAM_COLA)
+            self._suscripciones.add(suscripcion)
+        self.iniciar()
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    @property
+    def clientes(self) -> int:
+        return len(self._suscripciones)
+
+    # Ciclo de vida
+    def iniciar(self) -> None:
+        """Arranca el hilo si no está corriendo en este proceso (idempotente)."""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ciclo, name="oyente-cambios", daemon=True)
+            self._hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        with self._lock:
+            for suscripcion in self._suscripciones:
+                try:
+                    suscripcion.cola.put_nowait(None)  # fin del flujo
+                except queue.Full:
+                    pass
+            hilo = self._hilo
+        if hilo is not None:
+            hilo.join(timeout=5)
+
+    # Hilo
+    def _conectar(self):
+        conn = psycopg2.connect(
+            host=Config.PG_HOST, port=Config.PG_PORT, dbname=Config.PG_DB,
+            user=Config.PG_USER, password=Config.PG_PASS,
+            client_encoding="UTF8", connect_timeout=10, application_name="mi-app-oyente",
+        )
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {CANAL}")
+        return conn
+
+    def _ciclo(self) -> None:
+        espera = 1.0
+        while not self._detener.is_set():
+            conn = None
+            try:
+                conn = self._conectar()
+                espera = 1.0
+                while not self._detener.is_set():
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    # La versión se toma antes de vaciar la cola: lo confirmado
+                    # antes ya dejó aquí su aviso, lo posterior tiene versión >= esta
+                    with conn.cursor() as cur:
+                        cur.execute(_SQL_VERSION)
+                        version = int(cur.fetchone()[0])
+                    conn.poll()
+                    avisos = conn.notifies[:]
+                    del conn.notifies[:]
+                    for aviso in avisos:
+                        self._procesar(aviso.payload, version)
+            except Exception as e:
+                if self._detener.is_set():
+                    break
+                print("Oyente de cambios desconectado, reintentando:", e)
+                self.reconexiones += 1
+                # Pudieron perderse avisos mientras no había conexión
+                self._difundir_recargar()
+                self._detener.wait(espera)
+                espera = min(espera * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _procesar(self, payload: str, version: int) -> None:
+        try:
+            aviso = json.loads(payload)
+            tabla, op, ids = aviso["tabla"], aviso["op"], [int(i) for i in aviso["ids"]]
+        except (ValueError, KeyError, TypeError):
+            print("Aviso de cambio inválido:", payload)
+            return
+        self.avisos += 1
+        _invalidar(tabla, op, ids)
+
+        with self._lock:
+            destinatarios = [s for s in self._suscripciones if tabla in s.tablas]
+        if not destinatarios:
+            return
+        evento: Dict[str, Any] = {"tabla": tabla, "op": op, "ids": ids, "version": version}
+        if op != "delete":
+            evento["filas"] = _LEER_FILAS[tabla](ids)
+        for suscripcion in destinatarios:
+            suscripcion.entregar(evento)
+
+    def _difundir_recargar(self) -> None:
+        with self._lock:
+            for suscripcion in self._suscripciones:
+                suscripcion.desbordada = True
+
+
+oyente = Oyente()
+
+
+def _evento(nombre: str, datos: Any, version: Optional[int] = None) -> str:
+    texto = f"event: {nombre}\ndata: " + json.dumps(datos, default=str) + "\n"
+    return (f"id: {version}\n" if version is not None else "") + texto + "\n"
+
+
+def flujo_sse(suscripcion: Suscripcion, desde: Optional[int] = None) -> Iterable[str]:
+    """Genera el flujo text/event-stream de una suscripción.
+
+    Empieza con un evento ``version`` (la versión actual, como ``id``) y, si
+    el cliente trae la de una conexión anterior (``desde``), con los cambios
+    ocurridos desde entonces. Envía un comentario de latido cada
+    ``SSE_LATIDO`` segundos (mantiene la conexión abierta a través de
+    proxies) y termina tras ``SSE_DURACION_MAX`` segundos con un evento
+    ``fin``; el navegador se reconecta solo (``retry``) enviando el último
+    ``id`` recibido.
+    """
+    fin = time.monotonic() + Config.SSE_DURACION_MAX
+    try:
+        # La suscripción ya está activa: lo que se confirme desde aquí llega
+        # por la cola; el delta cubre lo anterior (puede repetir filas)
+        version = int(DB.fetch_one(_SQL_VERSION)[0])
+        yield "retry: 3000\n\n"
+        if desde is not None:
+            eventos = pendientes([t for t in TABLAS if t in suscripcion.tablas], desde)
+            if eventos is None:
+                yield _evento("recargar", {})
+            else:
+                for evento in eventos:
+                    yield _evento("cambio", evento)
+        yield _evento("version", {}, version)
+        while time.monotonic() < fin:
+            if suscripcion.desbordada:
+                return  # el navegador reconecta con el último id entregado
+            try:
+                evento = suscripcion.cola.get(timeout=Config.SSE_LATIDO)
+            except queue.Empty:
+                yield ": latido\n\n"
+                continue
+            if evento is None:
+                return
+            yield _evento("cambio", evento, evento["version"])
+        yield _evento("fin", {})  # cierre por duración
+    finally:
+        oyente.cancelar(suscripcion)
@@ -0,0 +1,262 @@
+"""Planificador de tareas periódicas en segundo plano.
+
+Cada worker arranca un hilo planificador (``arranque.iniciar_worker``), pero
+solo uno ejecuta las tareas: el que obtiene el candado consultivo
+``hashtext('planificador')`` en una conexión propia (fuera del pool). El
+candado es de sesión: si ese worker muere o pierde la conexión, PostgreSQL
+lo libera y otro lo toma en su siguiente vuelta.
+
+Tareas:
+
+- ``vencimiento_lotes``: anota alertas de los lotes por vencer y pasa a 0
+  los vencidos, por tandas de ``VENCIMIENTO_LOTE`` lotes, cada una en su
+  propia transacción. En ``HORARIO_TIENDA`` hace una pausa entre tandas
+  para no competir con las cajas. Los triggers de 'lotes' anotan el
+  cambio de stock.
+- ``consolidar_stock``: suma al resumen 'stock_producto' los movimientos
+  de stock que anotan las ventas y recepciones, por tandas de
+  ``STOCK_CONSOLIDAR_LOTE``.
+- ``consolidar_reportes``: lo mismo que ``flask consolidar-reportes``.
+- ``purgar_bajas``: lo mismo que ``flask purgar-bajas``.
+
+Las tareas corren una tras otra en el hilo del planificador. Sus
+estadísticas (ejecuciones, errores, duración, resultado y pendientes) se
+ven en ``/readyz`` y en ``/metrics``.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import psycopg2
+
+from backend.config import Config
+
+_CANDADO = "planificador"
+
+
+def _en_horario(ahora: Optional[datetime] = None) -> bool:
+    """True si la hora actual cae dentro de ``HORARIO_TIENDA`` ("HH-HH")."""
+    if not Config.HORARIO_TIENDA:
+        return False
+    desde, hasta = (int(h) for h in Config.HORARIO_TIENDA.split("-"))
+    hora = (ahora or datetime.now()).hour
+    return desde <= hora < hasta
+
+
+# ---------------------------
+# Tareas
+# ---------------------------
+def vencimiento_lotes(detener: threading.Event) -> Dict[str, Any]:
+    """Alertas de lotes por vencer y baja de los vencidos, por tandas."""
+    from backend.cache import cache_dashboard
+    from backend.indice_codigos import indice_codigos
+    from backend.modelos.inventario_modelo import Inventario
+
+    tam = Config.VENCIMIENTO_LOTE
+    dias = Config.VENCIMIENTO_AVISO_DIAS
+    avisados = vencidos = tandas = 0
+    productos = set()
+
+    def pausa() -> bool:
+        """Espera entre tandas (solo en horario). Devuelve False si hay que parar."""
+        if _en_horario():
+            detener.wait(Config.VENCIMIENTO_PAUSA)
+        return not detener.is_set()
+
+    while pausa():
+        creadas = Inventario.avisar_por_vencer(dias, tam)
+        avisados += creadas
+        tandas += 1
+        if creadas < tam:
+            break
+
+    while pausa():
+        ids = Inventario.vencer_lotes(tam)
+        vencidos += len(ids)
+        productos.update(ids)
+        tandas += 1
+        if len(ids) < tam:
+            break
+
+    if productos:
+        indice_codigos.actualizar(*productos)
+        cache_dashboard.invalidar()
+    return {
+        "alertas_por_vencer": avisados,
+        "lotes_vencidos": vencidos,
+        "tandas": tandas,
+        "pendientes": Inventario.pendientes_vencimiento(dias),
+    }
+
+
+def consolidar_stock(detener: threading.Event) -> Dict[str, Any]:
+    """Pasa los movimientos pendientes de 'stock_movimientos' a 'stock_producto'."""
+    from backend.modelos.inventario_modelo import Inventario
+
+    tam = Config.STOCK_CONSOLIDAR_LOTE
+    movimientos = tandas = 0
+    while not detener.is_set():
+        n = Inventario.consolidar_stock(tam)
+        movimientos += n
+        tandas += 1
+        if n < tam:
+            break
+    return {"movimientos": movimientos, "tandas": tandas}
+
+
+def consolidar_reportes(detener: threading.Event) -> Dict[str, Any]:
+    from backend.modelos.reporte_modelo import ConsolidacionEnCursoError, Reporte
+
+    try:
+        return {"dias": Reporte.consolidar()}
+    except ConsolidacionEnCursoError:
+        # Alguien la está corriendo a mano: se reintenta en la próxima vuelta
+        return {"omitida": "consolidación en curso"}
+
+
+def purgar_bajas(detener: threading.Event) -> Dict[str, Any]:
+    from backend import sincronizacion
+
+    return {"borradas": sincronizacion.purgar_bajas()}
+
+
+class Tarea:
+    """Una tarea periódica y sus estadísticas."""
+
+    def __init__(self, nombre: str, funcion: Callable[[threading.Event], Dict[str, Any]], intervalo: float) -> None:
+        self.nombre = nombre
+        self.funcion = funcion
+        self.intervalo = intervalo
+        self.proxima = 0.0  # monotonic; 0 = en cuanto haya líder
+        self.ejecuciones = 0
+        self.errores = 0
+        self.ultima_ejecucion: Optional[float] = None
+        self.ultima_duracion_seg: Optional[float] = None
+        self.ultimo_resultado: Optional[Dict[str, Any]] = None
+        self.ultimo_error: Optional[str] = None
+
+    def ejecutar(self, detener: threading.Event) -> None:
+        inicio = time.monotonic()
+        self.ultima_ejecucion = time.time()
+        try:
+            self.ultimo_resultado = self.funcion(detener)
+            self.ultimo_error = None
+        except Exception as e:
+            print(f"Error en la tarea {self.nombre}:", e)
+            self.errores += 1
+            self.ultimo_error = str(e)
+        self.ejecuciones += 1
+        self.ultima_duracion_seg = round(time.monotonic() - inicio, 3)
+        self.proxima = time.monotonic() + self.intervalo
+
+    def resumen(self) -> Dict[str, Any]:
+        return {
+            "intervalo_seg": self.intervalo,
+            "ejecuciones": self.ejecuciones,
+            "errores": self.errores,
+            "ultima_ejecucion": (
+                datetime.fromtimestamp(self.ultima_ejecucion).isoformat(timespec="seconds")
+                if self.ultima_ejecucion else None
+            ),
+            "ultima_duracion_seg": self.ultima_duracion_seg,
+            "ultimo_resultado": self.ultimo_resultado,
+            "ultimo_error": self.ultimo_error,
+        }
+
+
+class Planificador:
+    """Hilo que compite por el liderazgo y ejecuta las tareas vencidas."""
+
+    def __init__(self, tareas: List[Tarea]) -> None:
+        self.tareas = tareas
+        self.lider = False
+        self._conn = None
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+
+    # Ciclo de vida
+    def iniciar(self) -> None:
+        """Arranca el hilo si no está corriendo en este proceso (idempotente)."""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ciclo, name="planificador", daemon=True)
+            self._hilo.start()
+
+    def detener(self) -> None:
+        """Pide terminar (las tareas cortan entre tandas) y suelta el liderazgo."""
+        self._detener.set()
+        with self._lock:
+            hilo = self._hilo
+        if hilo is not None:
+            hilo.join(timeout=10)
+
+    # Liderazgo
+    def _conectar(self):
+        conn = psycopg2.connect(
+            host=Config.PG_HOST, port=Config.PG_PORT, dbname=Config.PG_DB,
+            user=Config.PG_USER, password=Config.PG_PASS,
+            client_encoding="UTF8", connect_timeout=10, application_name="mi-app-planificador",
+        )
+        conn.autocommit = True
+        return conn
+
+    def _asegurar_liderazgo(self) -> bool:
+        """Intenta tomar el candado; si ya lo tiene, comprueba que la conexión siga viva."""
+        if self._conn is None:
+            self._conn = self._conectar()
+        with self._conn.cursor() as cur:
+            if self.lider:
+                cur.execute("SELECT 1")
+            else:
+                cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (_CANDADO,))
+                self.lider = cur.fetchone()[0]
+                if self.lider:
+                    print("🗓️ Planificador: este worker ejecuta las tareas")
+        return self.lider
+
+    def _soltar(self) -> None:
+        self.lider = False
+        if self._conn is not None:
+            try:
+                self._conn.close()  # cerrar la sesión libera el candado
+            except Exception:
+                pass
+            self._conn = None
+
+    # Hilo
+    def _ciclo(self) -> None:
+        try:
+            while not self._detener.is_set():
+                try:
+                    if self._asegurar_liderazgo():
+                        for tarea in self.tareas:
+                            if self._detener.is_set():
+                                break
+                            if time.monotonic() >= tarea.proxima:
+                                tarea.ejecutar(self._detener)
+                except Exception as e:
+                    print("Planificador sin conexión, reintentando:", e)
+                    self._soltar()
+                self._detener.wait(Config.PLANIFICADOR_VUELTA)
+        finally:
+            self._soltar()
+
+    def resumen(self) -> Dict[str, Any]:
+        return {
+            "lider": self.lider,
+            "en_horario": _en_horario(),
+            "tareas": {t.nombre: t.resumen() for t in self.tareas},
+        }
+
+
+planificador = Planificador([
+    Tarea("vencimiento_lotes", vencimiento_lotes, Config.VENCIMIENTO_INTERVALO),
+    Tarea("consolidar_stock", consolidar_stock, Config.STOCK_CONSOLIDAR_INTERVALO),
+    Tarea("consolidar_reportes", consolidar_reportes, 3600),
+    Tarea("purgar_bajas", purgar_bajas, 86400),
+])
@@ -0,0 +1,268 @@
+"""Pool de conexiones PostgreSQL seguro entre hilos y con estadísticas.
+
+Reemplaza a ``psycopg2.pool.SimpleConnectionPool``, que no es seguro entre
+hilos y lanza ``PoolError`` en cuanto se agotan las conexiones. Este pool:
+
+- Bloquea al solicitante hasta ``timeout`` segundos si no hay conexiones libres.
+- Valida cada conexión al entregarla y descarta las que estén rotas.
+- Recicla las conexiones que llevan demasiado tiempo ociosas.
+- Lleva contadores de uso consultables con ``estadisticas()``.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolAgotadoError(PoolError):
+    """Se agotó el tiempo de espera sin conseguir una conexión libre."""
+
+
+class PoolConexiones:
+    """Pool de conexiones con espera bloqueante, validación y reciclaje."""
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        timeout: float = 10.0,
+        max_ocioso: float = 300.0,
+        validar_tras: float = 30.0,
+        **conn_kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            minconn: Conexiones que se abren al crear el pool y que nunca se reciclan.
+            maxconn: Máximo de conexiones abiertas a la vez.
+            timeout: Segundos que espera ``getconn`` antes de lanzar ``PoolAgotadoError``.
+            max_ocioso: Segundos sin uso tras los cuales una conexión se cierra
+                (0 desactiva el reciclaje).
+            validar_tras: Segundos ociosa a partir de los cuales se ejecuta
+                ``SELECT 1`` antes de entregarla (0 valida siempre).
+            conn_kwargs: Parámetros para ``psycopg2.connect``.
+        """
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Parámetros de pool inválidos: se requiere 0 <= minconn <= maxconn y maxconn >= 1")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_ocioso = max_ocioso
+        self.validar_tras = validar_tras
+        self._conn_kwargs = conn_kwargs
+
+        self._cond = threading.Condition(threading.Lock())
+        self._libres: Deque[Tuple[Any, float]] = deque()  # (conexión, instante de devolución)
+        self._total = 0  # conexiones abiertas (libres + en uso + en apertura)
+        self._en_uso = 0
+        self._cerrado = False
+
+        # Estadísticas
+        self._checkouts = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._timeouts = 0
+        self._descartadas = 0
+        self._recicladas = 0
+
+        try:
+            for _ in range(minconn):
+                conn = self._conectar()
+                self._total += 1
+                self._libres.append((conn, time.monotonic()))
+        except Exception:
+            # No dejar abiertas las que sí se conectaron
+            while self._libres:
+                self._cerrar(self._libres.pop()[0])
+            self._total = 0
+            raise
+
+    # ---------------------------
+    # Apertura / validación
+    # ---------------------------
+    def _conectar(self):
+        return psycopg2.connect(**self._conn_kwargs)
+
+    def _es_valida(self, conn, ocioso: float) -> bool:
+        """Comprueba que la conexión siga utilizable."""
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if ocioso >= self.validar_tras:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    @staticmethod
+    def _cerrar(conn) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    # ---------------------------
+    # Préstamo y devolución
+    # ---------------------------
+    def getconn(self, timeout: float = None):
+        """Entrega una conexión válida, esperando si el pool está lleno."""
+        espera = self.timeout if timeout is None else timeout
+        inicio = time.monotonic()
+        limite = inicio + espera
+
+        while True:
+            candidata = None
+            abrir_nueva = False
+
+            with self._cond:
+                while True:
+                    if self._cerrado:
+                        raise PoolError("El pool de conexiones está cerrado.")
+                    self._reciclar_ociosas()
+                    if self._libres:
+                        candidata = self._libres.pop()  # LIFO: la más reciente está "caliente"
+                        break
+                    if self._total < self.maxconn:
+                        self._total += 1
+                        abrir_nueva = True
+                        break
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        self._timeouts += 1
+                        raise PoolAgotadoError(
+                            f"No hay conexiones libres tras esperar {espera:.1f}s "
+                            f"({self.maxconn} en uso)."
+                        )
+                    self._cond.wait(restante)
+                self._en_uso += 1
+
+            # La validación y la apertura van fuera del candado para no frenar a otros hilos
+            if abrir_nueva:
+                try:
+                    conn = self._conectar()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._en_uso -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                conn, devuelta_en = candidata
+                if not self._es_valida(conn, time.monotonic() - devuelta_en):
+                    self._cerrar(conn)
+                    with self._cond:
+                        self._total -= 1
+                        self._en_uso -= 1
+                        self._descartadas += 1
+                        self._cond.notify()
+                    continue
+
+            esperado = time.monotonic() - inicio
+            with self._cond:
+                self._checkouts += 1
+                self._espera_total += esperado
+                if esperado > self._espera_max:
+                    self._espera_max = esperado
+            return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Devuelve una conexión al pool (o la cierra si está rota o se pide)."""
+        descartar = close or self._cerrado or conn.closed
+        if not descartar:
+            estado = conn.info.transaction_status
+            if estado == extensions.TRANSACTION_STATUS_UNKNOWN:
+                descartar = True
+            elif estado != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    descartar = True
+
+        if descartar:
+            self._cerrar(conn)
+
+        with self._cond:
+            self._en_uso -= 1
+            if descartar:
+                self._total -= 1
+                if not close:
+                    self._descartadas += 1
+            else:
+                self._libres.append((conn, time.monotonic()))
+            self._cond.notify_all() if self._cerrado else self._cond.notify()
+
+    def _reciclar_ociosas(self) -> None:
+        """Cierra las conexiones más antiguas que superan ``max_ocioso``.
+
+        Se llama con el candado tomado. Las libres están ordenadas de la más
+        antigua (izquierda) a la más reciente (derecha).
+        """
+        if not self.max_ocioso:
+            return
+        ahora = time.monotonic()
+        while self._libres and self._total > self.minconn:
+            conn, devuelta_en = self._libres[0]
+            if ahora - devuelta_en < self.max_ocioso:
+                break
+            self._libres.popleft()
+            self._total -= 1
+            self._recicladas += 1
+            self._cerrar(conn)
+
+    def closeall(self) -> None:
+        """Cierra las conexiones libres y marca el pool como cerrado.
+
+        Las conexiones prestadas se cierran al devolverse.
+        """
+        with self._cond:
+            self._cerrado = True
+            while self._libres:
+                conn, _ = self._libres.pop()
+                self._total -= 1
+                self._cerrar(conn)
+            self._cond.notify_all()
+
+    def drenar(self, timeout: float = 30.0) -> bool:
+        """Cierra el pool y espera a que se devuelvan las conexiones prestadas.
+
+        Returns:
+            bool: True si todas volvieron antes de ``timeout`` segundos.
+        """
+        self.closeall()
+        limite = time.monotonic() + timeout
+        with self._cond:
+            while self._en_uso > 0:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return False
+                self._cond.wait(restante)
+        return True
+
+    # ---------------------------
+    # Estadísticas
+    # ---------------------------
+    def estadisticas(self) -> Dict[str, Any]:
+        """Devuelve una instantánea de los contadores del pool."""
+        with self._cond:
+            return {
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+                "total": self._total,
+                "en_uso": self._en_uso,
+                "libres": len(self._libres),
+                "checkouts": self._checkouts,
+                "espera_total_seg": round(self._espera_total, 6),
+                "espera_max_seg": round(self._espera_max, 6),
+                "timeouts": self._timeouts,
+                "descartadas": self._descartadas,
+                "recicladas": self._recicladas,
+            }
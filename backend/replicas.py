@@ -0,0 +1,200 @@
+"""Réplicas de lectura (PostgreSQL en hot standby).
+
+Con ``PG_REPLICAS`` configurado, ``DB`` mantiene además del pool de la
+primaria un pool por réplica. Las lecturas de ``fetch_*``, ``stream`` y
+``copy_stream`` hechas dentro de ``DB.en_replica()`` (las vistas marcadas
+con ``@lectura_en_replica``) toman la conexión de una réplica sana, por
+turno. Las escrituras y las transacciones de ``DB.connection()`` van
+siempre a la primaria.
+
+- Salud: un hilo por worker revisa cada ``PG_REPLICA_VERIFICAR`` segundos
+  que cada réplica responda, siga en recuperación, tenga el receptor de
+  WAL conectado a la primaria y no lleve más de ``PG_REPLICA_RETRASO_MAX``
+  segundos de retraso. Una réplica que no deja
+  conectar o pierde la conexión queda fuera hasta la próxima revisión
+  exitosa. Sin ninguna sana se lee de la primaria.
+- Leer lo propio: tras una petición que escribe (POST/PUT/PATCH/DELETE
+  con respuesta < 400) la sesión queda fijada a la primaria
+  ``PG_PRIMARIA_TRAS_ESCRIBIR`` segundos, así el usuario ve lo que acaba
+  de guardar aunque la réplica vaya atrasada.
+- Cachés compartidas: lo que se guarda en ``cache_referencia`` o
+  ``cache_busqueda`` se carga siempre de la primaria (``DB.en_primaria``),
+  para no dejar en caché filas de una réplica atrasada tras un NOTIFY.
+"""
+
+import threading
+import time
+from itertools import count
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from psycopg2.extensions import parse_dsn
+from flask import Flask, Response, has_request_context, request, session
+
+from backend.config import Config
+from backend.pool import PoolAgotadoError, PoolConexiones
+
+_CLAVE_SESION = "_primaria_hasta"
+_ESPERA = 0.5  # seg. esperando una conexión de una réplica antes de probar la siguiente
+_METODOS_ESCRITURA = {"POST", "PUT", "PATCH", "DELETE"}
+
+# El retraso es 0 si el receptor de WAL está conectado a la primaria y ya se
+# aplicó todo lo recibido: con la primaria sin escrituras, now() - último
+# replay crece aunque la réplica esté al día. Con el receptor caído lo
+# recibido deja de avanzar y ambos LSN coinciden, así que no vale como prueba.
+# Ver el estado del receptor requiere pg_monitor (o pg_read_all_stats); sin
+# ese rol se ve NULL y el retraso se mide siempre por el último replay.
+_SQL_SALUD = """
+    WITH receptor AS (SELECT pid, status FROM pg_stat_wal_receiver)
+    SELECT pg_is_in_recovery(),
+           EXISTS (SELECT 1 FROM receptor),
+           CASE WHEN (SELECT status FROM receptor) = 'streaming'
+                     AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+           END
+"""
+
+
+def destinos(cfg=Config) -> List[Dict[str, str]]:
+    """
+    Parámetros de conexión de cada réplica de ``PG_REPLICAS``.
+
+    Cada DSN (``host=... port=...`` o ``postgresql://...``, separados por
+    ";") completa con los datos de la primaria lo que no indique.
+    """
+    base = {"dbname": cfg.PG_DB, "user": cfg.PG_USER, "password": cfg.PG_PASS, "port": str(cfg.PG_PORT)}
+    return [{**base, **parse_dsn(dsn.strip())} for dsn in cfg.PG_REPLICAS.split(";") if dsn.strip()]
+
+
+class Replica:
+    """Pool de una réplica y su estado de salud."""
+
+    def __init__(self, parametros: Dict[str, Any], **opciones: Any) -> None:
+        self.nombre = f"{parametros.get('host', 'localhost')}:{parametros.get('port', 5432)}"
+        self.pool = PoolConexiones(**opciones, **parametros)
+        self.sana = True  # hasta la primera revisión
+        self.retraso_seg: Optional[float] = None
+        self.ultimo_error: Optional[str] = None
+        self.lecturas = 0
+        self.caidas = 0
+
+    def marcar_caida(self, error: Any) -> None:
+        if self.sana:
+            print(f"⚠️ Réplica {self.nombre} fuera de servicio:", error)
+            self.caidas += 1
+        self.sana = False
+        self.ultimo_error = str(error)
+
+    def verificar(self) -> None:
+        """Consulta recuperación y retraso; actualiza ``sana``."""
+        try:
+            conn = self.pool.getconn(timeout=_ESPERA)
+        except PoolAgotadoError:
+            return  # todas sus conexiones están en uso: responde
+        except Exception as e:
+            self.marcar_caida(e)
+            return
+        try:
+            with conn.cursor() as cur:
+                cur.execute(_SQL_SALUD)
+                en_recuperacion, recibiendo, retraso = cur.fetchone()
+            conn.rollback()
+        except psycopg2.Error as e:
+            self.marcar_caida(e)
+            return
+        finally:
+            self.pool.putconn(conn)
+
+        self.retraso_seg = None if retraso is None else round(float(retraso), 3)
+        if not en_recuperacion:
+            self.marcar_caida("no está en recuperación (¿fue promovida?)")
+        elif not recibiendo:
+            self.marcar_caida("sin receptor de WAL (desconectada de la primaria)")
+        elif Config.PG_REPLICA_RETRASO_MAX and (self.retraso_seg or 0) > Config.PG_REPLICA_RETRASO_MAX:
+            self.marcar_caida(f"retraso de {self.retraso_seg}s")
+        else:
+            if not self.sana:
+                print(f"✅ Réplica {self.nombre} de vuelta en servicio")
+            self.sana = True
+            self.ultimo_error = None
+
+    def resumen(self) -> Dict[str, Any]:
+        return {
+            "sana": self.sana,
+            "retraso_seg": self.retraso_seg,
+            "lecturas": self.lecturas,
+            "caidas": self.caidas,
+            "ultimo_error": self.ultimo_error,
+            "pool": self.pool.estadisticas(),
+        }
+
+
+class Replicas:
+    """Las réplicas de un worker: reparto por turno y revisión periódica de salud."""
+
+    def __init__(self, parametros: List[Dict[str, Any]], **opciones: Any) -> None:
+        self.lista = [Replica(p, **opciones) for p in parametros]
+        self._turno = count()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name="replicas", daemon=True)
+        self._hilo.start()
+
+    def obtener(self):
+        """Conexión de la siguiente réplica sana con lugar libre, o None."""
+        n = len(self.lista)
+        inicio = next(self._turno)
+        for i in range(n):
+            replica = self.lista[(inicio + i) % n]
+            if not replica.sana:
+                continue
+            try:
+                conn = replica.pool.getconn(timeout=_ESPERA)
+            except PoolAgotadoError:
+                continue
+            except Exception as e:
+                replica.marcar_caida(e)
+                continue
+            conn.replica = replica
+            replica.lecturas += 1
+            return conn
+        return None
+
+    @staticmethod
+    def devolver(conn) -> None:
+        replica = conn.replica
+        if conn.closed:
+            replica.marcar_caida("se perdió la conexión")
+        replica.pool.putconn(conn)
+
+    def _ciclo(self) -> None:
+        while not self._detener.wait(Config.PG_REPLICA_VERIFICAR):
+            for replica in self.lista:
+                replica.verificar()
+
+    def cerrar(self, timeout: float = 30.0) -> bool:
+        """Detiene la revisión y drena los pools."""
+        self._detener.set()
+        return all([replica.pool.drenar(timeout) for replica in self.lista])
+
+    def resumen(self) -> Dict[str, Any]:
+        return {replica.nombre: replica.resumen() for replica in self.lista}
+
+
+# ---------------------------
+# Leer lo propio (read-your-writes)
+# ---------------------------
+def fijada_a_primaria() -> bool:
+    """True si la sesión actual escribió hace menos de ``PG_PRIMARIA_TRAS_ESCRIBIR`` segundos."""
+    return has_request_context() and session.get(_CLAVE_SESION, 0) > time.time()
+
+
+def _despues(respuesta: Response) -> Response:
+    if request.method in _METODOS_ESCRITURA and respuesta.status_code < 400:
+        session[_CLAVE_SESION] = time.time() + Config.PG_PRIMARIA_TRAS_ESCRIBIR
+    return respuesta
+
+
+def init_app(app: Flask) -> None:
+    """Fija a la primaria las sesiones que escriben (solo si hay réplicas configuradas)."""
+    if Config.PG_REPLICAS and Config.PG_PRIMARIA_TRAS_ESCRIBIR > 0:
+        app.after_request(_despues)
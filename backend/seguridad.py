@@ -0,0 +1,191 @@
+"""Hash y verificación de contraseñas fuera del hilo de la petición.
+
+bcrypt con costo 12 tarda del orden de 250 ms de CPU. Hacerlo en el hilo
+que atiende la petición acapara el GIL y frena a todas las demás
+peticiones del proceso; aquí se ejecuta en un pool de procesos acotado.
+
+- Cola de admisión: como mucho BCRYPT_COLA_MAX verificaciones en curso o
+  en espera; si está llena se lanza ``ServicioSaturadoError`` en lugar de
+  acumular peticiones.
+- Usuarios inexistentes: se verifica contra un hash ficticio del mismo
+  costo para que el tiempo de respuesta no revele qué cuentas existen.
+- Rehash: ``necesita_rehash`` indica si un hash se generó con un costo
+  distinto de BCRYPT_ROUNDS, para actualizarlo tras un login correcto.
+- ``LimitadorIntentos``: ventana deslizante por IP y por usuario.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Optional, Tuple
+
+import bcrypt
+from backend.config import Config
+
+
+class ServicioSaturadoError(RuntimeError):
+    """La cola de verificación de contraseñas está llena."""
+
+
+# ---------------------------
+# Funciones que corren en los procesos del pool
+# ---------------------------
+def _hashear(plain: str, rounds: int) -> str:
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _verificar(plain: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    except (ValueError, TypeError):
+        return False
+
+
+# ---------------------------
+# Pool de procesos y cola de admisión
+# ---------------------------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+_admision = threading.BoundedSemaphore(Config.BCRYPT_COLA_MAX)
+_hash_ficticio: Optional[str] = None
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    """Crea el pool la primera vez que se usa en este proceso.
+
+    Se crea de forma perezosa (y se recrea si cambió el PID) para que un
+    servidor que hace fork de sus workers no herede un pool ajeno. Se usa
+    'spawn', que además es lo único disponible en Windows.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=Config.BCRYPT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _ejecutar(funcion, *args):
+    """Ejecuta ``funcion`` en el pool respetando la cola de admisión."""
+    if not _admision.acquire(timeout=Config.BCRYPT_ESPERA):
+        raise ServicioSaturadoError("Demasiadas verificaciones de contraseña en curso")
+    try:
+        return _obtener_pool().submit(funcion, *args).result()
+    finally:
+        _admision.release()
+
+
+def cerrar_pool() -> None:
+    """Detiene los procesos del pool (al apagar la aplicación)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# ---------------------------
+# API pública
+# ---------------------------
+def hashear_contrasena(plain: str) -> str:
+    """Genera un hash bcrypt con el costo configurado (BCRYPT_ROUNDS)."""
+    return _ejecutar(_hashear, plain, Config.BCRYPT_ROUNDS)
+
+
+def verificar_contrasena(plain: str, hashed: str) -> bool:
+    """Verifica una contraseña contra su hash en el pool de procesos."""
+    return _ejecutar(_verificar, plain, hashed)
+
+
+def hash_ficticio() -> str:
+    """Hash de referencia para usuarios inexistentes (mismo costo que los reales)."""
+    global _hash_ficticio
+    if _hash_ficticio is None or costo(_hash_ficticio) != Config.BCRYPT_ROUNDS:
+        _hash_ficticio = hashear_contrasena(os.urandom(16).hex())
+    return _hash_ficticio
+
+
+def costo(hashed: str) -> Optional[int]:
+    """Costo (log2 de rondas) de un hash bcrypt "$2b$12$...", o None si no se reconoce."""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def necesita_rehash(hashed: str) -> bool:
+    """True si el hash se generó con un costo distinto del configurado."""
+    return costo(hashed) != Config.BCRYPT_ROUNDS
+
+
+# ---------------------------
+# Limitación de intentos
+# ---------------------------
+class LimitadorIntentos:
+    """Limitador de ventana deslizante en memoria (por proceso).
+
+    Guarda los instantes de los últimos intentos de cada clave y rechaza
+    cuando hay ``maximo`` dentro de ``ventana`` segundos.
+
+    Las claves se guardan ordenadas por su último intento. Con ``max_claves``
+    claves, las que no tienen intentos recientes se descartan primero. Si
+    todas los tienen, se descarta la de intento más antiguo, así la memoria
+    queda acotada aunque lleguen intentos desde muchas IPs distintas.
+    """
+
+    def __init__(self, maximo: int, ventana: float, max_claves: int = 10000) -> None:
+        self.maximo = maximo
+        self.ventana = ventana
+        self.max_claves = max_claves
+        self._intentos: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purgar(self, ahora: float) -> None:
+        """Hace lugar para una clave nueva (se llama con el candado)."""
+        # Orden por último intento: las vencidas están al principio
+        while self._intentos:
+            intentos = next(iter(self._intentos.values()))
+            if intentos and ahora - intentos[-1] < self.ventana:
+                break
+            self._intentos.popitem(last=False)
+        while len(self._intentos) >= self.max_claves:
+            self._intentos.popitem(last=False)
+
+    def bloqueado(self, clave: str) -> Tuple[bool, float]:
+        """Indica si ``clave`` superó el límite y cuántos segundos faltan para liberarse."""
+        ahora = time.monotonic()
+        with self._lock:
+            intentos = self._intentos.get(clave)
+            if not intentos:
+                return False, 0.0
+            while intentos and ahora - intentos[0] >= self.ventana:
+                intentos.popleft()
+            if len(intentos) < self.maximo:
+                return False, 0.0
+            return True, self.ventana - (ahora - intentos[0])
+
+    def registrar(self, clave: str) -> None:
+        """Cuenta un intento para ``clave``."""
+        ahora = time.monotonic()
+        with self._lock:
+            if clave not in self._intentos and len(self._intentos) >= self.max_claves:
+                self._purgar(ahora)
+            self._intentos.setdefault(clave, deque(maxlen=self.maximo)).append(ahora)
+            self._intentos.move_to_end(clave)
+
+    def reiniciar(self, clave: str) -> None:
+        """Olvida los intentos de ``clave`` (p. ej. tras un login correcto)."""
+        with self._lock:
+            self._intentos.pop(clave, None)
+
+
+# Todas las peticiones de login cuentan por IP; solo los fallos cuentan por usuario.
+limitador_ip = LimitadorIntentos(Config.LOGIN_MAX_IP, Config.LOGIN_VENTANA_IP)
+limitador_usuario = LimitadorIntentos(Config.LOGIN_MAX_USUARIO, Config.LOGIN_VENTANA_USUARIO)
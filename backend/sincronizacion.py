@@ -0,0 +1,100 @@
+"""Sincronización incremental de catálogos (``?since=<version>``).
+
+Productos, categorías y proveedores llevan una columna ``version`` y las
+bajas quedan en ``sync_bajas`` (migración 0006). Un cliente (otra pestaña,
+una caja sin conexión estable) guarda la ``version`` de la última respuesta
+y en la siguiente pide solo lo que cambió desde entonces:
+
+    GET /list-proveedores?since=0          → todo + version
+    GET /list-proveedores?since=<version>  → cambios + bajas + version nueva
+
+Respuesta: {"version", "completo", "filas", "bajas"}. Con ``completo`` el
+cliente reemplaza su copia por ``filas`` (primera descarga, o su versión es
+anterior a la última purga de lápidas); si no, borra los ids de ``bajas`` y
+aplica ``filas`` por id, en ese orden. Una fila puede llegar repetida en
+dos respuestas seguidas; aplicarla dos veces da el mismo resultado.
+"""
+
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from flask import request
+from backend.db import DB
+
+# Días que se conservan las lápidas de filas borradas (comando purgar-bajas)
+DIAS_BAJAS = 30
+
+
+def leer_since() -> Optional[int]:
+    """Valor de ``?since=`` de la petición actual, None si no viene.
+
+    Lanza ValueError si no es un entero no negativo.
+    """
+    valor = request.args.get("since")
+    if valor is None:
+        return None
+    if not valor.isdigit():
+        raise ValueError("since debe ser un entero no negativo (la 'version' de la respuesta anterior)")
+    return int(valor)
+
+
+def delta(tabla: str, desde: int, consulta: str, a_dict: Callable[[Sequence[Any]], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Filas de ``tabla`` cambiadas desde la versión ``desde``.
+
+    Todo se lee en una transacción REPEATABLE READ de solo lectura, así que
+    las filas, las bajas y la marca devuelta salen del mismo snapshot. La
+    marca es el xmin del snapshot: lo escrito por transacciones todavía
+    abiertas tiene una versión mayor o igual y saldrá en la próxima consulta.
+
+    Args:
+        tabla (str): Nombre de la tabla (como en ``sync_bajas``).
+        desde (int): Versión de la respuesta anterior (0 = todo).
+        consulta (str): SELECT con el parámetro ``%(desde)s`` (xid8 en texto).
+        a_dict (Callable): Convierte cada fila en el diccionario de la API.
+
+    Returns:
+        dict: {"version", "completo", "filas", "bajas"}
+    """
+    with DB.connection() as (_, cur):
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        cur.execute(
+            "SELECT pg_snapshot_xmin(pg_current_snapshot())::text, "
+            "(SELECT hasta::text FROM sync_purga WHERE tabla = %s)",
+            (tabla,),
+        )
+        marca, purgada_hasta = cur.fetchone()
+        completo = desde == 0 or (purgada_hasta is not None and desde <= int(purgada_hasta))
+        if completo:
+            desde = 0
+
+        cur.execute(consulta, {"desde": str(desde)})
+        filas = [a_dict(f) for f in cur.fetchall()]
+        bajas = []
+        if not completo:
+            cur.execute(
+                "SELECT id FROM sync_bajas WHERE tabla = %s AND version >= %s::xid8 ORDER BY id",
+                (tabla, str(desde)),
+            )
+            bajas = [b[0] for b in cur.fetchall()]
+    return {"version": int(marca), "completo": completo, "filas": filas, "bajas": bajas}
+
+
+def purgar_bajas(dias: int = DIAS_BAJAS) -> int:
+    """Borra las lápidas con más de ``dias`` días y registra el horizonte de purga."""
+    with DB.connection() as (_, cur):
+        cur.execute(
+            """
+            WITH borradas AS (
+                DELETE FROM sync_bajas
+                WHERE eliminado_en < now() - make_interval(days => %s)
+                RETURNING tabla, version
+            ), por_tabla AS (
+                INSERT INTO sync_purga AS s (tabla, hasta)
+                SELECT tabla, max(version::text::numeric)::text::xid8 FROM borradas GROUP BY tabla
+                ON CONFLICT (tabla) DO UPDATE SET hasta = GREATEST(s.hasta, EXCLUDED.hasta)
+            )
+            SELECT count(*) FROM borradas
+            """,
+            (dias,),
+        )
+        return cur.fetchone()[0]
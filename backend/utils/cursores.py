@@ -0,0 +1,30 @@
+"""Tokens opacos para paginación por cursor (keyset).
+
+El token guarda los valores de la clave de orden de la última fila
+enviada; la página siguiente filtra con una comparación de fila sobre esa
+clave en lugar de usar OFFSET.
+"""
+
+import base64
+import json
+from datetime import date
+from typing import Any, List, Sequence
+
+
+def codificar(valores: Sequence[Any]) -> str:
+    """Convierte los valores de la clave de orden en un token apto para URL."""
+    normalizados = [v.isoformat() if isinstance(v, date) else v for v in valores]
+    crudo = json.dumps(normalizados, ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def decodificar(token: str, cantidad: int) -> List[Any]:
+    """Inverso de ``codificar``. Lanza ValueError si el token no es válido."""
+    try:
+        relleno = "=" * (-len(token) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(token + relleno))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise ValueError("Cursor inválido")
+    return valores
@@ -1,11 +1,14 @@
 """Módulo de decoradores para proteger vistas en Flask.
 
 Contiene el decorador login_requerido, que obliga a iniciar sesión
-y añade cabeceras anti-caché a las respuestas protegidas.
+y añade cabeceras anti-caché a las respuestas protegidas, su variante
+api_login_requerido para los endpoints que responden JSON, y
+lectura_en_replica para las vistas de solo lectura.
 """
 
 from functools import wraps
-from flask import session, redirect, url_for, flash, make_response
+from flask import session, redirect, url_for, flash, make_response, jsonify
+from backend.db import DB
 
 def login_requerido(view_func):
     """
@@ -42,3 +45,45 @@ def login_requerido(view_func):
 
         return response
     return wrapper
+
+
+def api_login_requerido(view_func):
+    """
+    Variante de login_requerido para endpoints JSON.
+
+    En lugar de redirigir al login (que el fetch del navegador seguiría
+    como si fuera una respuesta válida), responde 401 con un cuerpo JSON.
+
+    Args:
+        view_func (function): La vista de API que se quiere proteger.
+
+    Returns:
+        function: La vista envuelta con la verificación de sesión.
+    """
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        if "usuario_id" not in session:
+            return jsonify({"status": "error", "mensaje": "Sesión no iniciada"}), 401
+        return view_func(*args, **kwargs)
+    return wrapper
+
+
+def lectura_en_replica(view_func):
+    """
+    Sirve las lecturas de la vista desde una réplica (ver backend/replicas.py).
+
+    Solo para vistas que no escriben: listados, reportes, búsquedas. Las
+    respuestas en streaming toman su conexión al leer la primera fila,
+    todavía dentro de la vista.
+
+    Args:
+        view_func (function): La vista de solo lectura.
+
+    Returns:
+        function: La vista envuelta en ``DB.en_replica()``.
+    """
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        with DB.en_replica():
+            return view_func(*args, **kwargs)
+    return wrapper
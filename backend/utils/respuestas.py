@@ -0,0 +1,171 @@
+"""Utilidades para construir respuestas HTTP.
+
+Contiene:
+- json_stream: envía un arreglo JSON elemento a elemento para no
+  materializar listas grandes en memoria.
+- json_cacheable: sirve datos de referencia desde la caché con ETag y
+  Last-Modified, respondiendo 304 cuando el navegador ya los tiene.
+- csv_stream: envía filas (diccionarios) como CSV en streaming.
+- ProveedorJSON: ``jsonify`` con el mismo serializador (``backend.db.a_json``).
+
+La compresión gzip/brotli de las respuestas la hace ``backend.compresion``.
+"""
+
+import csv
+import hashlib
+import io
+from typing import Any, Callable, Iterable
+
+from flask import Response, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from backend import compresion
+from backend.cache import CacheTTL, cache_referencia
+from backend.db import DB, a_json
+
+_FIN = object()
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """``jsonify`` compacto, sin ordenar claves, con Decimal → float y fechas ISO."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return a_json(obj)
+
+
+def json_stream(elementos: Iterable[Any], tam_bloque: int = 200) -> Response:
+    """
+    Devuelve una respuesta que emite ``elementos`` como un arreglo JSON.
+
+    El primer elemento se obtiene antes de devolver la respuesta, de modo que
+    un error al ejecutar la consulta todavía pueda convertirse en un 500 desde
+    el ``except`` de la vista. Los elementos se agrupan en bloques de
+    ``tam_bloque`` para no escribir al socket fila por fila.
+
+    Args:
+        elementos (Iterable): Normalmente un generador sobre ``DB.stream``.
+        tam_bloque (int): Elementos por cada trozo enviado.
+
+    Returns:
+        Response: Respuesta ``application/json`` en streaming.
+    """
+    iterador = iter(elementos)
+    primero = next(iterador, _FIN)
+    dumps = a_json
+
+    def generar():
+        if primero is _FIN:
+            yield "[]"
+            return
+        partes = ["[", dumps(primero)]
+        for elemento in iterador:
+            partes.append(",")
+            partes.append(dumps(elemento))
+            if len(partes) >= tam_bloque * 2:
+                yield "".join(partes)
+                partes = []
+        partes.append("]")
+        yield "".join(partes)
+
+    respuesta = Response(stream_with_context(generar()), mimetype="application/json")
+    # Si el cliente corta antes de empezar, el generador interno no llega a
+    # ejecutarse; cerrar el iterador devuelve la conexión al pool igualmente.
+    cerrar = getattr(iterador, "close", None)
+    if cerrar is not None:
+        respuesta.call_on_close(cerrar)
+    return respuesta
+
+
+def json_cacheable(
+    clave: str, cargar: Callable[[], Any], cache: CacheTTL = cache_referencia, primaria: bool = True
+) -> Response:
+    """
+    Devuelve ``cargar()`` como JSON pasando por la caché.
+
+    Se cachea el cuerpo ya serializado junto con su ETag (hash del
+    contenido), así que un acierto no consulta la BD ni vuelve a serializar.
+    Las versiones comprimidas (gzip/brotli) se guardan en la misma entrada la
+    primera vez que se piden. Si el navegador envía If-None-Match /
+    If-Modified-Since y coinciden, la respuesta es un 304 sin cuerpo.
+
+    ``cargar()`` lee de la primaria aunque la vista esté marcada con
+    ``@lectura_en_replica`` (ver ``DB.en_primaria``).
+
+    Args:
+        clave (str): Clave de caché; su prefijo es el que se invalida.
+        cargar (Callable): Función que consulta la BD y devuelve datos serializables.
+        cache (CacheTTL): Caché a usar.
+        primaria (bool): False solo para cachés que vencen por tiempo y no se
+            invalidan con los cambios (el retraso de la réplica apenas las atrasa).
+
+    Returns:
+        Response: 200 con el JSON o 304.
+    """
+    def serializar():
+        if primaria:
+            with DB.en_primaria():
+                datos = cargar()
+        else:
+            datos = cargar()
+        cuerpo = a_json(datos).encode("utf-8")
+        return cuerpo, hashlib.sha1(cuerpo).hexdigest(), {}
+
+    entrada = cache.obtener(clave, serializar)
+    cuerpo, etag, comprimidos = entrada.valor
+
+    codificacion = compresion.elegir(len(cuerpo))
+    if codificacion:
+        if codificacion not in comprimidos:
+            comprimidos[codificacion] = compresion.comprimir(cuerpo, codificacion)
+        respuesta = Response(comprimidos[codificacion], mimetype="application/json")
+        respuesta.headers["Content-Encoding"] = codificacion
+    else:
+        respuesta = Response(cuerpo, mimetype="application/json")
+    respuesta.vary.add("Accept-Encoding")
+    # Débil: el mismo contenido viaja con distintas codificaciones
+    respuesta.set_etag(etag, weak=True)
+    respuesta.last_modified = entrada.modificado
+    # El navegador puede guardar la respuesta pero debe revalidarla siempre
+    respuesta.headers["Cache-Control"] = "no-cache"
+    return respuesta.make_conditional(request)
+
+
+def csv_stream(filas: Iterable[dict], nombre_archivo: str, tam_bloque: int = 500) -> Response:
+    """
+    Devuelve una descarga CSV con ``filas``; la primera fila define las columnas.
+
+    Igual que ``json_stream``, la primera fila se obtiene antes de devolver
+    la respuesta para que un error de la consulta sea un 500 y no un archivo
+    cortado, y se escribe en bloques de ``tam_bloque`` filas.
+
+    Args:
+        filas (Iterable[dict]): Normalmente ``DB.stream(..., como_dict=True)``.
+        nombre_archivo (str): Nombre sugerido para la descarga.
+        tam_bloque (int): Filas por cada trozo enviado.
+
+    Returns:
+        Response: Respuesta ``text/csv`` en streaming.
+    """
+    iterador = iter(filas)
+    primera = next(iterador, _FIN)
+
+    def generar():
+        if primera is _FIN:
+            return
+        buffer = io.StringIO()
+        escritor = csv.DictWriter(buffer, fieldnames=list(primera), lineterminator="\n")
+        escritor.writeheader()
+        escritor.writerow(primera)
+        for i, fila in enumerate(iterador, 1):
+            escritor.writerow(fila)
+            if i % tam_bloque == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    respuesta = Response(stream_with_context(generar()), mimetype="text/csv")
+    respuesta.headers["Content-Disposition"] = f"attachment; filename={nombre_archivo}"
+    cerrar = getattr(iterador, "close", None)
+    if cerrar is not None:
+        respuesta.call_on_close(cerrar)
+    return respuesta
@@ -0,0 +1,13 @@
+"""Entrada WSGI de producción.
+
+    gunicorn -c backend/gunicorn_conf.py backend.wsgi:app
+
+La app se crea sin conexiones (se puede precargar en el proceso maestro);
+cada worker crea y calienta su pool en el hook ``post_fork`` de
+gunicorn_conf.py. Con otros servidores WSGI, el worker se inicia con su
+primera petición.
+"""
+
+from backend.app import crear_app
+
+app = crear_app(iniciar_db=False)
@@ -1,32 +1,25 @@
-document.addEventListener("DOMContentLoaded", cargarCategorias);
+document.addEventListener("DOMContentLoaded", () => {
+    cargarCategorias();
+    asignarEventos();
+});
+
+// Categorías mostradas (se actualizan en el lugar con el flujo de cambios)
+let categorias = [];
+const flujo = suscribirCambios(["categoria_producto"], {
+    cambio: aplicarCambio,
+    recargar: cargarCategorias
+});
 
 // Función para cargar categorías en la tabla
 async function cargarCategorias() {
     try {
         const response = await fetch("/categorias");
         if (!response.ok) throw new Error("Error en la petición HTTP");
-        const categorias = await response.json();
+        categorias = await response.json();
 
         const tbody = document.getElementById("tabla-cate");
         tbody.innerHTML = ""; // limpiar antes de llenar
-
-        categorias.forEach(cat => {
-            const row = document.createElement("tr");
-
-            row.innerHTML = `
-                <td class="id-general">${cat.id}</td>
-                <td>${cat.nombre}</td>
-                <td>
-                    <button class="btn-editar" data-id="${cat.id}">Editar</button>
-                    <button class="btn-eliminar" data-id="${cat.id}">Eliminar</button>
-                </td>
-            `;
-
-            tbody.appendChild(row);
-        });
-
-        // Agregar eventos a los botones
-        asignarEventos(categorias);
+        categorias.forEach(cat => tbody.appendChild(filaCategoria(cat)));
 
     } catch (error) {
         console.error("Error cargando categorías:", error);
@@ -34,46 +27,81 @@ async function cargarCategorias() {
     }
 }
 
-// Función para asignar eventos de editar y eliminar
+function filaCategoria(cat) {
+    const row = document.createElement("tr");
+    row.dataset.id = cat.id;
+    row.innerHTML = `
+        <td class="id-general">${cat.id}</td>
+        <td>${cat.nombre}</td>
+        <td>
+            <button class="btn-editar" data-id="${cat.id}">Editar</button>
+            <button class="btn-eliminar" data-id="${cat.id}">Eliminar</button>
+        </td>
+    `;
+    return row;
+}
+
+// Aplica un cambio recibido del servidor solo a las filas afectadas
+function aplicarCambio(evento) {
+    const tbody = document.getElementById("tabla-cate");
+    if (evento.op === "delete") {
+        categorias = categorias.filter(c => !evento.ids.includes(c.id));
+        evento.ids.forEach(id => tbody.querySelector(`tr[data-id="${id}"]`)?.remove());
+        return;
+    }
+    evento.filas.forEach(cat => {
+        const fila = filaCategoria(cat);
+        const actual = tbody.querySelector(`tr[data-id="${cat.id}"]`);
+        const i = categorias.findIndex(c => c.id === cat.id);
+        if (i >= 0) categorias[i] = cat; else categorias.push(cat);
+        if (actual) actual.replaceWith(fila); else tbody.appendChild(fila);
+    });
+}
+
+// Recarga la tabla tras un cambio propio solo si el flujo no lo va a traer
+function refrescarSiDesconectado() {
+    if (!flujo.conectado) cargarCategorias();
+}
+
+// Eventos de editar y eliminar (delegados: sirven para filas agregadas después)
 // Eventos Eliminar con toast personalizado
-function asignarEventos(categorias) {
+function asignarEventos() {
     const inputNombre = document.getElementById("nombre-categoria");
     const inputId = document.getElementById("id_cate");
+    const tbody = document.getElementById("tabla-cate");
 
-    // Eventos Editar
-    document.querySelectorAll(".btn-editar").forEach(btn => {
-        btn.addEventListener("click", e => {
-            const id = e.target.dataset.id;
+    tbody.addEventListener("click", e => {
+        const id = e.target.dataset.id;
+        if (!id) return;
+
+        // Editar
+        if (e.target.classList.contains("btn-editar")) {
             const categoria = categorias.find(c => c.id == id);
             inputNombre.value = categoria.nombre;
             inputId.value = categoria.id;
-        });
-    });
-
-    // Eventos Eliminar
-    document.querySelectorAll(".btn-eliminar").forEach(btn => {
-        btn.addEventListener("click", e => {
-            const id = e.target.dataset.id;
-
-            mostrarConfirmToast("¿Seguro que quieres eliminar esta categoría?", async () => {
-                try {
-                    const res = await fetch(`/eliminar_categoria/${id}`, { method: "DELETE" });
-                    const data = await res.json();
-
-                    if (res.ok && data.status === "ok") {
-                        mostrarToast("/static/IMG/iconos/check.png", "Categoría eliminada", "success");
-                        cargarCategorias(); // recargar tabla
-                    } else if (data.mensaje) {
-                        mostrarToast("/static/IMG/iconos/informacion.png", data.mensaje, "informacion");
-                    } else {
-                        mostrarToast("/static/IMG/iconos/error.png", "Error al eliminar categoría", "error");
-                    }
-                } catch (err) {
-                    mostrarToast("/static/IMG/iconos/error.png", "Error de conexión", "error");
+            return;
+        }
+        if (!e.target.classList.contains("btn-eliminar")) return;
+
+        // Eliminar
+        mostrarConfirmToast("¿Seguro que quieres eliminar esta categoría?", async () => {
+            try {
+                const res = await fetch(`/eliminar_categoria/${id}`, { method: "DELETE" });
+                const data = await res.json();
+
+                if (res.ok && data.status === "ok") {
+                    mostrarToast("/static/IMG/iconos/check.png", "Categoría eliminada", "success");
+                    refrescarSiDesconectado();
+                } else if (data.mensaje) {
+                    mostrarToast("/static/IMG/iconos/informacion.png", data.mensaje, "informacion");
+                } else {
+                    mostrarToast("/static/IMG/iconos/error.png", "Error al eliminar categoría", "error");
                 }
-            }, () => {
-                mostrarToast("/static/IMG/iconos/informacion.png", "Eliminación cancelada", "informacion");
-            });
+            } catch (err) {
+                mostrarToast("/static/IMG/iconos/error.png", "Error de conexión", "error");
+            }
+        }, () => {
+            mostrarToast("/static/IMG/iconos/informacion.png", "Eliminación cancelada", "informacion");
         });
     });
 }
@@ -118,7 +146,7 @@ btnGuardar.addEventListener("click", async () => {
             );
             inputNombre.value = "";
             inputId.value = "";
-            cargarCategorias();
+            refrescarSiDesconectado();
         } else if (result.mensaje) {
             // Mensaje específico del backend, ej. "La categoría ya existe"
             mostrarToast("/static/IMG/iconos/informacion.png", result.mensaje, "informacion");
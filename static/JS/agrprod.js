@@ -17,6 +17,43 @@ window.addEventListener("DOMContentLoaded", () => {
         cargarProductos(selectFiltro.value, inputBuscar.value);
     });
 
+    const btnMas = document.getElementById("cargar-mas");
+    if (btnMas) {
+        btnMas.addEventListener("click", () => {
+            if (siguienteCursor) cargarProductos(selectFiltro.value, inputBuscar.value, siguienteCursor);
+        });
+    }
+
+    // Sugerencias mientras se escribe (typeahead), con una pequeña espera entre teclas
+    const sugerencias = document.getElementById("sugerencias");
+    let esperaSugerencias = null;
+    let ultimaConsulta = "";
+    inputBuscar.addEventListener("input", () => {
+        clearTimeout(esperaSugerencias);
+        const q = inputBuscar.value.trim();
+        if (!q || !sugerencias) {
+            if (sugerencias) sugerencias.innerHTML = "";
+            return;
+        }
+        esperaSugerencias = setTimeout(async () => {
+            ultimaConsulta = q;
+            try {
+                const res = await fetch(`/api/productos/buscar?${new URLSearchParams({ q, limite: 10 })}`);
+                if (!res.ok || q !== ultimaConsulta) return;
+                const lista = await res.json();
+                sugerencias.innerHTML = "";
+                lista.forEach(p => {
+                    const opcion = document.createElement("option");
+                    opcion.value = p.nombre;
+                    opcion.label = `${p.codigo} · ${p.categoria} · $${p.precio_venta}`;
+                    sugerencias.appendChild(opcion);
+                });
+            } catch (error) {
+                console.error("Error cargando sugerencias:", error);
+            }
+        }, 150);
+    });
+
     inputBuscar.addEventListener("keypress", (e) => {
         if (e.key === "Enter") {
             e.preventDefault();
@@ -62,13 +99,25 @@ window.addEventListener("DOMContentLoaded", () => {
     });
 });
 
-async function cargarCategorias() {
+// Una sola petición a /categorias compartida por el formulario y el filtro
+let categoriasPromesa = null;
+function obtenerCategorias() {
+    if (!categoriasPromesa) {
+        categoriasPromesa = fetch("/categorias").then(response => {
+            if (!response.ok) throw new Error("Error en la petición HTTP");
+            return response.json();
+        });
+        categoriasPromesa.catch(() => { categoriasPromesa = null; });
+    }
+    return categoriasPromesa;
+}
+
+async function cargarCategorias(avisar = true) {
     try {
-        const response = await fetch("/categorias");
-        if (!response.ok) throw new Error("Error en la petición HTTP");
-        const categorias = await response.json();
+        const categorias = await obtenerCategorias();
 
         const selectForm = document.getElementById("categoria");
+        const elegida = selectForm.value;
         selectForm.innerHTML = '<option value="">Categoria</option>';
         categorias.forEach(cat => {
             const option = document.createElement("option");
@@ -76,8 +125,9 @@ async function cargarCategorias() {
             option.textContent = cat.nombre;
             selectForm.appendChild(option);
         });
+        selectForm.value = elegida;
 
-        mostrarToast("/static/IMG/iconos/check.png", "Categorias cargadas exitosamente", "success");
+        if (avisar) mostrarToast("/static/IMG/iconos/check.png", "Categorias cargadas exitosamente", "success");
     } catch (error) {
         mostrarToast("/static/IMG/iconos/error.png", "Error al cargar las Categorias", "error");
     }
@@ -85,11 +135,10 @@ async function cargarCategorias() {
 
 async function cargarCategoriasFiltro() {
     try {
-        const response = await fetch("/categorias");
-        if (!response.ok) throw new Error("Error en la petición HTTP");
-        const categorias = await response.json();
+        const categorias = await obtenerCategorias();
 
         const selectFiltro = document.getElementById("filtro");
+        const elegida = selectFiltro.value;
         selectFiltro.innerHTML = '<option value="">Todas las categorías</option>';
         categorias.forEach(cat => {
             const option = document.createElement("option");
@@ -97,18 +146,20 @@ async function cargarCategoriasFiltro() {
             option.textContent = cat.nombre;
             selectFiltro.appendChild(option);
         });
+        selectFiltro.value = elegida;
     } catch (error) {
         mostrarToast("/static/IMG/iconos/error.png", "Error al cargar las Categorias en el filtro", "error");
     }
 }
 
-async function cargarProveedores() {
+async function cargarProveedores(avisar = true) {
     try {
         const response = await fetch("/proveedores");
         if (!response.ok) throw new Error("Error en la petición HTTP");
         const proveedores = await response.json();
 
         const select = document.getElementById("proveedor");
+        const elegido = select.value;
         select.innerHTML = '<option value="">Proveedor</option>';
         proveedores.forEach(prov => {
             const option = document.createElement("option");
@@ -116,84 +167,166 @@ async function cargarProveedores() {
             option.textContent = prov.nombre;
             select.appendChild(option);
         });
-        mostrarToast("/static/IMG/iconos/check.png", "Proveedores cargados exitosamente", "success");
+        select.value = elegido;
+        if (avisar) mostrarToast("/static/IMG/iconos/check.png", "Proveedores cargados exitosamente", "success");
     } catch (error) {
         mostrarToast("/static/IMG/iconos/error.png", "Error al cargar los proveedores", "error");
     }
 }
 
-async function cargarProductos(categoria = "", query = "") {
+// Estado de la paginación del listado
+const TAM_PAGINA = 50;
+let productosCargados = [];
+let siguienteCursor = null;
+let filtroActual = { categoria: "", query: "" };
+
+// Cambios de otros usuarios: se actualizan solo las filas afectadas
+const flujo = suscribirCambios(["producto", "categoria_producto", "proveedores"], {
+    cambio: aplicarCambio,
+    recargar: () => cargarProductos(filtroActual.categoria, filtroActual.query)
+});
+
+async function cargarProductos(categoria = "", query = "", cursor = null) {
     try {
-        let url = "/productos_filtro?";
-        if (categoria) url += `categoria=${encodeURIComponent(categoria)}&`;
-        if (query) url += `q=${encodeURIComponent(query)}`;
+        const params = new URLSearchParams({ limite: TAM_PAGINA });
+        if (categoria) params.set("categoria", categoria);
+        if (query) params.set("q", query);
+        if (cursor) params.set("cursor", cursor);
 
-        const response = await fetch(url);
+        const response = await fetch(`/productos_filtro?${params.toString()}`);
         if (!response.ok) throw new Error("Error en la petición HTTP");
 
-        const productos = await response.json();
+        const pagina = await response.json();
+        const productos = pagina.productos;
         const tbody = document.querySelector('#tabla-produc');
-        tbody.innerHTML = "";
-
-        productos.forEach(p => {
-            const row = document.createElement("tr");
-            row.innerHTML = `
-                <td style="display:none;">${p.id_producto}</td>
-                <td>${p.nombre}</td>
-                <td>${p.categoria}</td>
-                <td>${p.proveedor}</td>
-                <td>${p.precio_compra}</td>
-                <td>${p.precio_venta}</td>
-                <td>${p.stock_minimo}</td>
-                <td>
-                    <button class="btn-editar" data-id="${p.id_producto}">Editar</button>
-                    <button class="btn-eliminar" data-id="${p.id_producto}">Eliminar</button>
-                </td>
-            `;
-            tbody.appendChild(row);
-        });
 
-        document.querySelectorAll(".btn-editar").forEach(btn => {
-            btn.addEventListener("click", e => {
-                const id = e.target.dataset.id;
-                const producto = productos.find(p => p.id_producto == id);
-
-                document.getElementById("id_producto").value = producto.id_producto;
-                document.getElementById("nombre").value = producto.nombre;
-                document.getElementById("categoria").value = producto.id_categoria;
-                document.getElementById("proveedor").value = producto.id_proveedor;
-                document.getElementById("precio_compra").value = producto.precio_compra;
-                document.getElementById("precio_venta").value = producto.precio_venta;
-                document.getElementById("stock_minimo").value = producto.stock_minimo;
-                document.getElementById("descripcion").value = producto.descripcion;
-            });
-        });
+        // Una búsqueda nueva reemplaza la tabla; "Cargar más" la extiende
+        if (!cursor) {
+            tbody.innerHTML = "";
+            productosCargados = [];
+        }
+        productosCargados = productosCargados.concat(productos);
+        siguienteCursor = pagina.siguiente;
+        filtroActual = { categoria, query };
 
-        document.querySelectorAll(".btn-eliminar").forEach(btn => {
-            btn.addEventListener("click", e => {
-                const id = e.target.dataset.id;
-                mostrarConfirmToast(
-                    "¿Seguro que quieres eliminar este producto?",
-                    async () => {
-                        try {
-                            const res = await fetch(`/eliminar_producto/${id}`, { method: "DELETE" });
-                            if (res.ok) cargarProductos(categoria, query);
-                                mostrarToast("/static/IMG/iconos/check.png", "Producto eliminado correctamente", "success");
-                        } catch {}
-                    },
-                    () => {}
-                );
-            });
-        });
+        const btnMas = document.getElementById("cargar-mas");
+        if (btnMas) btnMas.style.display = siguienteCursor ? "" : "none";
+
+        productos.forEach(p => tbody.appendChild(filaProducto(p)));
 
     } catch (error) {
         console.error("Error cargando productos:", error);
         mostrarToast("/static/IMG/iconos/error.png", "Error cargando productos", "error");
     }
 }
+
+function filaProducto(p) {
+    const row = document.createElement("tr");
+    row.dataset.id = p.id_producto;
+    row.innerHTML = `
+        <td style="display:none;">${p.id_producto}</td>
+        <td>${p.nombre}</td>
+        <td>${p.categoria}</td>
+        <td>${p.proveedor}</td>
+        <td>${p.precio_compra}</td>
+        <td>${p.precio_venta}</td>
+        <td>${p.stock_minimo}</td>
+        <td>
+            <button class="btn-editar" data-id="${p.id_producto}">Editar</button>
+            <button class="btn-eliminar" data-id="${p.id_producto}">Eliminar</button>
+        </td>
+    `;
+    return row;
+}
+
+// Editar y eliminar con un solo manejador delegado en la tabla
+document.querySelector('#tabla-produc').addEventListener("click", e => {
+    const id = e.target.dataset.id;
+    if (!id) return;
+
+    if (e.target.classList.contains("btn-editar")) {
+        const producto = productosCargados.find(p => p.id_producto == id);
+
+        document.getElementById("id_producto").value = producto.id_producto;
+        document.getElementById("codigo").value = producto.codigo;
+        document.getElementById("nombre").value = producto.nombre;
+        document.getElementById("categoria").value = producto.id_categoria;
+        document.getElementById("proveedor").value = producto.id_proveedor;
+        document.getElementById("precio_compra").value = producto.precio_compra;
+        document.getElementById("precio_venta").value = producto.precio_venta;
+        document.getElementById("stock_minimo").value = producto.stock_minimo;
+        document.getElementById("descripcion").value = producto.descripcion;
+        return;
+    }
+    if (!e.target.classList.contains("btn-eliminar")) return;
+
+    mostrarConfirmToast(
+        "¿Seguro que quieres eliminar este producto?",
+        async () => {
+            try {
+                const res = await fetch(`/eliminar_producto/${id}`, { method: "DELETE" });
+                if (res.ok) refrescarSiDesconectado();
+                    mostrarToast("/static/IMG/iconos/check.png", "Producto eliminado correctamente", "success");
+            } catch {}
+        },
+        () => {}
+    );
+});
+
+// Aplica un cambio recibido del servidor a las filas cargadas
+function aplicarCambio(evento) {
+    const tbody = document.querySelector('#tabla-produc');
+
+    if (evento.tabla !== "producto") {
+        // Categorías y proveedores: selects del formulario y nombres en las filas
+        if (evento.tabla === "categoria_producto") {
+            categoriasPromesa = null;
+            cargarCategorias(false);
+            cargarCategoriasFiltro();
+        } else {
+            cargarProveedores(false);
+        }
+        if (evento.op !== "update") return;
+        const campoId = evento.tabla === "categoria_producto" ? "id_categoria" : "id_proveedor";
+        const campoNombre = evento.tabla === "categoria_producto" ? "categoria" : "proveedor";
+        evento.filas.forEach(f => {
+            productosCargados.filter(p => p[campoId] === f.id).forEach(p => {
+                p[campoNombre] = f.nombre;
+                tbody.querySelector(`tr[data-id="${p.id_producto}"]`)?.replaceWith(filaProducto(p));
+            });
+        });
+        return;
+    }
+
+    if (evento.op === "delete") {
+        productosCargados = productosCargados.filter(p => !evento.ids.includes(p.id_producto));
+        evento.ids.forEach(id => tbody.querySelector(`tr[data-id="${id}"]`)?.remove());
+        return;
+    }
+    const sinFiltro = !filtroActual.categoria && !filtroActual.query;
+    evento.filas.forEach(p => {
+        const actual = tbody.querySelector(`tr[data-id="${p.id_producto}"]`);
+        const i = productosCargados.findIndex(x => x.id_producto === p.id_producto);
+        if (actual) {
+            productosCargados[i] = p;
+            actual.replaceWith(filaProducto(p));
+        } else if (evento.op === "insert" && sinFiltro) {
+            // Con un filtro activo no se sabe si el producto nuevo coincide: se ve al buscar de nuevo
+            productosCargados.unshift(p);
+            tbody.prepend(filaProducto(p));
+        }
+    });
+}
+
+// Recarga la tabla tras un cambio propio solo si el flujo no lo va a traer
+function refrescarSiDesconectado() {
+    if (!flujo.conectado) cargarProductos(filtroActual.categoria, filtroActual.query);
+}
+
 document.getElementById("guardar").addEventListener("click", function () {
     const id_producto = document.getElementById("id_producto").value.trim();
 
+    const codigo = document.getElementById("codigo").value.trim();
     const nombre = document.getElementById("nombre").value.trim();
     const descripcion = document.getElementById("descripcion").value.trim();
     const categoria = document.getElementById("categoria").value.trim();
@@ -202,12 +335,13 @@ document.getElementById("guardar").addEventListener("click", function () {
     const precio_venta = document.getElementById("precio_venta").value.trim();
     const stock_minimo = document.getElementById("stock_minimo").value.trim();
 
-    if (!nombre || !descripcion || !categoria || !proveedor || !precio_compra || !precio_venta || !stock_minimo) {
+    if (!codigo || !nombre || !descripcion || !categoria || !proveedor || !precio_compra || !precio_venta || !stock_minimo) {
         mostrarToast("/static/IMG/iconos/advertencia.png", "Todos los campos son obligatorios", "warning");
         return;
     }
 
     const data = {
+        codigo: codigo,
         nombre: nombre,
         descripcion: descripcion,
         categoria: parseInt(categoria),
@@ -235,6 +369,7 @@ document.getElementById("guardar").addEventListener("click", function () {
             mostrarToast("/static/IMG/iconos/check.png", id_producto ? "Producto actualizado" : "Producto agregado correctamente", "success");
 
             document.getElementById("id_producto").value = "";
+            document.getElementById("codigo").value = "";
             document.getElementById("nombre").value = "";
             document.getElementById("descripcion").value = "";
             document.getElementById("categoria").value = "";
@@ -243,12 +378,10 @@ document.getElementById("guardar").addEventListener("click", function () {
             document.getElementById("precio_venta").value = "";
             document.getElementById("stock_minimo").value = "";
 
-            const selectFiltro = document.getElementById("filtro");
-            const inputBuscar = document.getElementById("buscador");
-            cargarProductos(selectFiltro.value, inputBuscar.value);
+            refrescarSiDesconectado();
 
         } else {
-            mostrarToast("/static/IMG/iconos/error.png", "Error al guardar producto", "error");
+            mostrarToast("/static/IMG/iconos/error.png", result.mensaje || "Error al guardar producto", "error");
         }
     })
     .catch(error => {
@@ -1,32 +1,24 @@
-  document.addEventListener("DOMContentLoaded", cargarProveedores);
+document.addEventListener("DOMContentLoaded", () => {
+    cargarProveedores();
+    asignarEventos();
+});
+
+// Proveedores mostrados (se actualizan en el lugar con el flujo de cambios)
+let proveedores = [];
+const flujo = suscribirCambios(["proveedores"], {
+    cambio: aplicarCambio,
+    recargar: cargarProveedores
+});
 
 async function cargarProveedores() {
     try {
         const response = await fetch("/list-proveedores");
         if (!response.ok) throw new Error("Error en la petición HTTP");
-        const proveedores = await response.json();
+        proveedores = await response.json();
 
-        console.log(proveedores);
         const tbody = document.querySelector("#tabla-proveedores tbody");
         tbody.innerHTML = "";
-
-        proveedores.forEach(prov => {
-            const row = document.createElement("tr");
-
-            row.innerHTML = `
-                <td class="id-general">${prov.id}</td>
-                <td>${prov.nombre}</td>
-                <td>${prov.telefono}</td>
-                <td>${prov.email}</td>
-                <td>${prov.direccion}</td>
-                <td>
-                    <button class="btn-editar" data-id="${prov.id}">Editar</button>
-                    <button class="btn-eliminar" data-id="${prov.id}">Eliminar</button>
-                </td>
-            `;
-            tbody.appendChild(row);
-        });
-        asignarEventos(proveedores);
+        proveedores.forEach(prov => tbody.appendChild(filaProveedor(prov)));
 
     } catch (error) {
         console.error("Error cargando proveedores:", error);
@@ -34,18 +26,60 @@ async function cargarProveedores() {
     }
 }
 
-// Función para asignar eventos de editar y eliminar
-function asignarEventos(proveedores) {
+function filaProveedor(prov) {
+    const row = document.createElement("tr");
+    row.dataset.id = prov.id;
+    row.innerHTML = `
+        <td class="id-general">${prov.id}</td>
+        <td>${prov.nombre}</td>
+        <td>${prov.telefono}</td>
+        <td>${prov.email}</td>
+        <td>${prov.direccion}</td>
+        <td>
+            <button class="btn-editar" data-id="${prov.id}">Editar</button>
+            <button class="btn-eliminar" data-id="${prov.id}">Eliminar</button>
+        </td>
+    `;
+    return row;
+}
+
+// Aplica un cambio recibido del servidor solo a las filas afectadas
+function aplicarCambio(evento) {
+    const tbody = document.querySelector("#tabla-proveedores tbody");
+    if (evento.op === "delete") {
+        proveedores = proveedores.filter(p => !evento.ids.includes(p.id));
+        evento.ids.forEach(id => tbody.querySelector(`tr[data-id="${id}"]`)?.remove());
+        return;
+    }
+    evento.filas.forEach(prov => {
+        const fila = filaProveedor(prov);
+        const actual = tbody.querySelector(`tr[data-id="${prov.id}"]`);
+        const i = proveedores.findIndex(p => p.id === prov.id);
+        if (i >= 0) proveedores[i] = prov; else proveedores.push(prov);
+        if (actual) actual.replaceWith(fila); else tbody.appendChild(fila);
+    });
+}
+
+// Recarga la tabla tras un cambio propio solo si el flujo no lo va a traer
+function refrescarSiDesconectado() {
+    if (!flujo.conectado) cargarProveedores();
+}
+
+// Eventos de editar y eliminar (delegados: sirven para filas agregadas después)
+function asignarEventos() {
     const inputNombre = document.getElementById("nombre");
     const inputTelefono = document.getElementById("telefono");
     const inputEmail = document.getElementById("email");
     const inputDireccion = document.getElementById("direccion");
     const inputId = document.getElementById("id_prov");
+    const tbody = document.querySelector("#tabla-proveedores tbody");
 
-    // Eventos Editar
-    document.querySelectorAll(".btn-editar").forEach(btn => {
-        btn.addEventListener("click", e => {
-            const id = e.target.dataset.id;
+    tbody.addEventListener("click", e => {
+        const id = e.target.dataset.id;
+        if (!id) return;
+
+        // Editar
+        if (e.target.classList.contains("btn-editar")) {
             const prov = proveedores.find(p => p.id == id);
 
             inputNombre.value = prov.nombre;
@@ -53,38 +87,34 @@ function asignarEventos(proveedores) {
             inputEmail.value = prov.email;
             inputDireccion.value = prov.direccion;
             inputId.value = prov.id;
-        });
-    });
-
-    // Eventos Eliminar
-    document.querySelectorAll(".btn-eliminar").forEach(btn => {
-        btn.addEventListener("click", e => {
-            const id = e.target.dataset.id;
-
-            mostrarConfirmToast(
-                "¿Seguro que quieres eliminar este proveedor?",
-                async () => {
-                    try {
-                        const res = await fetch(`/eliminar_proveedor/${id}`, { method: "DELETE" });
-                        const data = await res.json();
-
-                        if (res.ok && data.status === "ok") {
-                            mostrarToast("/static/IMG/iconos/check.png", "Proveedor eliminado", "success");
-                            cargarProveedores();
-                        } else if (data.mensaje) {
-                            mostrarToast("/static/IMG/iconos/informacion.png", data.mensaje, "informacion");
-                        } else {
-                            mostrarToast("/static/IMG/iconos/error.png", "Error al eliminar proveedor", "error");
-                        }
-                    } catch (err) {
-                        mostrarToast("/static/IMG/iconos/error.png", "Error de conexión", "error");
+            return;
+        }
+        if (!e.target.classList.contains("btn-eliminar")) return;
+
+        // Eliminar
+        mostrarConfirmToast(
+            "¿Seguro que quieres eliminar este proveedor?",
+            async () => {
+                try {
+                    const res = await fetch(`/eliminar_proveedor/${id}`, { method: "DELETE" });
+                    const data = await res.json();
+
+                    if (res.ok && data.status === "ok") {
+                        mostrarToast("/static/IMG/iconos/check.png", "Proveedor eliminado", "success");
+                        refrescarSiDesconectado();
+                    } else if (data.mensaje) {
+                        mostrarToast("/static/IMG/iconos/informacion.png", data.mensaje, "informacion");
+                    } else {
+                        mostrarToast("/static/IMG/iconos/error.png", "Error al eliminar proveedor", "error");
                     }
-                },
-                () => {
-                    mostrarToast("/static/IMG/iconos/informacion.png", "Eliminación cancelada", "informacion");
+                } catch (err) {
+                    mostrarToast("/static/IMG/iconos/error.png", "Error de conexión", "error");
                 }
-            );
-        });
+            },
+            () => {
+                mostrarToast("/static/IMG/iconos/informacion.png", "Eliminación cancelada", "informacion");
+            }
+        );
     });
 }
 
@@ -138,7 +168,7 @@ btnGuardar.addEventListener("click", async () => {
             inputEmail.value = "";
             inputDireccion.value = "";
             inputId.value = "";
-            cargarProveedores();
+            refrescarSiDesconectado();
         } else if (result.mensaje) {
             mostrarToast("/static/IMG/iconos/informacion.png", result.mensaje, "informacion");
         } else {
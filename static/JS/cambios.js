@@ -0,0 +1,52 @@
+// Flujo de cambios en vivo del servidor (GET /api/cambios, Server-Sent Events).
+//
+// suscribirCambios(["categoria_producto"], {
+//     cambio: evento => { ... },   // {tabla, op: "insert"|"update"|"delete", ids, filas}
+//     recargar: () => { ... }      // se perdieron avisos: volver a pedir la lista completa
+// });
+//
+// Cada evento lleva como "id" la versión de los datos. Al reconectar, el
+// servidor reenvía como eventos "cambio" lo ocurrido desde la última versión
+// recibida (Last-Event-ID o ?since=): no hace falta recargar la lista.
+//
+// Devuelve un objeto cuyo campo "conectado" indica si el flujo está abierto;
+// mientras no lo esté, cada página recarga su lista tras sus propios cambios.
+function suscribirCambios(tablas, manejadores) {
+    const estado = { conectado: false };
+    if (!window.EventSource) return estado;
+
+    const url = `/api/cambios?tablas=${encodeURIComponent(tablas.join(","))}`;
+    let fuente = null;
+    let version = null;     // "id" del último evento recibido
+    let pendiente = false;  // se cerró sin versión conocida: recargar al reconectar
+
+    function abrir() {
+        fuente = new EventSource(version === null ? url : `${url}&since=${version}`);
+        fuente.onopen = () => {
+            estado.conectado = true;
+            if (pendiente) manejadores.recargar();
+            pendiente = false;
+        };
+        fuente.onerror = () => {
+            estado.conectado = false;
+            // EventSource reintenta solo y envía Last-Event-ID, salvo si el
+            // servidor respondió con error (p. ej. 503 sin lugar para más
+            // clientes): reabrir más tarde pidiendo lo ocurrido desde "version"
+            if (fuente.readyState === EventSource.CLOSED) {
+                if (version === null) pendiente = true;
+                setTimeout(abrir, 10000 + Math.random() * 5000);
+            }
+        };
+        const recordar = e => { if (e.lastEventId) version = e.lastEventId; };
+        fuente.addEventListener("version", recordar);
+        fuente.addEventListener("cambio", e => {
+            recordar(e);
+            manejadores.cambio(JSON.parse(e.data));
+        });
+        fuente.addEventListener("recargar", () => manejadores.recargar());
+    }
+
+    abrir();
+    window.addEventListener("beforeunload", () => fuente.close());
+    return estado;
+}
@@ -3,58 +3,78 @@
   // =======================
   // Estado y utilidades
   // =======================
-  let comprasCache = [];        // Últimos datos cargados desde el backend
-  let comprasFiltradas = [];    // Vista filtrada para la tabla
+  // El filtrado, la paginación y los totales se calculan en el servidor:
+  // el navegador solo guarda la página visible.
+  let endpointCompras = "/api/compras";
+  let siguienteCursor = null;
 
   const $  = (sel) => document.querySelector(sel);
-  const $$ = (sel) => document.querySelectorAll(sel);
 
   const money = (v) => {
     const n = parseFloat(v);
     return Number.isFinite(n) ? `$${n.toFixed(2)}` : '$0.00';
   };
 
-  const parseYYYYMM = (isoDate) => {
-    // isoDate esperado "YYYY-MM-DD" o "YYYY-MM-DDTHH:mm:ss"
-    if (!isoDate) return '';
-    const d = new Date(isoDate);
-    if (isNaN(d)) {
-      // fallback si viene "YYYY-MM-DD"
-      return String(isoDate).slice(0, 7);
-    }
-    const y = d.getFullYear();
-    const m = String(d.getMonth() + 1).padStart(2, '0');
-    return `${y}-${m}`;
+  const mesActual = () => {
+    const hoy = new Date();
+    const yyyy = hoy.getFullYear();
+    const mm = String(hoy.getMonth() + 1).padStart(2, '0');
+    return `${yyyy}-${mm}`;
+  };
+
+  // "YYYY-MM" → { desde: "YYYY-MM-01", hasta: último día del mes }
+  const rangoDelMes = (yyyymm) => {
+    if (!yyyymm) return {};
+    const [y, m] = yyyymm.split('-').map(Number);
+    const ultimo = new Date(y, m, 0).getDate();
+    return { desde: `${yyyymm}-01`, hasta: `${yyyymm}-${String(ultimo).padStart(2, '0')}` };
   };
 
+  function parametrosFiltro() {
+    const inputMes = $('#filtro-mes-compras');
+    const inputProv = $('#filtro-proveedor');
+    const params = new URLSearchParams();
+
+    const rango = rangoDelMes(inputMes ? inputMes.value : '');
+    if (rango.desde) params.set('desde', rango.desde);
+    if (rango.hasta) params.set('hasta', rango.hasta);
+
+    const provTxt = (inputProv ? inputProv.value : '').trim();
+    if (provTxt) params.set('proveedor_nombre', provTxt);
+    return params;
+  }
+
   // =======================
   // Carga inicial
   // =======================
   document.addEventListener("DOMContentLoaded", () => {
     const tbody = $('#tabla-compras'); // <tbody id="tabla-compras" data-endpoint="/api/compras">
-    const endpoint = tbody?.dataset.endpoint || "/api/compras";
+    endpointCompras = tbody?.dataset.endpoint || "/api/compras";
 
-    cargarCompras(endpoint);
     prepararFiltros();
+    cargarCompras();
+    actualizarTotales();
   });
 
   // =======================
   // Fetch + Render tabla
   // =======================
-  function cargarCompras(endpoint) {
-    fetch(endpoint)
+  function cargarCompras(cursor = null) {
+    const params = parametrosFiltro();
+    params.set('limite', '100');
+    if (cursor) params.set('cursor', cursor);
+
+    fetch(`${endpointCompras}?${params.toString()}`)
       .then(r => {
         if (!r.ok) throw new Error(`Error HTTP: ${r.status}`);
         return r.json();
       })
-      .then(data => {
-        if (!Array.isArray(data)) data = [];
-        comprasCache = data;
-        comprasFiltradas = [...comprasCache];
-
-        renderTabla(comprasFiltradas);
-        actualizarTotalesLocales(comprasFiltradas);  // total general (si existe el span)
-        actualizarTotalMesActual();                  // total del mes (si existe el span)
+      .then(pagina => {
+        siguienteCursor = pagina.siguiente;
+        renderTabla(pagina.compras || [], Boolean(cursor));
+
+        const btnMas = $('#btn-mas-compras');
+        if (btnMas) btnMas.style.display = siguienteCursor ? '' : 'none';
       })
       .catch(err => {
         console.error("Error cargando compras:", err);
@@ -65,16 +85,16 @@
       });
   }
 
-  function renderTabla(lista) {
+  function renderTabla(lista, agregar) {
     const tbody = $('#tabla-compras');
     if (!tbody) {
       console.error('No se encontró #tabla-compras');
       return;
     }
 
-    tbody.innerHTML = "";
+    if (!agregar) tbody.innerHTML = "";
 
-    if (!Array.isArray(lista) || lista.length === 0) {
+    if (!agregar && lista.length === 0) {
       tbody.innerHTML = '<tr><td colspan="7">No hay compras registradas</td></tr>';
       return;
     }
@@ -100,57 +120,59 @@
   }
 
   // =======================
-  // Totales (cálculo local)
+  // Totales (calculados en SQL)
   // =======================
-  function actualizarTotalesLocales(lista) {
+  function actualizarTotales() {
     const spanGeneral = $('#total-general-compras');
-    if (!spanGeneral) return;
-
-    const total = lista.reduce((acc, c) => acc + (parseFloat(c.total) || 0), 0);
-    spanGeneral.textContent = money(total);
-  }
-
-  function actualizarTotalMesActual() {
     const spanMes = $('#total-mes-compras');
-    const inputMes = $('#filtro-mes-compras');
-    if (!spanMes || !inputMes) return;
+    if (!spanGeneral && !spanMes) return;
 
-    const mesSel = inputMes.value; // "YYYY-MM"
-    if (!mesSel) {
-      spanMes.textContent = '$0.00';
-      return;
-    }
+    const inputMes = $('#filtro-mes-compras');
+    const inputProv = $('#filtro-proveedor');
+    const params = new URLSearchParams();
+    if (inputMes && inputMes.value) params.set('mes', inputMes.value);
+    const provTxt = (inputProv ? inputProv.value : '').trim();
+    if (provTxt) params.set('proveedor_nombre', provTxt);
 
-    const delMes = comprasFiltradas.filter(c => parseYYYYMM(c.fecha) === mesSel);
-    const totalMes = delMes.reduce((acc, c) => acc + (parseFloat(c.total) || 0), 0);
-    spanMes.textContent = money(totalMes);
+    fetch(`${endpointCompras}/totales?${params.toString()}`)
+      .then(r => {
+        if (!r.ok) throw new Error(`Error HTTP: ${r.status}`);
+        return r.json();
+      })
+      .then(t => {
+        if (spanGeneral) spanGeneral.textContent = money(t.total_general);
+        if (spanMes) spanMes.textContent = money(t.total_mes);
+      })
+      .catch(err => console.error("Error cargando totales de compras:", err));
   }
 
   // =======================
-  // Filtros (cliente)
+  // Filtros (servidor)
   // =======================
   function prepararFiltros() {
     // Filtro por mes (input type="month" id="filtro-mes-compras")
     const inputMes = $('#filtro-mes-compras');
     if (inputMes) {
       // Inicializar al mes actual
-      const hoy = new Date();
-      const yyyy = hoy.getFullYear();
-      const mm = String(hoy.getMonth() + 1).padStart(2, '0');
-      inputMes.value = `${yyyy}-${mm}`;
-
-      inputMes.addEventListener('change', () => {
-        aplicarFiltros();
-        actualizarTotalMesActual();
-      });
+      inputMes.value = mesActual();
+      inputMes.addEventListener('change', aplicarFiltros);
     }
 
-    // Filtro por proveedor (input text id="filtro-proveedor")
+    // Filtro por proveedor (input text id="filtro-proveedor"), con espera entre teclas
     const inputProv = $('#filtro-proveedor');
     if (inputProv) {
+      let espera = null;
       inputProv.addEventListener('input', () => {
-        aplicarFiltros();
-        actualizarTotalMesActual();
+        clearTimeout(espera);
+        espera = setTimeout(aplicarFiltros, 300);
+      });
+    }
+
+    // Botón "Cargar más" (opcional)
+    const btnMas = $('#btn-mas-compras');
+    if (btnMas) {
+      btnMas.addEventListener('click', () => {
+        if (siguienteCursor) cargarCompras(siguienteCursor);
       });
     }
 
@@ -158,35 +180,15 @@
     const btnLimpiar = $('#btn-limpiar-filtros-compras');
     if (btnLimpiar) {
       btnLimpiar.addEventListener('click', () => {
-        if (inputMes) {
-          const hoy = new Date();
-          const yyyy = hoy.getFullYear();
-          const mm = String(hoy.getMonth() + 1).padStart(2, '0');
-          inputMes.value = `${yyyy}-${mm}`;
-        }
+        if (inputMes) inputMes.value = mesActual();
         if (inputProv) inputProv.value = '';
-        comprasFiltradas = [...comprasCache];
-        renderTabla(comprasFiltradas);
-        actualizarTotalesLocales(comprasFiltradas);
-        actualizarTotalMesActual();
+        aplicarFiltros();
       });
     }
   }
 
   function aplicarFiltros() {
-    const inputMes = $('#filtro-mes-compras');
-    const inputProv = $('#filtro-proveedor');
-
-    const mesSel = inputMes ? inputMes.value : '';
-    const provTxt = (inputProv ? inputProv.value : '').trim().toLowerCase();
-
-    comprasFiltradas = comprasCache.filter(c => {
-      const matchMes = mesSel ? (parseYYYYMM(c.fecha) === mesSel) : true;
-      const matchProv = provTxt ? String(c.proveedor).toLowerCase().includes(provTxt) : true;
-      return matchMes && matchProv;
-    });
-
-    renderTabla(comprasFiltradas);
-    actualizarTotalesLocales(comprasFiltradas);
+    cargarCompras();
+    actualizarTotales();
   }
 })();
\ No newline at end of file
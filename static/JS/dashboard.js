@@ -0,0 +1,54 @@
+// static/JS/dashboard.js
+// Indicadores del menú principal (/api/dashboard). El servidor los calcula
+// en paralelo y los guarda unos segundos en caché; aquí se refrescan cada minuto.
+(function () {
+  const $ = (sel) => document.querySelector(sel);
+  const REFRESCO_MS = 60000;
+
+  const money = (v) => {
+    const n = parseFloat(v);
+    return Number.isFinite(n) ? `$${n.toFixed(2)}` : '$0.00';
+  };
+
+  function mostrar(d) {
+    if (d.ventas_hoy) {
+      $('#kpi-ventas-hoy').textContent = money(d.ventas_hoy.total);
+      $('#kpi-tickets-hoy').textContent = `${d.ventas_hoy.tickets} ventas`;
+    }
+    if (d.compras_mes) {
+      $('#kpi-compras-mes').textContent = money(d.compras_mes.total);
+      $('#kpi-compras-cantidad').textContent = `${d.compras_mes.compras} compras`;
+    }
+    if (d.bajo_minimo !== null && d.bajo_minimo !== undefined) {
+      $('#kpi-bajo-minimo').textContent = d.bajo_minimo;
+    }
+    if (d.por_vencer) {
+      $('#kpi-por-vencer').textContent = d.por_vencer.lotes;
+      $('#kpi-por-vencer-detalle').textContent = `${d.por_vencer.unidades} unidades en ${d.por_vencer.dias} días`;
+    }
+    if (d.mas_vendidos) {
+      const lista = $('#kpi-mas-vendidos');
+      lista.innerHTML = "";
+      d.mas_vendidos.forEach(p => {
+        const item = document.createElement("li");
+        item.textContent = `${p.producto} — ${money(p.ingresos)} (${p.unidades} u.)`;
+        lista.appendChild(item);
+      });
+    }
+  }
+
+  async function cargarDashboard() {
+    try {
+      const res = await fetch("/api/dashboard");
+      if (!res.ok) throw new Error("Error en la petición HTTP");
+      mostrar(await res.json());
+    } catch (error) {
+      console.error("Error cargando indicadores:", error);
+    }
+  }
+
+  document.addEventListener("DOMContentLoaded", () => {
+    cargarDashboard();
+    setInterval(cargarDashboard, REFRESCO_MS);
+  });
+})();
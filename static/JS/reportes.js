@@ -0,0 +1,87 @@
+// static/JS/reportes.js
+// Reportes de ventas y compras (/api/reportes/<tipo>); el servidor agrega
+// y el navegador solo dibuja la tabla o descarga el CSV.
+(function () {
+  const $ = (sel) => document.querySelector(sel);
+
+  const AGRUPACIONES = {
+    ventas: { dia: "Día", semana: "Semana", mes: "Mes", categoria: "Categoría", producto: "Producto", metodo_pago: "Método de pago" },
+    compras: { dia: "Día", semana: "Semana", mes: "Mes", categoria: "Categoría", producto: "Producto", proveedor: "Proveedor" }
+  };
+
+  // Columnas internas (ids) que no se muestran en la tabla
+  const OCULTAS = ["id_categoria", "id_producto", "id_proveedor"];
+  const MONEDA = ["ingresos", "costo", "margen", "total"];
+
+  const fechaISO = (d) => d.toISOString().slice(0, 10);
+
+  function llenarAgrupaciones() {
+    const tipo = $('#reporte-tipo').value;
+    const select = $('#reporte-agrupar');
+    const elegida = select.value;
+    select.innerHTML = "";
+    Object.entries(AGRUPACIONES[tipo]).forEach(([valor, texto]) => {
+      const option = document.createElement("option");
+      option.value = valor;
+      option.textContent = texto;
+      select.appendChild(option);
+    });
+    if (AGRUPACIONES[tipo][elegida]) select.value = elegida;
+  }
+
+  function parametros() {
+    const params = new URLSearchParams({ agrupar: $('#reporte-agrupar').value });
+    if ($('#reporte-desde').value) params.set('desde', $('#reporte-desde').value);
+    if ($('#reporte-hasta').value) params.set('hasta', $('#reporte-hasta').value);
+    return params;
+  }
+
+  async function cargarReporte() {
+    const tipo = $('#reporte-tipo').value;
+    const encabezado = $('#reporte-encabezado');
+    const tbody = $('#reporte-filas');
+    try {
+      const res = await fetch(`/api/reportes/${tipo}?${parametros()}`);
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.mensaje || "Error en la petición HTTP");
+
+      const columnas = data.filas.length ? Object.keys(data.filas[0]).filter(c => !OCULTAS.includes(c)) : [];
+      encabezado.innerHTML = `<tr>${columnas.map(c => `<th>${c.replace("_", " ")}</th>`).join("")}</tr>`;
+      tbody.innerHTML = "";
+      if (!data.filas.length) {
+        tbody.innerHTML = `<tr><td>Sin datos en el rango elegido</td></tr>`;
+        return;
+      }
+      data.filas.forEach(fila => {
+        const row = document.createElement("tr");
+        row.innerHTML = columnas.map(c => {
+          const v = fila[c];
+          if (v === null || v === undefined) return "<td></td>";
+          return `<td>${MONEDA.includes(c) ? `$${Number(v).toFixed(2)}` : v}</td>`;
+        }).join("");
+        tbody.appendChild(row);
+      });
+    } catch (error) {
+      console.error("Error cargando reporte:", error);
+      tbody.innerHTML = `<tr><td>Error cargando el reporte</td></tr>`;
+    }
+  }
+
+  document.addEventListener("DOMContentLoaded", () => {
+    const hoy = new Date();
+    const hace30 = new Date(hoy.getTime() - 29 * 24 * 3600 * 1000);
+    $('#reporte-desde').value = fechaISO(hace30);
+    $('#reporte-hasta').value = fechaISO(hoy);
+    llenarAgrupaciones();
+
+    $('#reporte-tipo').addEventListener("change", () => { llenarAgrupaciones(); cargarReporte(); });
+    $('#reporte-agrupar').addEventListener("change", cargarReporte);
+    $('#reporte-ver').addEventListener("click", cargarReporte);
+    $('#reporte-csv').addEventListener("click", () => {
+      const params = parametros();
+      params.set('formato', 'csv');
+      window.location = `/api/reportes/${$('#reporte-tipo').value}?${params}`;
+    });
+    cargarReporte();
+  });
+})();